@@ -4,6 +4,7 @@ from typing import Optional
 
 from client.connection.connection_manager import ConnectionManager
 from client.connection.player import Player, player_from_dict
+from shared.message.binary_codec import BINARY_PROTOCOL_VERSION
 from shared.message.message_code import MessageCode
 from shared.validators.player_validators import nick_valid, email_valid, password_valid
 
@@ -32,7 +33,8 @@ class AuthService:
             "code": MessageCode.SIGN_UP.value,
             "nick": nick,
             "email": email,
-            "password": password
+            "password": password,
+            "binaryProtocol": BINARY_PROTOCOL_VERSION
         }))
 
         return PlayerValidationStatus.VALID
@@ -46,11 +48,17 @@ class AuthService:
         self._connection_manager.connect(json.dumps({
             "code": MessageCode.SIGN_IN.value,
             "email": email,
-            "password": password
+            "password": password,
+            "binaryProtocol": BINARY_PROTOCOL_VERSION
         }))
 
         return PlayerValidationStatus.VALID
 
+    def on_authenticated(self, message: dict):
+        """Called with the successful sign-in or sign-up response."""
+        self.current = message["player"]
+        self._connection_manager.binary_protocol = message.get("binaryProtocol") == BINARY_PROTOCOL_VERSION
+
     @property
     def current(self) -> Optional[Player]:
         return self._current
@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from queue import Queue
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 import websockets
 from websockets import ConnectionClosedError
@@ -10,10 +10,12 @@ from websockets import ConnectionClosedError
 class ConnectionManager:
     def __init__(self, config: dict):
         self.messages: Queue[str] = Queue()
-        self._notify_message: Optional[Callable[[str], None]] = None
+        self._notify_message: Optional[Callable[[Union[str, bytes]], None]] = None
         self._loop = asyncio.new_event_loop()
         self._websocket = None
         self._config = config
+        # Set once the server confirms the binary framing of hot game messages (see shared.message.binary_codec).
+        self.binary_protocol = False
 
     def start(self):
         asyncio.set_event_loop(self._loop)
@@ -41,8 +43,8 @@ class ConnectionManager:
 
         logging.fatal(f"{self._websocket.close_code} {self._websocket.close_reason}")
 
-    def send(self, message: str):
+    def send(self, message: Union[str, bytes]):
         self._loop.call_soon_threadsafe(lambda: asyncio.gather(self._send(message)))
 
-    async def _send(self, message: str):
+    async def _send(self, message: Union[str, bytes]):
         await self._websocket.send(message)
@@ -16,7 +16,9 @@ from shared.chess_engine.piece import Team, PIECE_TYPES_FROM_CODE, TEAMS_BY_NAME
 from shared.chess_engine.position import Vector2d
 from shared.game.game_type import GameType, TIMES, GAME_TYPES_BY_NAME
 from shared.game.ranking import elo_change, PlayerScore, reverse_score
+from shared.message.binary_codec import encode_message
 from shared.message.message_code import MessageCode
+from shared.message.move_message import move_to_message
 
 
 ACCESS_KEY_REGEX = re.compile("^[A-Z]{5}$")
@@ -26,6 +28,29 @@ def parse_vector(coords: [int, int]) -> Vector2d:
     return Vector2d(coords[0], coords[1])
 
 
+def parse_move(move_dict: dict) -> AbstractMove:
+    move_type = MOVE_TYPES_BY_CODE[move_dict["type"]]
+    position_from, position_to = parse_vector(move_dict["positionFrom"]), parse_vector(move_dict["positionTo"])
+
+    if move_type == MoveType.MOVE:
+        return Move(position_from, position_to)
+    elif move_type == MoveType.CAPTURING:
+        return Capturing(position_from, position_to)
+    elif move_type == MoveType.CASTLING:
+        return Castling(
+            position_from,
+            position_to,
+            parse_vector(move_dict["rookFrom"]),
+            parse_vector(move_dict["rookTo"])
+        )
+    elif move_type == MoveType.EN_PASSANT:
+        return EnPassant(position_from, position_to, parse_vector(move_dict["capturedPosition"]))
+    elif move_type == MoveType.PROMOTION:
+        return Promotion(position_from, position_to, PIECE_TYPES_FROM_CODE[move_dict["pieceType"]])
+    else:
+        return PromotionWithCapturing(position_from, position_to, PIECE_TYPES_FROM_CODE[move_dict["pieceType"]])
+
+
 class GameRoomType(Enum):
     RANKED = auto()
     PRIVATE = auto()
@@ -217,28 +242,10 @@ class GameRoomService:
             self.room.game_result = GameResult(PlayerScore.DRAW)
 
     def on_game_move(self, message: dict):
-        move_dict = message["move"]
-        move_type = MOVE_TYPES_BY_CODE[move_dict["type"]]
-        position_from, position_to = parse_vector(move_dict["positionFrom"]), parse_vector(move_dict["positionTo"])
-
-        move: AbstractMove
-        if move_type == MoveType.MOVE:
-            move = Move(position_from, position_to)
-        elif move_type == MoveType.CAPTURING:
-            move = Capturing(position_from, position_to)
-        elif move_type == MoveType.CASTLING:
-            move = Castling(
-                position_from,
-                position_to,
-                parse_vector(move_dict["rookFrom"]),
-                parse_vector(move_dict["rookTo"])
-            )
-        elif move_type == MoveType.EN_PASSANT:
-            move = EnPassant(position_from, position_to, parse_vector(move_dict["capturedPosition"]))
-        elif move_type == MoveType.PROMOTION:
-            move = Promotion(position_from, position_to, PIECE_TYPES_FROM_CODE[move_dict["pieceType"]])
-        else:
-            move = PromotionWithCapturing(position_from, position_to, PIECE_TYPES_FROM_CODE[move_dict["pieceType"]])
+        # Binary frames carry the decoded move, JSON messages its dictionary.
+        move = message["move"]
+        if not isinstance(move, AbstractMove):
+            move = parse_move(move)
 
         if self.room.draw_offer:
             if self.room.draw_offer != self.room.engine.currently_moving_team:
@@ -335,15 +342,15 @@ class GameRoomService:
         }))
 
     def game_offer_draw(self):
-        self._connection_manager.send(json.dumps({
+        self._send_game_message({
             "code": MessageCode.GAME_OFFER_DRAW.value
-        }))
+        })
 
     def game_respond_to_draw_offer(self, accepted: bool):
-        self._connection_manager.send(json.dumps({
+        self._send_game_message({
             "code": MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value,
             "accepted": accepted
-        }))
+        })
 
     def game_claim_draw(self):
         self._connection_manager.send(json.dumps({
@@ -351,24 +358,19 @@ class GameRoomService:
         }))
 
     def game_move(self, move: AbstractMove):
-        move_dict = {
-            "type": move.type.value,
-            "positionFrom": move.position_from.coords,
-            "positionTo": move.position_to.coords
-        }
-
-        if move.type == MoveType.CASTLING:
-            move_dict["rookFrom"] = move.rook_from.coords
-            move_dict["rookTo"] = move.rook_to.coords
-        elif move.type == MoveType.EN_PASSANT:
-            move_dict["capturedPosition"] = move.captured_position.coords
-        elif move.type == MoveType.PROMOTION or move.type == MoveType.PROMOTION_WITH_CAPTURING:
-            move_dict["pieceType"] = move.piece_type.value
-
-        self._connection_manager.send(json.dumps({
-            "code": MessageCode.GAME_MOVE.value,
-            "move": move_dict
-        }))
+        if self._connection_manager.binary_protocol:
+            self._connection_manager.send(encode_message({"code": MessageCode.GAME_MOVE.value, "move": move}))
+        else:
+            self._connection_manager.send(json.dumps({
+                "code": MessageCode.GAME_MOVE.value,
+                "move": move_to_message(move)
+            }))
+
+    def _send_game_message(self, message: dict):
+        if self._connection_manager.binary_protocol:
+            self._connection_manager.send(encode_message(message))
+        else:
+            self._connection_manager.send(json.dumps(message))
 
     def _on_ranked_end(self, players: [Player], score: PlayerScore):
         current_elo_change = elo_change(
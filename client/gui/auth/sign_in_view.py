@@ -64,7 +64,7 @@ class SignInView(View):
     def on_sign_in(self, message: dict):
         status = STATUS_BY_CODE[message["status"]]
         if status == AuthStatus.SUCCESS:
-            self.auth_service.current = message["player"]
+            self.auth_service.on_authenticated(message)
             self.player_component.update()
             self.navigate(ViewName.START)
         else:
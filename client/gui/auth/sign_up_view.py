@@ -74,7 +74,7 @@ class SignUpView(View):
     def on_sign_up(self, message: dict):
         status = STATUS_BY_CODE[message["status"]]
         if status == AuthStatus.SUCCESS:
-            self.auth_service.current = message["player"]
+            self.auth_service.on_authenticated(message)
             self.player_component.update()
             self.navigate(ViewName.START)
         else:
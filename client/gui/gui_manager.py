@@ -1,6 +1,7 @@
 import json
 import os
 from queue import Queue
+from typing import Union
 
 import tkinter as tk
 from PIL import ImageTk, Image
@@ -17,13 +18,14 @@ from client.gui.view import ViewName
 from client.connection.auth_service import AuthService
 from client.gui.auth.sign_in_view import SignInView
 from client.gui.auth.sign_up_view import SignUpView
+from shared.message.binary_codec import decode_message
 from shared.message.message_code import MessageCode
 
 
 class GuiManager:
     def __init__(self, auth_service: AuthService, game_room_service: GameRoomService):
         self.auth_service = auth_service
-        self._messages: Queue[str] = Queue()
+        self._messages: Queue[Union[str, bytes]] = Queue()
         self.root = tk.Tk()
 
         self.root.attributes("-fullscreen", True)
@@ -78,7 +80,7 @@ class GuiManager:
     def start(self):
         self.root.mainloop()
 
-    def notify_message(self, message: str):
+    def notify_message(self, message: Union[str, bytes]):
         self._messages.put(message)
         self.root.event_generate("<<message>>")
 
@@ -89,7 +91,8 @@ class GuiManager:
         self.current_view = self.views[view]
 
     def _on_message(self, event):
-        message = json.loads(self._messages.get())
+        raw_message = self._messages.get()
+        message = decode_message(raw_message) if isinstance(raw_message, bytes) else json.loads(raw_message)
         code: int = message["code"]
 
         if code == MessageCode.SIGN_UP.value:
@@ -6,9 +6,11 @@ from server.connection_pool import ConnectionPool
 from server.database import DBConnection
 from server.game_room.game_room_service import GameRoomService
 from server.message_broker import MessageBroker
+from server.outbound_queue import OVERFLOW_POLICIES_BY_NAME, DEFAULT_MAX_QUEUE_SIZE
 from server.player.auth_service import AuthService
 from server.player.player_repo import PlayerRepository
 from shared import yaml_loader
+from shared.chess_engine.opening_book import OpeningBook, SAMPLE_BOOK_PATH
 
 
 CONFIG_FILE = "server-config.yaml"
@@ -19,6 +21,11 @@ if __name__ == "__main__":
 
     config = yaml_loader.load(CONFIG_FILE, {
         "websocket-port": 80,
+        "opening-book": SAMPLE_BOOK_PATH,
+        "outbound-queue": {
+            "max-size": DEFAULT_MAX_QUEUE_SIZE,
+            "overflow-policy": "DISCONNECT"
+        },
         "db": {
             "username": "user",
             "password": "pass",
@@ -31,9 +38,16 @@ if __name__ == "__main__":
     db_conn = DBConnection(config["db"])
     player_repo = PlayerRepository(db_conn)
     auth_service = AuthService(player_repo)
-    game_room_service = GameRoomService(player_repo)
+    # Config files written before opening names were announced do not have the book path.
+    game_room_service = GameRoomService(player_repo, OpeningBook(config.get("opening-book", SAMPLE_BOOK_PATH)))
     message_broker = MessageBroker(auth_service, game_room_service)
-    connection_pool = ConnectionPool(message_broker)
+    # Config files written before outbound queues were added do not have their section.
+    queue_config = config.get("outbound-queue", {})
+    connection_pool = ConnectionPool(
+        message_broker,
+        queue_config.get("max-size", DEFAULT_MAX_QUEUE_SIZE),
+        OVERFLOW_POLICIES_BY_NAME[queue_config.get("overflow-policy", "DISCONNECT")]
+    )
 
     server = websockets.serve(connection_pool.handle_connection, port=config["websocket-port"])
     asyncio.get_event_loop().run_until_complete(server)
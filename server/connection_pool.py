@@ -2,19 +2,28 @@ import asyncio
 import logging
 import time
 from collections import OrderedDict
+from typing import Union
 
 from websockets import WebSocketServerProtocol
 
+from server.outbound_queue import OutboundQueue, OverflowPolicy, QueueMetrics, DEFAULT_MAX_QUEUE_SIZE
 from server.request import InvalidRequestException
 from server.message_broker import MessageBroker
 from server.player.player import Player
 
 
 class ConnectionPool:
-    def __init__(self, message_broker: MessageBroker):
+    def __init__(self, message_broker: MessageBroker, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.DISCONNECT):
         self._anonymous: OrderedDict[WebSocketServerProtocol, int] = OrderedDict()
         self._authenticated: dict[WebSocketServerProtocol, Player] = {}
         self._message_broker = message_broker
+        self._max_queue_size = max_queue_size
+        self._overflow_policy = overflow_policy
+
+    def queue_metrics(self) -> dict[str, QueueMetrics]:
+        """Outbound queue metrics of authenticated connections by nick."""
+        return {p.nick: p.outbound.metrics for p in self._authenticated.values() if p.outbound is not None}
 
     async def handle_connection(self, websocket: WebSocketServerProtocol, _: str = None):
         self._anonymous[websocket] = int(time.time())
@@ -25,8 +34,11 @@ class ConnectionPool:
             if websocket in self._anonymous:
                 self._anonymous.pop(websocket)
             else:
-                await self._message_broker.on_connection_closed(self._authenticated[websocket])
-                self._authenticated.pop(websocket)
+                player = self._authenticated.pop(websocket)
+                try:
+                    await self._message_broker.on_connection_closed(player)
+                finally:
+                    player.outbound.close()
 
     async def monitor_unauthenticated(self):
         while True:
@@ -46,13 +58,15 @@ class ConnectionPool:
 
             await asyncio.sleep(2)
 
-    async def on_message(self, message: str, websocket: WebSocketServerProtocol):
+    async def on_message(self, message: Union[str, bytes], websocket: WebSocketServerProtocol):
         logging.fatal(message)
         try:
             if websocket in self._anonymous:
                 player = await self._message_broker.on_anonymous_message(message, websocket)
                 if player:
                     self._anonymous.pop(websocket)
+                    player.outbound = OutboundQueue(websocket, self._max_queue_size, self._overflow_policy)
+                    player.outbound.start()
                     self._authenticated[websocket] = player
             else:
                 await self._message_broker.on_authenticated_message(message, self._authenticated[websocket])
@@ -0,0 +1,133 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Optional, Hashable
+
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.move import AbstractMove
+from shared.chess_engine.move_encoding import encode_move, decode_move
+from shared.chess_engine.opening_book import OpeningBook
+from shared.chess_engine.search import Searcher, DEFAULT_MAX_DEPTH
+from shared.chess_engine.transposition_table import TranspositionTable
+
+DEFAULT_MAX_PENDING = 64
+DEFAULT_TIME_LIMIT = 1.0
+DEFAULT_TRANSPOSITION_TABLE_MB = 32
+# Part of the time limit left for passing the position to a worker and the result back, and for the search to notice
+# its deadline on a busy machine. Starting a worker takes longer, which is why the pool should be warmed up.
+TRANSFER_MARGIN = 0.25
+
+# The searcher of a worker process, created once by _init_worker so that its transposition table is reused.
+_searcher: Optional[Searcher] = None
+
+
+def _init_worker(transposition_table_mb: float, opening_book_path: Optional[str]):
+    global _searcher
+    opening_book = OpeningBook(opening_book_path) if opening_book_path else None
+    _searcher = Searcher(TranspositionTable(transposition_table_mb), opening_book)
+
+
+def analyse_fen(fen: str, max_depth: int, time_limit: float) -> tuple[Optional[int], int, int, int, bool]:
+    """Runs in a worker process. The best move is returned packed by encode_move to keep the result small."""
+    if _searcher is None:
+        _init_worker(DEFAULT_TRANSPOSITION_TABLE_MB, None)
+
+    result = _searcher.search(ChessEngine.from_fen(fen), max_depth, time_limit)
+    best_move = None if result.best_move is None else encode_move(result.best_move)
+    return best_move, result.score, result.depth, result.nodes, result.from_book
+
+
+def _warm_up_worker():
+    """Does nothing: a worker is initialized by _init_worker when it starts."""
+
+
+class AnalysisResult:
+    def __init__(self, best_move: Optional[AbstractMove], score: int, depth: int, nodes: int, from_book: bool):
+        self.best_move = best_move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.from_book = from_book
+
+
+class AnalysisService:
+    """
+    Runs engine searches (bot moves, hints, post-game analysis) in a pool of worker processes, so that they do not
+    block the event loop which relays moves of all rooms. Positions are sent to workers as FEN strings.
+
+    At most max_pending requests are submitted to the pool at once; further ones wait for a free slot, which slows
+    down their callers instead of letting the pool queue grow without bounds. A request which times out or is
+    cancelled while its worker is searching keeps its slot until the search ends. Requests may be given an owner (e.g.
+    the game runner), so that all of them can be cancelled together when the game ends.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = DEFAULT_MAX_PENDING,
+                 transposition_table_mb: float = DEFAULT_TRANSPOSITION_TABLE_MB, opening_book_path: str = None):
+        self._workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(self._workers, initializer=_init_worker,
+                                             initargs=(transposition_table_mb, opening_book_path))
+        self._slots = asyncio.Semaphore(max_pending)
+        self._requests: dict[Hashable, set[asyncio.Task]] = {}
+
+    @property
+    def pending(self) -> int:
+        return sum(len(tasks) for tasks in self._requests.values())
+
+    async def warm_up(self):
+        """Starts the worker processes and their searchers, which otherwise delays the first requests."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_up_worker) for _ in range(self._workers)))
+
+    async def analyse(self, fen: str, owner: Hashable = None, time_limit: float = DEFAULT_TIME_LIMIT,
+                      max_depth: int = DEFAULT_MAX_DEPTH) -> AnalysisResult:
+        """
+        time_limit (in seconds) is the deadline of the whole request, including the time spent waiting for a free
+        slot. Raises asyncio.TimeoutError if the deadline passes before the search starts or before its result
+        arrives, and asyncio.CancelledError if the request is cancelled with cancel.
+        """
+        task = asyncio.ensure_future(self._analyse(fen, time_limit, max_depth))
+        tasks = self._requests.setdefault(owner, set())
+        tasks.add(task)
+        try:
+            return await task
+        finally:
+            tasks.discard(task)
+            if not tasks and self._requests.get(owner) is tasks:
+                del self._requests[owner]
+
+    def cancel(self, owner: Hashable):
+        """Cancels all pending requests of the owner. Searches already running in workers end with their time limit."""
+        for task in self._requests.pop(owner, set()):
+            task.cancel()
+
+    def shutdown(self):
+        for owner in list(self._requests):
+            self.cancel(owner)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _analyse(self, fen: str, time_limit: float, max_depth: int) -> AnalysisResult:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + time_limit
+        await asyncio.wait_for(self._slots.acquire(), time_limit)
+        search: Optional[Future] = None
+        try:
+            search_time = deadline - loop.time() - TRANSFER_MARGIN
+            if search_time <= 0:
+                raise asyncio.TimeoutError()
+
+            search = self._executor.submit(analyse_fen, fen, max_depth, search_time)
+            best_move, score, depth, nodes, from_book = await asyncio.wait_for(asyncio.wrap_future(search),
+                                                                               deadline - loop.time())
+        finally:
+            if search is None or search.done():
+                self._slots.release()
+            else:
+                # The worker cannot be stopped, so the slot is freed only when its search ends.
+                search.add_done_callback(lambda _: self._release_slot(loop))
+
+        return AnalysisResult(None if best_move is None else decode_move(best_move), score, depth, nodes, from_book)
+
+    def _release_slot(self, loop: asyncio.AbstractEventLoop):
+        """Called in a thread of the executor."""
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._slots.release)
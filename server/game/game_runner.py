@@ -2,10 +2,14 @@ import logging
 import random
 from typing import Optional, Coroutine, Callable
 
+from server.game.analysis_service import AnalysisService, AnalysisResult, DEFAULT_TIME_LIMIT
 from server.game.game_timer import GameTimer
+from server.game.legal_move_cache import LegalMoveCache, LEGAL_MOVE_CACHE
 from server.player.player import Player
-from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.chess_engine import ChessEngine, GameStatus
 from shared.chess_engine.move import AbstractMove
+from shared.chess_engine.move_history import HistoryType
+from shared.chess_engine.opening_book import OpeningBook
 from shared.chess_engine.piece import Team, opposite_team
 from shared.game.game_type import TIMES, GameType
 
@@ -19,25 +23,61 @@ class GameEndStatus:
 
 
 class MoveStatus:
-    def __init__(self, successful: bool, player_time_left: int, game_end_status: GameEndStatus = None):
+    def __init__(self, successful: bool, player_time_left: int, game_end_status: GameEndStatus = None,
+                 opening_name: str = None):
         self.successful = successful
         self.player_time_left = player_time_left
         self.game_end_status = game_end_status
+        # Name of the opening the move leads to, if the runner has an opening book and the move is in it.
+        self.opening_name = opening_name
+
+
+class ReplayStatus:
+    def __init__(self, applied_moves: int, illegal_ply: int = None, game_end_status: GameEndStatus = None):
+        self.applied_moves = applied_moves
+        self.illegal_ply = illegal_ply
+        self.game_end_status = game_end_status
+
+    @property
+    def successful(self) -> bool:
+        return self.illegal_ply is None
+
+
+def replay_moves(engine: ChessEngine, moves: list[AbstractMove],
+                 legal_move_cache: LegalMoveCache = LEGAL_MOVE_CACHE) -> Optional[int]:
+    """
+    Validates and processes moves one after another, without checking for the end of the game after each of them.
+    Returns the index of the first illegal move, if there is any; the moves before it stay processed.
+    """
+    for ply, move in enumerate(moves):
+        if not legal_move_cache.validate_move(engine, move):
+            return ply
+        engine.process_move(move)
+
+    return None
 
 
 class GameRunner:
-    def __init__(self):
+    def __init__(self, legal_move_cache: LegalMoveCache = LEGAL_MOVE_CACHE, opening_book: OpeningBook = None,
+                 analysis_service: AnalysisService = None):
         self.teams: dict[Player, Team] = {}
         self.game_type: Optional[GameType] = None
         self.timer: Optional[GameTimer] = None
         self._engine: Optional[ChessEngine] = None
         self._draw_offer: Optional[Player] = None
         self._on_time_end: Optional[Callable[[GameEndStatus], Coroutine]] = None
+        self._legal_move_cache = legal_move_cache
+        self._opening_book = opening_book
+        self._analysis_service = analysis_service
 
     @property
     def running(self) -> bool:
         return self._engine is not None
 
+    @property
+    def fen(self) -> Optional[str]:
+        return self._engine.to_fen() if self.running else None
+
     def start(self, player1: Player, player2: Player, game_type: GameType, on_time_end: Callable):
         if self.running:
             return
@@ -53,7 +93,7 @@ class GameRunner:
             self.teams[player1] = Team.BLACK
             self.teams[player2] = Team.WHITE
 
-        self._engine = ChessEngine()
+        self._engine = ChessEngine(history_type=HistoryType.COMPACT)
         self.timer = GameTimer(TIMES[game_type], self._on_team_time_end)
 
     def clean(self):
@@ -61,11 +101,24 @@ class GameRunner:
             self.timer.cancel()
             self.timer = None
 
+        if self._analysis_service:
+            self._analysis_service.cancel(self)
+
         self._engine = None
         self._draw_offer = None
         self.game_type = None
         self.teams = {}
 
+    async def analyse(self, time_limit: float = DEFAULT_TIME_LIMIT) -> Optional[AnalysisResult]:
+        """
+        Searches the current position in the analysis service, e.g. for a bot move or a hint. The search is cancelled
+        when the game ends. Repetitions before the position are not taken into account.
+        """
+        if not self.running or self._analysis_service is None:
+            return None
+
+        return await self._analysis_service.analyse(self._engine.to_fen(), self, time_limit)
+
     def on_surrender(self, player: Player) -> Optional[GameEndStatus]:
         if not self.running:
             return None
@@ -114,9 +167,12 @@ class GameRunner:
 
     def on_move(self, move: AbstractMove, player: Player) -> MoveStatus:
         if not self.running or self.teams[player] != self._engine.currently_moving_team \
-                or not self._engine.validate_move(move):
+                or not self._legal_move_cache.validate_move(self._engine, move):
             return MoveStatus(False, -1)
 
+        opening_name = None
+        if self._opening_book is not None:
+            opening_name = self._opening_book.opening_name(self._engine.position_hash, move)
         self._engine.process_move(move)
 
         game_type = self.game_type
@@ -124,17 +180,44 @@ class GameRunner:
 
         time_left = self.timer.next()
 
-        if self._engine.is_checkmate():
+        game_status = self._legal_move_cache.game_status(self._engine)
+        if game_status != GameStatus.ONGOING:
             self.clean()
-            return MoveStatus(True, time_left, GameEndStatus(False, player, opposite_player, game_type))
-        elif self._engine.is_tie():
-            self.clean()
-            return MoveStatus(True, time_left, GameEndStatus(True, player, opposite_player, game_type))
+            return MoveStatus(True, time_left, GameEndStatus(game_status.draw, player, opposite_player, game_type),
+                              opening_name)
 
         if self._draw_offer and self._draw_offer != player:
             self._draw_offer = None
 
-        return MoveStatus(True, time_left)
+        return MoveStatus(True, time_left, opening_name=opening_name)
+
+    def on_moves(self, moves: list[AbstractMove]) -> ReplayStatus:
+        """
+        Applies a whole sequence of moves of both players at once, e.g. to restore a game. The end of the game is
+        checked only in the final position and the timer is only passed to the team which is to move.
+        """
+        if not self.running:
+            return ReplayStatus(0, 0)
+
+        illegal_ply = replay_moves(self._engine, moves, self._legal_move_cache)
+        applied_moves = len(moves) if illegal_ply is None else illegal_ply
+        if applied_moves == 0:
+            return ReplayStatus(applied_moves, illegal_ply)
+
+        self._draw_offer = None
+        self.timer.restart(self._engine.currently_moving_team)
+
+        game_type = self.game_type
+        last_player = self._player_by_team(self._engine.currently_opposite_team())
+        opposite_player = self._opposite_player(last_player)
+        game_status = self._legal_move_cache.game_status(self._engine)
+        if game_status != GameStatus.ONGOING:
+            self.clean()
+            game_end_status = GameEndStatus(game_status.draw, last_player, opposite_player, game_type)
+        else:
+            game_end_status = None
+
+        return ReplayStatus(applied_moves, illegal_ply, game_end_status)
 
     async def _on_team_time_end(self, team: Team):
         if not self.running:
@@ -146,16 +229,17 @@ class GameRunner:
 
         self._draw_offer = None
         self.game_type = None
+        # Searches for the finished game are cancelled before its end is announced, so they free their slots at once.
+        if self._analysis_service:
+            self._analysis_service.cancel(self)
 
         if self._engine.has_sufficient_material(self.teams[opposite]):
             await self._on_time_end(GameEndStatus(False, opposite, player, game_type))
         else:
             await self._on_time_end(GameEndStatus(True, opposite, player, game_type))
 
-        self.timer.cancel()
-        self.teams = {}
-        self._engine = None
-        self.timer = None
+        # The time end callback may have already cleaned the runner up.
+        self.clean()
 
     def _opposite_player(self, player: Player) -> Player:
         return self._player_by_team(opposite_team(self.teams[player]))
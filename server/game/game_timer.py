@@ -1,18 +1,19 @@
-import asyncio
 import time
-from asyncio import Future
 from typing import Optional, Coroutine, Callable
 
+from server.game.timer_wheel import TimerWheel, TimerHandle, TIMER_WHEEL
 from shared.chess_engine.piece import Team, opposite_team
 
 FIRST_MOVE_TIME_MS = 30 * 1000
 
 
 class GameTimer:
-    def __init__(self, team_time: int, on_time_end: Callable[[Team], Coroutine]):
+    def __init__(self, team_time: int, on_time_end: Callable[[Team], Coroutine], timer_wheel: TimerWheel = TIMER_WHEEL):
         self.times_left: dict[Team, int] = {Team.WHITE: team_time, Team.BLACK: team_time}
         self.current_team: Optional[Team] = None
-        self._current_job: Optional[Future] = None
+        self._timer_wheel = timer_wheel
+        # Flag fall of the current team, moved on every move instead of creating a new sleeping task.
+        self._deadline: Optional[TimerHandle] = None
         self._move_start = 0
         self._is_first_move = False
         self._on_time_end = on_time_end
@@ -20,7 +21,6 @@ class GameTimer:
         self._start()
 
     def next(self) -> int:
-        self._current_job.cancel()
         now = time.time_ns()
 
         if self._is_first_move:
@@ -37,8 +37,26 @@ class GameTimer:
 
         return time_left
 
+    def restart(self, team: Team):
+        """
+        Passes the clock to the team, e.g. after moves of both teams have been replayed at once, without charging
+        anyone for the time passed since the last move.
+        """
+        self._is_first_move = False
+        self.current_team = team
+        self._move_start = time.time_ns()
+        self._measure(self.times_left[team])
+
+    def current_times(self) -> dict[Team, int]:
+        """Times left of both teams, including the time already taken by the current move."""
+        times = dict(self.times_left)
+        if not self._is_first_move:
+            times[self.current_team] -= (time.time_ns() - self._move_start) // 1_000_000
+
+        return times
+
     def cancel(self):
-        self._current_job.cancel()
+        self._timer_wheel.cancel(self._deadline)
 
     def _start(self):
         self._measure(FIRST_MOVE_TIME_MS)
@@ -46,8 +64,10 @@ class GameTimer:
         self.current_team = Team.WHITE
 
     def _measure(self, delay_ms: int):
-        self._current_job = asyncio.ensure_future(self._call_after_delay(delay_ms))
+        if self._deadline is None:
+            self._deadline = self._timer_wheel.schedule(delay_ms, self._on_deadline)
+        else:
+            self._timer_wheel.reschedule(self._deadline, delay_ms)
 
-    async def _call_after_delay(self, delay_ms: int):
-        await asyncio.sleep(delay_ms / 1000)
-        await self._on_time_end(self.current_team)
+    def _on_deadline(self) -> Coroutine:
+        return self._on_time_end(self.current_team)
@@ -0,0 +1,120 @@
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+from shared.chess_engine.chess_engine import ChessEngine, GameStatus
+from shared.chess_engine.chessboard import within_board
+from shared.chess_engine.move import AbstractMove, MoveType, Promotion, PromotionWithCapturing
+from shared.chess_engine.move_encoding import encode_move, decode_move
+
+# An entry, together with its key, takes about 250 bytes, so the default cache takes a few megabytes.
+DEFAULT_CACHE_SIZE = 10_000
+
+
+class LegalMoveCache:
+    """
+    Bounded LRU cache mapping a position to its legal moves, shared by all games of the process, so that positions
+    reached in many games (openings above all) are generated once. Moves are kept packed by encode_move, in an array
+    of 16-bit codes. A game runner takes both move validation and the game status from the cache, so in a cached
+    position no moves are generated at all.
+
+    Generating all moves of a position costs more than the engine spends validating a single move and finding any
+    legal one for the game status, so a position is cached only when its game status is evaluated for the second time
+    (in another game, as a rule). Until then the engine does both on its own.
+
+    Positions are identified by the engine's Zobrist hash, which covers everything legal moves depend on: pieces,
+    the moving team, castle rights and en passant availability. Repetition counts and the halfmove clock do not change
+    which moves are legal, so they are deliberately not a part of the key.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._moves: OrderedDict[int, array] = OrderedDict()
+        # Keys of positions reached once, emptied when it grows to max_size.
+        self._seen: set[int] = set()
+
+    def legal_move_codes(self, engine: ChessEngine) -> array:
+        codes = self._get(engine.position_hash)
+        if codes is None:
+            codes = self._add(engine)
+
+        return codes
+
+    def validate_move(self, engine: ChessEngine, move: AbstractMove) -> bool:
+        codes = self._get(engine.position_hash)
+        if codes is None:
+            return engine.validate_move(move)
+
+        code = _generated_move_code(move)
+        # Codes leave out the rook fields of castling and the captured field of en passant, which follow from the
+        # squares, so a move with other ones is rejected by comparing it with the decoded move.
+        return code is not None and code in codes and decode_move(code) == move
+
+    def game_status(self, engine: ChessEngine) -> GameStatus:
+        key = engine.position_hash
+        codes = self._get(key)
+        if codes is None:
+            if key not in self._seen:
+                if len(self._seen) >= self.max_size:
+                    self._seen.clear()
+                self._seen.add(key)
+                return engine.game_status()
+
+            codes = self._add(engine)
+
+        return engine.game_status(len(codes) > 0)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def clear(self):
+        self._moves.clear()
+        self._seen.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: int) -> Optional[array]:
+        codes = self._moves.get(key)
+        if codes is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._moves.move_to_end(key)
+
+        return codes
+
+    def _add(self, engine: ChessEngine) -> array:
+        key = engine.position_hash
+        codes = array("H", map(encode_move, engine.all_legal_moves()))
+        self._moves[key] = codes
+        self._seen.discard(key)
+        if len(self._moves) > self.max_size:
+            self._moves.popitem(last=False)
+
+        return codes
+
+
+def _generated_move_code(move: AbstractMove) -> Optional[int]:
+    """
+    Returns the code of the move in the form generated by the engine, which does not choose promotion pieces, or None
+    if the move leaves the board.
+    """
+    if not within_board(move.position_from) or not within_board(move.position_to):
+        return None
+    elif move.type == MoveType.PROMOTION:
+        move = Promotion(move.position_from, move.position_to)
+    elif move.type == MoveType.PROMOTION_WITH_CAPTURING:
+        move = PromotionWithCapturing(move.position_from, move.position_to)
+
+    return encode_move(move)
+
+
+# The cache shared by all game runners of the server process.
+LEGAL_MOVE_CACHE = LegalMoveCache()
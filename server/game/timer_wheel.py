@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Optional, Callable, Coroutine
+
+DEFAULT_TICK_MS = 10
+DEFAULT_WHEEL_SIZE = 64
+# With the defaults above, deadlines up to 64^4 ticks (over 46 hours) away are placed directly.
+DEFAULT_LEVELS = 4
+
+
+class TimerHandle:
+    def __init__(self, tick: int, callback: Callable[[], Optional[Coroutine]]):
+        self.tick = tick
+        self.callback = callback
+        # The slot which holds the handle, None if the timer is not scheduled.
+        self._slot: Optional[set] = None
+
+    @property
+    def scheduled(self) -> bool:
+        return self._slot is not None
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel shared by all game timers of the process. Level 0 has a slot per tick, every next
+    level has slots wheel_size times longer; a timer is put into the lowest level whose range reaches its deadline
+    and moved down as the wheel turns. Scheduling, rescheduling and cancelling a timer take constant time.
+
+    A single driver task (started with the first timer, stopped when none are left) advances the wheel every tick.
+    Callbacks of all timers expiring at once are called together; coroutines they return are awaited in one task.
+    """
+
+    def __init__(self, tick_ms: int = DEFAULT_TICK_MS, wheel_size: int = DEFAULT_WHEEL_SIZE,
+                 levels: int = DEFAULT_LEVELS, clock: Callable[[], float] = time.monotonic):
+        self._tick = tick_ms / 1000
+        self._wheel_size = wheel_size
+        self._levels = levels
+        self._clock = clock
+        self._origin = clock()
+        self._current_tick = 0
+        self._wheels: list[list[set[TimerHandle]]] = [[set() for _ in range(wheel_size)] for _ in range(levels)]
+        self._count = 0
+        self._driver: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, delay_ms: int, callback: Callable[[], Optional[Coroutine]]) -> TimerHandle:
+        handle = TimerHandle(0, callback)
+        self.reschedule(handle, delay_ms)
+        return handle
+
+    def reschedule(self, handle: TimerHandle, delay_ms: int):
+        """Moves the deadline of the timer, which may also have expired or been cancelled, delay_ms from now."""
+        if handle.scheduled:
+            handle._slot.discard(handle)
+        else:
+            if self._count == 0:
+                # Nothing is scheduled, so the wheel can skip the ticks passed while the driver was stopped.
+                self._current_tick = max(self._current_tick, self._now_tick())
+            self._count += 1
+
+        deadline = self._clock() + delay_ms / 1000
+        handle.tick = max(math.ceil((deadline - self._origin) / self._tick), self._current_tick + 1)
+        self._insert(handle)
+        self._start_driver()
+
+    def cancel(self, handle: TimerHandle):
+        if handle.scheduled:
+            handle._slot.discard(handle)
+            handle._slot = None
+            self._count -= 1
+
+    def advance(self):
+        """Turns the wheel up to the current time and calls the callbacks of expired timers."""
+        target = self._now_tick()
+        expired: list[TimerHandle] = []
+        while self._current_tick < target and self._count > len(expired):
+            expired.extend(self._next_tick())
+        if self._count == len(expired):
+            self._current_tick = max(self._current_tick, target)
+
+        if expired:
+            self._count -= len(expired)
+            self._deliver(expired)
+
+    def _now_tick(self) -> int:
+        return int((self._clock() - self._origin) / self._tick)
+
+    def _insert(self, handle: TimerHandle):
+        delta = handle.tick - self._current_tick
+        level = 0
+        span = self._wheel_size
+        while delta >= span and level < self._levels - 1:
+            level += 1
+            span *= self._wheel_size
+
+        # Deadlines beyond the top level wait in its farthest slot and are placed again when it is reached.
+        tick = min(handle.tick, self._current_tick + span - 1)
+        slot = self._wheels[level][tick // (span // self._wheel_size) % self._wheel_size]
+        slot.add(handle)
+        handle._slot = slot
+
+    def _next_tick(self) -> list[TimerHandle]:
+        self._current_tick += 1
+        tick = self._current_tick
+
+        # Timers of the slots of higher levels which begin at this tick are moved down, from the top level.
+        span = self._wheel_size
+        levels = []
+        for level in range(1, self._levels):
+            if tick % span:
+                break
+            levels.append((level, span))
+            span *= self._wheel_size
+        for level, span in reversed(levels):
+            index = tick // span % self._wheel_size
+            slot, self._wheels[level][index] = self._wheels[level][index], set()
+            for handle in slot:
+                self._insert(handle)
+
+        index = tick % self._wheel_size
+        expired, self._wheels[0][index] = self._wheels[0][index], set()
+        for handle in expired:
+            handle._slot = None
+
+        return list(expired)
+
+    def _deliver(self, expired: list[TimerHandle]):
+        coroutines = []
+        for handle in expired:
+            try:
+                result = handle.callback()
+            except Exception:
+                logging.exception("timer callback failed")
+                continue
+
+            if asyncio.iscoroutine(result):
+                coroutines.append(result)
+
+        if coroutines:
+            asyncio.ensure_future(self._await_all(coroutines))
+
+    @staticmethod
+    async def _await_all(coroutines: list[Coroutine]):
+        for result in await asyncio.gather(*coroutines, return_exceptions=True):
+            if isinstance(result, Exception):
+                logging.error("timer callback failed", exc_info=result)
+
+    def _start_driver(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        # A driver of another (e.g. closed) event loop cannot be reused.
+        if self._driver is None or self._driver.done() or self._driver.get_loop() is not loop:
+            self._driver = loop.create_task(self._drive())
+
+    async def _drive(self):
+        while self._count:
+            next_tick_time = self._origin + (self._current_tick + 1) * self._tick
+            await asyncio.sleep(max(0.0, next_tick_time - self._clock()))
+            self.advance()
+
+
+TIMER_WHEEL = TimerWheel()
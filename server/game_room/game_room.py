@@ -3,10 +3,27 @@ from __future__ import annotations
 import asyncio
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from typing import Optional
+from typing import Optional, Iterable
 
 from server.game.game_runner import GameRunner
+from server.game_room.spectators import SpectatorGroup
 from server.player.player import Player
+from shared.message.binary_codec import encode_frames
+from shared.message.message_code import MessageCode
+
+
+async def broadcast(players: Iterable[Player], message: dict, binary_message: dict = None):
+    """
+    Sends the message to all connected players, serializing it only once: to JSON, and to a binary frame if the
+    message has one and some recipient negotiated the binary protocol. binary_message is the message in the form
+    taken by encode_message, if it differs from the JSON one (as for moves).
+    """
+    recipients = [p for p in players if p.connected]
+    if not recipients:
+        return
+
+    message_str, frame = encode_frames(message, binary_message, any(p.binary_protocol for p in recipients))
+    await asyncio.gather(*[p.send_encoded(message_str, frame) for p in recipients])
 
 
 class GameRoomType(Enum):
@@ -17,9 +34,30 @@ class GameRoomType(Enum):
 class GameRoom(ABC):
     def __init__(self, game_runner: GameRunner):
         self.runner = game_runner
-
-    async def send(self, message: str):
-        await asyncio.gather(*[p.send(message) for p in self.players])
+        self.spectators = SpectatorGroup(self.snapshot)
+        # Set when the room is removed; the spectators are released after the next broadcast, which ends the game.
+        self.closed = False
+
+    async def broadcast(self, message: dict, binary_message: dict = None):
+        """Sends the message to the players and then queues it for the spectators, without waiting for them."""
+        await broadcast(self.players, message, binary_message)
+        self.spectators.publish(message, binary_message)
+        if self.closed:
+            self.spectators.close()
+
+    def snapshot(self) -> Optional[dict]:
+        """The current game for new and lagging spectators, None if no game is running."""
+        fen = self.runner.fen
+        if fen is None:
+            return None
+
+        return {
+            "code": MessageCode.GAME_SNAPSHOT.value,
+            "gameType": self.runner.game_type.value,
+            "teams": {t.value: p.as_response() for p, t in self.runner.teams.items()},
+            "fen": fen,
+            "times": {t.value: time_left for t, time_left in self.runner.timer.current_times().items()}
+        }
 
     @property
     @abstractmethod
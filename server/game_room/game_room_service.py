@@ -6,17 +6,20 @@ from typing import Optional, Coroutine
 
 from server.player.player_repo import PlayerRepository
 from server.request import InvalidRequestException, assert_in, parse_vector
-from server.game_room.game_room import RankedGameRoom, PrivateGameRoom, GameRoom, GameRoomType
+from server.game_room.game_room import RankedGameRoom, PrivateGameRoom, GameRoom, GameRoomType, broadcast
 from server.game.game_runner import GameRunner, GameEndStatus
 from server.player.player import Player
 from shared.chess_engine.move import MOVE_TYPES_BY_CODE, MoveType, Move, Capturing, Castling, EnPassant, Promotion, \
-    PromotionWithCapturing
+    PromotionWithCapturing, AbstractMove
+from shared.chess_engine.opening_book import OpeningBook
 from shared.chess_engine.piece import PIECE_TYPES_FROM_CODE
 from shared.chess_engine.position import Vector2d
 from shared.game.game_type import GameType, GAME_TYPES_BY_NAME
 from shared.game.ranking import PlayerScore, elo_change
 from shared.message.message_code import MessageCode
+from shared.message.move_message import move_to_message
 from shared.message.private_room_joining_status import PrivateRoomJoiningStatus
+from shared.message.spectating_status import SpectatingStatus
 
 NUM_OF_BUCKETS = 30
 ACCESS_KEY_LEN = 5
@@ -69,43 +72,72 @@ def _parse_promotion(move_message: dict, position_from: Vector2d, position_to: V
         return Promotion(position_from, position_to, piece_type)
 
 
+def _parse_move_message(move_message: dict) -> AbstractMove:
+    assert_in(move_message, ("type", int))
+    try:
+        move_type = MOVE_TYPES_BY_CODE[move_message["type"]]
+    except KeyError:
+        raise InvalidRequestException("unrecognized move type")
+    assert_in(move_message, ("positionFrom", list), ("positionTo", list))
+    position_from, position_to = parse_vector(move_message["positionFrom"]), parse_vector(move_message["positionTo"])
+
+    if move_type == MoveType.MOVE:
+        return _parse_move(position_from, position_to)
+    elif move_type == MoveType.CAPTURING:
+        return _parse_capturing(position_from, position_to)
+    elif move_type == MoveType.CASTLING:
+        return _parse_castling(move_message, position_from, position_to)
+    elif move_type == MoveType.EN_PASSANT:
+        return _parse_en_passant(move_message, position_from, position_to)
+    elif move_type == MoveType.PROMOTION:
+        return _parse_promotion(move_message, position_from, position_to)
+    else:
+        return _parse_promotion(move_message, position_from, position_to, True)
+
+
 class GameRoomService:
-    def __init__(self, player_repo: PlayerRepository):
+    def __init__(self, player_repo: PlayerRepository, opening_book: OpeningBook = None):
         self.player_repo = player_repo
+        # Shared by all games; if set, moves in the book are announced with the name of the opening they lead to.
+        self.opening_book = opening_book
         self.ranked_rooms: dict[Player, RankedGameRoom] = {}
         self.private_rooms_by_player: dict[Player, PrivateGameRoom] = {}
         self.private_rooms_by_access_key: dict[str, PrivateGameRoom] = {}
         self.ranked_queue: dict[GameType, list[set[Player]]] = {}
+        self.spectated_rooms: dict[Player, GameRoom] = {}
 
         for game_type in GameType:
             self.ranked_queue[game_type] = [set() for _ in range(NUM_OF_BUCKETS)]
 
     async def disconnect(self, player: Player):
+        if player in self.spectated_rooms:
+            self.spectated_rooms.pop(player).spectators.unsubscribe(player)
+
         for game_type, buckets in self.ranked_queue.items():
             elo_bucket = _elo_bucket(player, game_type)
             if player in buckets[elo_bucket]:
                 buckets[elo_bucket].remove(player)
                 return
 
-        message = json.dumps({
+        message = {
             "code": MessageCode.PLAYER_DISCONNECTED.value,
             "player": player.as_response()
-        })
+        }
 
         if player in self.ranked_rooms:
             room = self.ranked_rooms[player]
             game_end_status = room.runner.on_surrender(player)
             await self._remove_ranked(game_end_status)
-            await game_end_status.winner.send(message)
+            await room.broadcast(message)
         elif player in self.private_rooms_by_player:
             room = self.private_rooms_by_player[player]
 
             if player is room.host:
                 self._remove_private(room)
                 if room.guest:
-                    await room.guest.send(message)
+                    await broadcast([room.guest], message)
             else:
-                await room.host.send(message)
+                await broadcast([room.host], message)
 
     async def join_ranked_queue(self, message: dict, sender: Player):
         assert_in(message, ("gameType", str))
@@ -141,7 +173,7 @@ class GameRoomService:
             return
 
         access_key = self._generate_access_key()
-        room = PrivateGameRoom(sender, GameRunner(), access_key)
+        room = PrivateGameRoom(sender, GameRunner(opening_book=self.opening_book), access_key)
         self.private_rooms_by_access_key[access_key] = room
         self.private_rooms_by_player[sender] = room
 
@@ -182,16 +214,16 @@ class GameRoomService:
         self.private_rooms_by_player[sender] = room
         room.guest = sender
         await asyncio.gather(
-            room.guest.send(json.dumps({
+            broadcast([room.guest], {
                 "code": MessageCode.JOIN_PRIVATE_ROOM.value,
                 "status": PrivateRoomJoiningStatus.SUCCESS.value,
                 "accessKey": room.access_key,
                 "host": room.host.as_response()
-            })),
-            room.host.send(json.dumps({
+            }),
+            broadcast([room.host], {
                 "code": MessageCode.GUEST_JOINED_PRIVATE_ROOM.value,
                 "guest": room.guest.as_response()
-            }))
+            })
         )
 
     async def leave_private_room(self, _: dict, sender: Player):
@@ -209,15 +241,14 @@ class GameRoomService:
             room.guest = None
             self.private_rooms_by_player.pop(player_who_left)
 
-        message_str = json.dumps({
+        recipients = [room.host]
+        if guest:
+            recipients.append(guest)
+
+        await broadcast(recipients, {
             "code": MessageCode.LEAVE_PRIVATE_ROOM.value,
             "player": player_who_left.as_response()
         })
-        messages = [room.host.send(message_str)]
-        if guest:
-            messages.append(guest.send(message_str))
-
-        await asyncio.gather(*messages)
 
     async def kick_from_private_room(self, _: dict, sender: Player):
         try:
@@ -234,10 +265,9 @@ class GameRoomService:
         room.kicked.add(room.guest)
         room.guest = None
 
-        message_str = json.dumps({
+        await broadcast([room.host, guest], {
             "code": MessageCode.KICK_FROM_PRIVATE_ROOM.value
         })
-        await asyncio.gather(room.host.send(message_str), guest.send(message_str))
 
     async def start_private_game(self, message: dict, sender: Player):
         try:
@@ -259,11 +289,11 @@ class GameRoomService:
 
         room.runner.start(room.host, room.guest, game_type, self._on_private_time_end)
 
-        await room.send(json.dumps({
+        await room.broadcast({
             "code": MessageCode.START_PRIVATE_GAME.value,
             "gameType": game_type.value,
             "teams": {t.value: p.as_response() for p, t in room.runner.teams.items()}
-        }))
+        })
 
     async def surrender(self, _: dict, sender: Player):
         room = self._room_by_player(sender)
@@ -274,10 +304,10 @@ class GameRoomService:
         if room.type == GameRoomType.RANKED:
             await self._remove_ranked(game_end_status)
 
-        await room.send(json.dumps({
+        await room.broadcast({
             "code": MessageCode.GAME_SURRENDER.value,
             "player": sender.as_response()
-        }))
+        })
 
     async def offer_draw(self, _: dict, sender: Player):
         room = self._room_by_player(sender)
@@ -285,9 +315,9 @@ class GameRoomService:
             return
 
         if room.runner.on_draw_offer(sender):
-            await room.send(json.dumps({
+            await room.broadcast({
                 "code": MessageCode.GAME_OFFER_DRAW.value
-            }))
+            })
 
     async def respond_to_draw_offer(self, message: dict, sender: Player):
         room = self._room_by_player(sender)
@@ -302,10 +332,10 @@ class GameRoomService:
             if room.type == GameRoomType.RANKED:
                 await self._remove_ranked(game_end_status)
 
-        await room.send(json.dumps({
+        await room.broadcast({
             "code": MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value,
             "accepted": accepted
-        }))
+        })
 
     async def claim_draw(self, _: dict, sender: Player):
         room = self._room_by_player(sender)
@@ -319,10 +349,10 @@ class GameRoomService:
         if room.type == GameRoomType.RANKED:
             await self._remove_ranked(game_end_status)
 
-        await room.send(json.dumps({
+        await room.broadcast({
             "code": MessageCode.GAME_CLAIM_DRAW.value,
             "player": sender.as_response()
-        }))
+        })
 
     async def move(self, message: dict, sender: Player):
         room = self._room_by_player(sender)
@@ -331,28 +361,21 @@ class GameRoomService:
 
         assert_in(message, ("move", dict))
         move_message = message["move"]
-        assert_in(move_message, ("type", int))
+        await self._move(room, _parse_move_message(move_message), move_message, sender)
 
-        try:
-            move_type = MOVE_TYPES_BY_CODE[move_message["type"]]
-        except KeyError:
-            raise InvalidRequestException("unrecognized move type")
-        assert_in(move_message, ("positionFrom", list), ("positionTo", list))
-        position_from, position_to = parse_vector(move_message["positionFrom"]), parse_vector(move_message["positionTo"])
-
-        if move_type == MoveType.MOVE:
-            move = _parse_move(position_from, position_to)
-        elif move_type == MoveType.CAPTURING:
-            move = _parse_capturing(position_from, position_to)
-        elif move_type == MoveType.CASTLING:
-            move = _parse_castling(move_message, position_from, position_to)
-        elif move_type == MoveType.EN_PASSANT:
-            move = _parse_en_passant(move_message, position_from, position_to)
-        elif move_type == MoveType.PROMOTION:
-            move = _parse_promotion(move_message, position_from, position_to)
-        else:
-            move = _parse_promotion(move_message, position_from, position_to, True)
+    async def binary_move(self, message: dict, sender: Player):
+        """Handles GAME_MOVE sent as a binary frame, whose move is already decoded."""
+        room = self._room_by_player(sender)
+        if not room:
+            return
+
+        move = message["move"]
+        if move.type in (MoveType.PROMOTION, MoveType.PROMOTION_WITH_CAPTURING) and move.piece_type is None:
+            raise InvalidRequestException("unrecognized piece type")
 
+        await self._move(room, move, move_to_message(move), sender)
+
+    async def _move(self, room: GameRoom, move: AbstractMove, move_message: dict, sender: Player):
         move_status = room.runner.on_move(move, sender)
         if not move_status.successful:
             return
@@ -360,10 +383,49 @@ class GameRoomService:
         if move_status.game_end_status and room.type == GameRoomType.RANKED:
             await self._remove_ranked(move_status.game_end_status)
 
-        await room.send(json.dumps({
+        message = {
             "code": MessageCode.GAME_MOVE.value,
             "move": move_message,
             "timeLeft": move_status.player_time_left
+        }
+        if move_status.opening_name is not None:
+            message["openingName"] = move_status.opening_name
+
+        await room.broadcast(message, {**message, "move": move})
+
+    async def spectate(self, message: dict, sender: Player):
+        """Subscribes the sender to the live game of the player with the given nick."""
+        assert_in(message, ("nick", str))
+        if self._player_in_room_or_queue(sender):
+            return
+
+        room = self._room_by_nick(message["nick"])
+        if not room or not room.runner.running or room.closed:
+            await sender.send(json.dumps({
+                "code": MessageCode.SPECTATE.value,
+                "status": SpectatingStatus.GAME_NOT_EXIST.value
+            }))
+            return
+
+        if sender in self.spectated_rooms:
+            self.spectated_rooms.pop(sender).spectators.unsubscribe(sender)
+
+        self.spectated_rooms[sender] = room
+        room.spectators.subscribe(sender, {
+            **room.snapshot(),
+            "code": MessageCode.SPECTATE.value,
+            "status": SpectatingStatus.SUCCESS.value
+        })
+
+    async def stop_spectating(self, _: dict, sender: Player):
+        try:
+            room = self.spectated_rooms.pop(sender)
+        except KeyError:
+            return
+
+        room.spectators.unsubscribe(sender)
+        await sender.send(json.dumps({
+            "code": MessageCode.STOP_SPECTATING.value
         }))
 
     def _generate_access_key(self) -> str:
@@ -390,6 +452,12 @@ class GameRoomService:
         elif player in self.private_rooms_by_player:
             return self.private_rooms_by_player[player]
 
+    def _room_by_nick(self, nick: str) -> Optional[GameRoom]:
+        for rooms in (self.ranked_rooms, self.private_rooms_by_player):
+            for player, room in rooms.items():
+                if player.nick == nick:
+                    return room
+
     async def _remove_ranked(self, game_end_status: GameEndStatus):
         player1 = game_end_status.winner
         player2 = game_end_status.loser
@@ -413,12 +481,16 @@ class GameRoomService:
             self.player_repo.update_elo(player2.nick, player2.elo[game_type], game_type)
         )
 
-        self.ranked_rooms[game_end_status.winner].runner.clean()
+        room = self.ranked_rooms[game_end_status.winner]
+        room.runner.clean()
+        room.closed = True
         self.ranked_rooms.pop(game_end_status.winner)
         self.ranked_rooms.pop(game_end_status.loser)
 
     def _remove_private(self, room: PrivateGameRoom):
         room.runner.clean()
+        room.closed = True
+        room.spectators.close()
         self.private_rooms_by_player.pop(room.host)
         if room.guest:
             self.private_rooms_by_player.pop(room.guest)
@@ -426,35 +498,31 @@ class GameRoomService:
         self.private_rooms_by_access_key.pop(room.access_key)
 
     def _create_ranked(self, player1: Player, player2: Player, game_type: GameType) -> Coroutine:
-        room = RankedGameRoom(player1, player2, GameRunner())
+        room = RankedGameRoom(player1, player2, GameRunner(opening_book=self.opening_book))
         self.ranked_rooms[player1] = room
         self.ranked_rooms[player2] = room
         room.runner.start(player1, player2, game_type, self._on_ranked_time_end)
 
-        return room.send(json.dumps({
+        return room.broadcast({
             "code": MessageCode.JOINED_RANKED_ROOM.value,
             "gameType": game_type.value,
             "teams": {t.value: p.as_response() for p, t in room.runner.teams.items()}
-        }))
+        })
 
     async def _on_private_time_end(self, game_end_status: GameEndStatus):
-        message_str = json.dumps({
+        await self.private_rooms_by_player[game_end_status.winner].broadcast({
             "code": MessageCode.GAME_TIME_END.value
         })
-        await asyncio.gather(game_end_status.winner.send(message_str), game_end_status.loser.send(message_str))
         self.private_rooms_by_player[game_end_status.winner].runner.clean()
 
     async def _on_ranked_time_end(self, game_end_status: GameEndStatus):
         logging.fatal("end")
-        message_str = json.dumps({
+        room = self.ranked_rooms[game_end_status.winner]
+        await self._remove_ranked(game_end_status)
+        await room.broadcast({
             "code": MessageCode.GAME_TIME_END.value
         })
         logging.fatal("end")
-        await asyncio.gather(
-            game_end_status.winner.send(message_str),
-            game_end_status.loser.send(message_str),
-            self._remove_ranked(game_end_status))
-        logging.fatal("end")
 
     async def match_players(self):
         rooms: list[Coroutine] = []
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, Callable, Hashable
+
+from websockets import ConnectionClosed
+
+from server.player.player import Player
+from shared.message.binary_codec import encode_frames
+from shared.message.message_code import MessageCode
+
+# Spectators are given queued messages in batches of this size, with the event loop free to run other tasks (e.g.
+# relaying moves of other rooms) between batches.
+SPECTATOR_BATCH_SIZE = 256
+# A spectator with more queued messages (here and in its outbound queue) is degraded: instead of moves it gets
+# snapshots of the game.
+MAX_SPECTATOR_BACKLOG = 16
+# Seconds between snapshots sent to degraded spectators.
+SNAPSHOT_INTERVAL = 2.0
+# Seconds after which a degraded spectator who still has not received its last message is dropped.
+DROP_AFTER = 30.0
+
+
+class _Spectator:
+    def __init__(self, player: Player):
+        self.player = player
+        # Messages with their binary frames and coalesce keys.
+        self.backlog: deque[tuple[str, Optional[bytes], Optional[Hashable]]] = deque()
+        self.writer: Optional[asyncio.Task] = None
+        # Loop time at which the spectator was degraded, None if it receives moves.
+        self.degraded_since: Optional[float] = None
+
+
+class SpectatorGroup:
+    """
+    Spectators of a game room. Messages published to the group are queued and delivered by a background task, so
+    publishing never waits for spectators: players get their messages first and a slow spectator cannot delay them.
+
+    Every message is serialized once for all spectators and written by a per-spectator writer task. A spectator whose
+    backlog grows above max_backlog stops getting moves and instead gets a snapshot of the game (from the snapshot
+    callable) every snapshot_interval seconds, once its connection has caught up; then it gets moves again. A
+    spectator which does not catch up in drop_after seconds is unsubscribed.
+    """
+
+    def __init__(self, snapshot: Callable[[], Optional[dict]], batch_size: int = SPECTATOR_BATCH_SIZE,
+                 max_backlog: int = MAX_SPECTATOR_BACKLOG, snapshot_interval: float = SNAPSHOT_INTERVAL,
+                 drop_after: float = DROP_AFTER):
+        self._snapshot = snapshot
+        self._batch_size = batch_size
+        self._max_backlog = max_backlog
+        self._snapshot_interval = snapshot_interval
+        self._drop_after = drop_after
+        self._spectators: dict[Player, _Spectator] = {}
+        self._published: list[tuple[dict, Optional[dict]]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._spectators)
+
+    def __contains__(self, player: Player) -> bool:
+        return player in self._spectators
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def degraded(self) -> list[Player]:
+        return [s.player for s in self._spectators.values() if s.degraded_since is not None]
+
+    def subscribe(self, player: Player, first_message: dict):
+        """Adds the spectator. It gets first_message (e.g. a snapshot of the game) and then published messages."""
+        if self._closed:
+            return
+
+        self.unsubscribe(player)
+        spectator = _Spectator(player)
+        self._spectators[player] = spectator
+        self._enqueue(spectator, [encode_frames(first_message, binary=player.binary_protocol)])
+
+    def unsubscribe(self, player: Player):
+        spectator = self._spectators.pop(player, None)
+        if spectator is not None:
+            spectator.backlog.clear()
+
+    def publish(self, message: dict, binary_message: dict = None):
+        """Queues the message for all spectators; binary_message is as in encode_frames."""
+        if self._closed or not self._spectators:
+            return
+
+        self._published.append((message, binary_message))
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush())
+
+    def close(self):
+        """Unsubscribes all spectators, after they get the messages published so far and STOP_SPECTATING."""
+        if self._closed:
+            return
+
+        self.publish({"code": MessageCode.STOP_SPECTATING.value})
+        self._closed = True
+        if self._flush_task is None:
+            self._spectators.clear()
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            self._snapshot_task = None
+
+    async def _flush(self):
+        try:
+            while self._published:
+                published, self._published = self._published, []
+                binary = any(s.player.binary_protocol for s in self._spectators.values())
+                frames = [encode_frames(m, b, binary) for m, b in published]
+
+                spectators = list(self._spectators.values())
+                for i in range(0, len(spectators), self._batch_size):
+                    for spectator in spectators[i:i + self._batch_size]:
+                        if spectator.degraded_since is None and self._spectators.get(spectator.player) is spectator:
+                            self._enqueue(spectator, frames)
+                    await asyncio.sleep(0)
+        finally:
+            self._flush_task = None
+            if self._closed:
+                self._spectators.clear()
+
+    def _enqueue(self, spectator: _Spectator, frames: list[tuple[str, Optional[bytes]]], coalesce_key: Hashable = None):
+        if len(spectator.backlog) + spectator.player.pending + len(frames) > self._max_backlog:
+            self._degrade(spectator)
+            return
+
+        spectator.backlog.extend((message, frame, coalesce_key) for message, frame in frames)
+        if spectator.writer is None:
+            spectator.writer = asyncio.ensure_future(self._write(spectator))
+
+    async def _write(self, spectator: _Spectator):
+        try:
+            while spectator.backlog:
+                message, frame, coalesce_key = spectator.backlog.popleft()
+                await spectator.player.send_encoded(message, frame, coalesce_key)
+        except ConnectionClosed:
+            self._remove(spectator)
+        finally:
+            spectator.writer = None
+
+    def _degrade(self, spectator: _Spectator):
+        spectator.backlog.clear()
+        spectator.degraded_since = asyncio.get_running_loop().time()
+        if self._snapshot_task is None and not self._closed:
+            self._snapshot_task = asyncio.ensure_future(self._send_snapshots())
+
+    async def _send_snapshots(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await asyncio.sleep(self._snapshot_interval)
+                degraded = [s for s in self._spectators.values() if s.degraded_since is not None]
+                if not degraded:
+                    break
+
+                snapshot = self._snapshot()
+                frame = None if snapshot is None else encode_frames(snapshot, binary=False)
+                for spectator in degraded:
+                    if spectator.writer is not None or spectator.player.pending > 0:
+                        if loop.time() - spectator.degraded_since > self._drop_after:
+                            logging.info("dropping slow spectator " + spectator.player.nick)
+                            self._remove(spectator)
+                        continue
+
+                    spectator.degraded_since = None
+                    if frame is not None:
+                        # Snapshots replace each other in outbound queues which coalesce messages.
+                        self._enqueue(spectator, [frame], MessageCode.GAME_SNAPSHOT)
+        finally:
+            if self._snapshot_task is asyncio.current_task():
+                self._snapshot_task = None
+
+    def _remove(self, spectator: _Spectator):
+        if self._spectators.get(spectator.player) is spectator:
+            self.unsubscribe(spectator.player)
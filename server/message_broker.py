@@ -1,5 +1,5 @@
 import json
-from typing import Optional, Callable
+from typing import Optional, Callable, Union
 
 from websockets import WebSocketServerProtocol
 
@@ -7,11 +7,15 @@ from server.request import InvalidRequestException
 from server.game_room.game_room_service import GameRoomService
 from server.player.auth_service import AuthService
 from server.player.player import Player
+from shared.message.binary_codec import decode_message
 from shared.message.message_code import MessageCode
 
 
 def _message_to_json(message_str: str):
     message: dict
+    if not isinstance(message_str, str):
+        raise InvalidRequestException("expected a text message")
+
     try:
         message = json.loads(message_str)
     except ValueError:
@@ -23,6 +27,16 @@ def _message_to_json(message_str: str):
     return message
 
 
+def _message_from_binary(frame: bytes, sender: Player) -> dict:
+    if not sender.binary_protocol:
+        raise InvalidRequestException("binary protocol was not negotiated")
+
+    try:
+        return decode_message(frame)
+    except ValueError:
+        raise InvalidRequestException("cannot decode binary message")
+
+
 class MessageBroker:
     def __init__(self, auth_service: AuthService, game_room_service: GameRoomService):
         self._auth_service = auth_service
@@ -40,7 +54,15 @@ class MessageBroker:
             MessageCode.GAME_OFFER_DRAW.value: game_room_service.offer_draw,
             MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value: game_room_service.respond_to_draw_offer,
             MessageCode.GAME_CLAIM_DRAW.value: game_room_service.claim_draw,
-            MessageCode.GAME_MOVE.value: game_room_service.move
+            MessageCode.GAME_MOVE.value: game_room_service.move,
+            MessageCode.SPECTATE.value: game_room_service.spectate,
+            MessageCode.STOP_SPECTATING.value: game_room_service.stop_spectating
+        }
+        # Binary frames carry decoded moves rather than their dictionaries, so moves go to a separate handler.
+        self._binary_actions: dict[int, Callable] = {
+            MessageCode.GAME_OFFER_DRAW.value: game_room_service.offer_draw,
+            MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value: game_room_service.respond_to_draw_offer,
+            MessageCode.GAME_MOVE.value: game_room_service.binary_move
         }
 
     async def on_anonymous_message(self, message_str: str, websocket: WebSocketServerProtocol) -> Optional[Player]:
@@ -54,10 +76,16 @@ class MessageBroker:
         else:
             raise InvalidRequestException("Invalid message code")
 
-    async def on_authenticated_message(self, message_str: str, sender: Player):
-        message = _message_to_json(message_str)
+    async def on_authenticated_message(self, message_str: Union[str, bytes], sender: Player):
+        if isinstance(message_str, bytes):
+            message = _message_from_binary(message_str, sender)
+            actions = self._binary_actions
+        else:
+            message = _message_to_json(message_str)
+            actions = self._authenticated_actions
+
         try:
-            await self._authenticated_actions[message["code"]](message, sender)
+            await actions[message["code"]](message, sender)
         except KeyError:
             raise InvalidRequestException("Invalid message code")
 
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from collections import deque
+from enum import Enum, auto
+from typing import Optional, Hashable, Union
+
+from websockets import WebSocketServerProtocol, ConnectionClosed
+
+DEFAULT_MAX_QUEUE_SIZE = 256
+OVERFLOW_CLOSE_CODE = 1008
+
+
+class OverflowPolicy(Enum):
+    # The message which does not fit is dropped.
+    DROP = auto()
+    # The message replaces a queued one with the same coalesce key (e.g. an older snapshot); if there is none, it is
+    # dropped.
+    COALESCE = auto()
+    # The connection is closed: the client is too slow to follow its games.
+    DISCONNECT = auto()
+
+
+OVERFLOW_POLICIES_BY_NAME = {p.name: p for p in OverflowPolicy}
+
+
+class QueueMetrics:
+    def __init__(self, depth: int, max_depth: int, sent: int, dropped: int, coalesced: int):
+        self.depth = depth
+        self.max_depth = max_depth
+        self.sent = sent
+        self.dropped = dropped
+        self.coalesced = coalesced
+
+
+class OutboundQueue:
+    """
+    Bounded queue of messages to a single connection, written to the websocket by its own writer task. Putting a
+    message never waits for the client, so a slow connection cannot stall the handler of a request sent by someone
+    else; when the queue is full, the overflow policy decides what happens.
+    """
+
+    def __init__(self, websocket: WebSocketServerProtocol, max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.DISCONNECT):
+        self._websocket = websocket
+        self._max_size = max_size
+        self._overflow_policy = overflow_policy
+        self._messages: deque[tuple[Union[str, bytes], Optional[Hashable]]] = deque()
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+        self._max_depth = 0
+        self._sent = 0
+        self._dropped = 0
+        self._coalesced = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._messages)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def metrics(self) -> QueueMetrics:
+        return QueueMetrics(len(self._messages), self._max_depth, self._sent, self._dropped, self._coalesced)
+
+    def start(self):
+        if self._writer is None and not self._closed:
+            self._writer = asyncio.ensure_future(self._write())
+
+    def put(self, message: Union[str, bytes], coalesce_key: Hashable = None) -> bool:
+        """Queues the message; returns False if it was dropped."""
+        if self._closed:
+            self._dropped += 1
+            return False
+
+        if len(self._messages) >= self._max_size:
+            return self._overflow(message, coalesce_key)
+
+        self._messages.append((message, coalesce_key))
+        self._max_depth = max(self._max_depth, len(self._messages))
+        self._ready.set()
+        return True
+
+    def close(self):
+        """Stops the writer; queued messages are discarded."""
+        self._closed = True
+        self._messages.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._writer = None
+
+    def _overflow(self, message: Union[str, bytes], coalesce_key: Optional[Hashable]) -> bool:
+        if self._overflow_policy == OverflowPolicy.COALESCE and coalesce_key is not None:
+            for i, (_, key) in enumerate(self._messages):
+                if key == coalesce_key:
+                    # The newer message goes to the end of the queue, so that it is not sent before older ones.
+                    del self._messages[i]
+                    self._messages.append((message, coalesce_key))
+                    self._coalesced += 1
+                    return True
+
+        self._dropped += 1
+        if self._overflow_policy == OverflowPolicy.DISCONNECT:
+            logging.info("outbound queue overflow, closing connection")
+            self.close()
+            asyncio.ensure_future(self._websocket.close(code=OVERFLOW_CLOSE_CODE, reason="outbound queue overflow"))
+
+        return False
+
+    async def _write(self):
+        while True:
+            while not self._messages:
+                self._ready.clear()
+                await self._ready.wait()
+
+            message, _ = self._messages.popleft()
+            try:
+                await self._websocket.send(message)
+            except ConnectionClosed:
+                self.close()
+                return
+
+            self._sent += 1
@@ -12,6 +12,7 @@ from server.player.player import Player, DEFAULT_ELO
 from server.player.player_repo import PlayerModel
 from shared.game.game_type import GameType
 from shared.message.auth_status import AuthStatus
+from shared.message.binary_codec import BINARY_PROTOCOL_VERSION
 from shared.message.message_code import MessageCode
 
 
@@ -59,11 +60,13 @@ class AuthService:
         )
 
         player = Player(nick, elo, websocket)
-        await websocket.send(json.dumps({
+        response = {
             "code": MessageCode.SIGN_UP.value,
             "status": AuthStatus.SUCCESS.value,
             "player": player.as_response()
-        }))
+        }
+        _negotiate_protocol(message, player, response)
+        await websocket.send(json.dumps(response))
         return player
 
     async def sign_in(self, message: dict, websocket: WebSocketServerProtocol) -> Optional[Player]:
@@ -91,14 +94,22 @@ class AuthService:
             return None
 
         player = Player(model.nick, model.elo, websocket)
-        await websocket.send(json.dumps({
+        response = {
             "code": MessageCode.SIGN_IN.value,
             "status": AuthStatus.SUCCESS.value,
             "player": player.as_response()
-        }))
+        }
+        _negotiate_protocol(message, player, response)
+        await websocket.send(json.dumps(response))
         return player
 
 
+def _negotiate_protocol(message: dict, player: Player, response: dict):
+    if message.get("binaryProtocol") == BINARY_PROTOCOL_VERSION:
+        player.binary_protocol = True
+        response["binaryProtocol"] = BINARY_PROTOCOL_VERSION
+
+
 def nick_valid(nick: str) -> bool:
     return NICK_REGEX.match(nick) is not None
 
@@ -1,6 +1,9 @@
 from __future__ import annotations
+from typing import Optional, Hashable, Union
+
 from websockets import WebSocketServerProtocol
 
+from server.outbound_queue import OutboundQueue
 from shared.game.game_type import GameType
 
 
@@ -12,9 +15,30 @@ class Player:
         self.nick = nick
         self.elo = elo
         self._connection = connection
-
-    async def send(self, message: str):
-        await self._connection.send(message)
+        # Whether the player negotiated the binary framing of hot game messages (see shared.message.binary_codec).
+        self.binary_protocol = False
+        # Set by the connection pool once the player is authenticated; messages are then sent by its writer task.
+        self.outbound: Optional[OutboundQueue] = None
+
+    @property
+    def connected(self) -> bool:
+        return not self._connection.closed and (self.outbound is None or not self.outbound.closed)
+
+    @property
+    def pending(self) -> int:
+        """Number of messages queued for the player and not yet written to the connection."""
+        return 0 if self.outbound is None else self.outbound.depth
+
+    async def send(self, message: Union[str, bytes], coalesce_key: Hashable = None):
+        """Queues the message if the player has an outbound queue, which makes it return at once."""
+        if self.outbound is not None:
+            self.outbound.put(message, coalesce_key)
+        else:
+            await self._connection.send(message)
+
+    async def send_encoded(self, message: str, binary_message: bytes = None, coalesce_key: Hashable = None):
+        """Sends the binary form of the message if there is one and the player negotiated it, the JSON one otherwise."""
+        await self.send(binary_message if binary_message is not None and self.binary_protocol else message, coalesce_key)
 
     def as_response(self) -> dict:
         return {
@@ -0,0 +1,106 @@
+from typing import Union
+
+from shared.chess_engine.attack_tables import RAYS, KNIGHT_TARGETS, KING_TARGETS, PAWN_ATTACKS
+from shared.chess_engine.chessboard import Chessboard
+from shared.chess_engine.bitboard import BitboardChessboard
+from shared.chess_engine.piece import Team, Piece, PieceType
+from shared.chess_engine.position import Vector2d, square_index, square_position
+
+
+class AttackMap:
+    """
+    Keeps the set of attacked fields of both teams up to date. For every field it remembers which pieces attack it,
+    and for every piece - which fields it attacks, so after a move only the pieces whose attacks could have changed
+    are recomputed: the pieces which were moved and the pieces attacking any of the fields changed by the move.
+
+    Sliding pieces 'see through' the king of the opposite team, so that the king cannot escape along the line of
+    an attack.
+    """
+
+    def __init__(self, board: Union[Chessboard, BitboardChessboard]):
+        self._board = board
+        self._attackers: list[set[Piece]] = [set() for _ in range(64)]
+        self._attacked_squares: dict[Piece, list[int]] = {}
+        self._counts: dict[Team, list[int]] = {Team.WHITE: [0] * 64, Team.BLACK: [0] * 64}
+        self._mobility: dict[Team, int] = {Team.WHITE: 0, Team.BLACK: 0}
+
+        for team in (Team.WHITE, Team.BLACK):
+            for piece in board.pieces[team].all:
+                self._add(piece)
+
+    def is_attacked(self, position: Vector2d, by_team: Team) -> bool:
+        return self._counts[by_team][square_index(position)] > 0
+
+    def attack_count(self, position: Vector2d, by_team: Team) -> int:
+        return self._counts[by_team][square_index(position)]
+
+    def mobility(self, team: Team) -> int:
+        """Number of fields attacked or defended by knights, bishops, rooks and queens, counted for every piece."""
+        return self._mobility[team]
+
+    def attackers(self, position: Vector2d, team: Team) -> list[Piece]:
+        return [p for p in self._attackers[square_index(position)] if p.team == team]
+
+    def attacked_fields(self, team: Team) -> set[Vector2d]:
+        return {square_position(s) for s, count in enumerate(self._counts[team]) if count > 0}
+
+    def update(self, changed_fields: list[Vector2d], removed_pieces: list[Piece]):
+        """
+        Must be called after the board has been changed. changed_fields are all fields whose content has changed
+        and removed_pieces are pieces which are no longer on the board (captured pawns, promoted pawns).
+        """
+        for piece in removed_pieces:
+            self._remove(piece)
+
+        affected: set[Piece] = set()
+        for position in changed_fields:
+            affected.update(self._attackers[square_index(position)])
+            piece = self._board.piece_at(position)
+            if piece:
+                affected.add(piece)
+
+        for piece in affected:
+            self._remove(piece)
+            self._add(piece)
+
+    def _add(self, piece: Piece):
+        squares = self._compute_attacked_squares(piece)
+        self._attacked_squares[piece] = squares
+        if piece.type not in (PieceType.PAWN, PieceType.KING):
+            self._mobility[piece.team] += len(squares)
+        counts = self._counts[piece.team]
+        for square in squares:
+            self._attackers[square].add(piece)
+            counts[square] += 1
+
+    def _remove(self, piece: Piece):
+        squares = self._attacked_squares.pop(piece, None)
+        if squares is None:
+            return
+
+        if piece.type not in (PieceType.PAWN, PieceType.KING):
+            self._mobility[piece.team] -= len(squares)
+        counts = self._counts[piece.team]
+        for square in squares:
+            self._attackers[square].discard(piece)
+            counts[square] -= 1
+
+    def _compute_attacked_squares(self, piece: Piece) -> list[int]:
+        square = square_index(piece.position)
+
+        if piece.type == PieceType.PAWN:
+            return [square_index(pos) for pos in PAWN_ATTACKS[piece.team][square]]
+        elif piece.type == PieceType.KNIGHT:
+            return [square_index(pos) for pos in KNIGHT_TARGETS[square]]
+        elif piece.type == PieceType.KING:
+            return [square_index(pos) for pos in KING_TARGETS[square]]
+
+        squares: list[int] = []
+        for ray in RAYS[piece.type][square]:
+            for new_pos in ray:
+                squares.append(square_index(new_pos))
+                piece_at = self._board.piece_at(new_pos)
+                if piece_at and (piece_at.team == piece.team or piece_at.type != PieceType.KING):
+                    break
+
+        return squares
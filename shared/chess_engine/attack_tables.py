@@ -0,0 +1,46 @@
+from shared.chess_engine.chessboard import within_board, SECOND_RANK
+from shared.chess_engine.piece import PieceType, Team, Pawn, Knight, Bishop, Rook, Queen
+from shared.chess_engine.position import Vector2d, square_position
+
+# All tables are lists indexed by square_index of the field a piece stands on and are built once, at import time,
+# so that move generators do not need to add vectors and check board bounds field by field.
+
+
+def _ray(square: int, vector: Vector2d) -> tuple[Vector2d, ...]:
+    fields = []
+    pos = square_position(square) + vector
+    while within_board(pos):
+        fields.append(pos)
+        pos += vector
+
+    return tuple(fields)
+
+
+def _rays(square: int, vectors: list[Vector2d]) -> tuple[tuple[Vector2d, ...], ...]:
+    return tuple(ray for ray in (_ray(square, vector) for vector in vectors) if ray)
+
+
+def _targets(square: int, vectors: list[Vector2d]) -> tuple[Vector2d, ...]:
+    position = square_position(square)
+    return tuple(position + vector for vector in vectors if within_board(position + vector))
+
+
+def _pawn_pushes(square: int, team: Team) -> tuple[Vector2d, ...]:
+    pushes = _ray(square, Pawn.moves[team][0])[:2]
+    return pushes if square_position(square).y == SECOND_RANK[team] else pushes[:1]
+
+
+# RAYS[piece_type][square] holds, for every direction the sliding piece moves in, the fields from the nearest to the
+# farthest one. Directions leading straight off the board are left out.
+RAYS: dict[PieceType, list[tuple[tuple[Vector2d, ...], ...]]] = {
+    PieceType.BISHOP: [_rays(s, Bishop.moves) for s in range(64)],
+    PieceType.ROOK: [_rays(s, Rook.moves) for s in range(64)],
+    PieceType.QUEEN: [_rays(s, Queen.moves) for s in range(64)]
+}
+KNIGHT_TARGETS: list[tuple[Vector2d, ...]] = [_targets(s, Knight.moves) for s in range(64)]
+KING_TARGETS: list[tuple[Vector2d, ...]] = [_targets(s, Queen.moves) for s in range(64)]
+# Fields a pawn attacks and fields it moves to without capturing: one or, from the second rank, two.
+PAWN_ATTACKS: dict[Team, list[tuple[Vector2d, ...]]] = {
+    team: [_targets(s, Pawn.attacks[team]) for s in range(64)] for team in Team
+}
+PAWN_PUSHES: dict[Team, list[tuple[Vector2d, ...]]] = {team: [_pawn_pushes(s, team) for s in range(64)] for team in Team}
@@ -0,0 +1,116 @@
+from typing import Optional
+
+from shared.chess_engine.chessboard import within_board
+from shared.chess_engine.piece import Team, Piece, PieceType, PlayerPieceSet
+from shared.chess_engine.position import Vector2d, square_index
+
+# Bit n of a bitboard corresponds to the field (n % 8, n // 8), so the board is filled rank by rank starting from
+# the white side.
+DIRECTIONS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+
+def square_mask(position: Vector2d) -> int:
+    return 1 << square_index(position)
+
+
+def lowest_square(bitboard: int) -> int:
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def highest_square(bitboard: int) -> int:
+    return bitboard.bit_length() - 1
+
+
+def _ray_mask(square: int, direction: tuple[int, int]) -> int:
+    x, y = square % 8 + direction[0], square // 8 + direction[1]
+    mask = 0
+    while 0 <= x < 8 and 0 <= y < 8:
+        mask |= 1 << (y * 8 + x)
+        x, y = x + direction[0], y + direction[1]
+
+    return mask
+
+
+def _between_mask(square_1: int, square_2: int) -> int:
+    for direction in DIRECTIONS:
+        ray = RAYS[square_1][direction]
+        if ray >> square_2 & 1:
+            return ray & ~RAYS[square_2][direction] & ~(1 << square_2)
+
+    return 0
+
+
+# RAYS[square][direction] is a mask of all fields in the given direction, excluding the square itself.
+RAYS: list[dict[tuple[int, int], int]] = [{d: _ray_mask(s, d) for d in DIRECTIONS} for s in range(64)]
+# BETWEEN[square_1][square_2] is a mask of fields lying strictly between two squares on the same line, 0 otherwise.
+BETWEEN: list[list[int]] = [[_between_mask(s1, s2) for s2 in range(64)] for s1 in range(64)]
+
+
+class BitboardChessboard:
+    """
+    Chessboard keeping a 64-bit occupancy mask for every piece type of both teams. It exposes the same interface as
+    Chessboard, but line queries are answered with precomputed masks instead of walking the board field by field.
+    Move generation still reads single fields, which is faster on Chessboard, so that one is used by default.
+    """
+
+    def __init__(self, pieces: list[Piece]):
+        self._squares: list[Optional[Piece]] = [None] * 64
+        self.bitboards: dict[Team, dict[PieceType, int]] = {team: {t: 0 for t in PieceType} for team in Team}
+        self.occupancy: dict[Team, int] = {Team.WHITE: 0, Team.BLACK: 0}
+        self.occupied = 0
+        self.pieces: dict[Team, PlayerPieceSet] = {Team.WHITE: PlayerPieceSet(), Team.BLACK: PlayerPieceSet()}
+        for piece in pieces:
+            self.set_piece(piece)
+
+    def piece_at(self, position: Vector2d) -> Optional[Piece]:
+        if not within_board(position):
+            raise KeyError(position)
+
+        return self._squares[position.index]
+
+    def remove_piece(self, position: Vector2d):
+        piece = self.piece_at(position)
+        self._clear(square_index(position), piece)
+        self.pieces[piece.team].remove(piece)
+
+    def set_piece(self, piece: Piece):
+        self._place(square_index(piece.position), piece)
+        self.pieces[piece.team].add(piece)
+
+    def move(self, pos_from: Vector2d, pos_to: Vector2d):
+        piece = self.piece_at(pos_from)
+        self._clear(square_index(pos_from), piece)
+        self._place(square_index(pos_to), piece)
+        piece.position = pos_to
+
+    def any_piece_between(self, pos_1: Vector2d, pos_2: Vector2d) -> bool:
+        """Method assumes that pos_1 and pos_2 are on the same line."""
+        return BETWEEN[square_index(pos_1)][square_index(pos_2)] & self.occupied != 0
+
+    def next_piece_on_line(self, pos_1: Vector2d, pos_2: Vector2d) -> Optional[Piece]:
+        """Method assumes that pos_1 and pos_2 are on the same line."""
+        dx, dy = pos_2.x - pos_1.x, pos_2.y - pos_1.y
+        direction = ((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))
+        blockers = RAYS[square_index(pos_2)][direction] & self.occupied
+        if not blockers:
+            return None
+
+        # Rays pointing 'up' the board go towards higher bits, so the closest blocker is the lowest set bit.
+        if direction[1] > 0 or (direction[1] == 0 and direction[0] > 0):
+            return self._squares[lowest_square(blockers)]
+        else:
+            return self._squares[highest_square(blockers)]
+
+    def _place(self, square: int, piece: Piece):
+        bit = 1 << square
+        self._squares[square] = piece
+        self.bitboards[piece.team][piece.type] |= bit
+        self.occupancy[piece.team] |= bit
+        self.occupied |= bit
+
+    def _clear(self, square: int, piece: Piece):
+        bit = ~(1 << square)
+        self._squares[square] = None
+        self.bitboards[piece.team][piece.type] &= bit
+        self.occupancy[piece.team] &= bit
+        self.occupied &= bit
@@ -1,12 +1,49 @@
-from typing import Optional
+from __future__ import annotations
 
-from shared.chess_engine.chessboard import Chessboard, on_same_color, within_board, SECOND_RANK, unit_vector_to, \
-    on_same_line, is_between, on_same_diagonal, on_same_row, FIRST_RANK
+from array import array
+from enum import Enum, auto
+from typing import Optional, Union, Hashable
+
+from shared.chess_engine.attack_map import AttackMap
+from shared.chess_engine.attack_tables import RAYS, KNIGHT_TARGETS, KING_TARGETS, PAWN_ATTACKS, PAWN_PUSHES
+from shared.chess_engine.bitboard import BitboardChessboard
+from shared.chess_engine.chessboard import Chessboard, BoardType, on_same_color, within_board, SECOND_RANK, \
+    unit_vector_to, FIRST_RANK
 from shared.chess_engine.move import AbstractMove, MoveType, Promotion, Move, PromotionWithCapturing, Capturing, \
     EnPassant, Castling
-from shared.chess_engine.move_history import MoveHistory, BoardSnapshot, CastleRight
+from shared.chess_engine.move_history import MoveHistory, BoardSnapshot, CastleRight, HistoryType, \
+    CompactMoveHistory
 from shared.chess_engine.piece import Piece, PieceType, Team, Knight, Pawn, Bishop, Rook, King, Queen
-from shared.chess_engine.position import Vector2d, distance_y
+from shared.chess_engine.piece_square_tables import PieceSquareScore
+from shared.chess_engine.fen import parse_fen, format_fen
+from shared.chess_engine.position import Vector2d, distance_y, centre, square_index, LEFT, RIGHT
+from shared.chess_engine.zobrist import PositionHashing, SIDE_KEY, piece_key, position_key, castle_rights_key, \
+    en_passant_key
+
+
+# Piece types a pawn may promote to.
+PROMOTION_PIECE_TYPES = (PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT)
+
+# Moving a rook from its initial field or capturing anything there loses the corresponding castle right.
+CASTLE_RIGHTS_BY_ROOK_FIELD = {
+    Vector2d(0, FIRST_RANK[Team.WHITE]): (Team.WHITE, CastleRight.LONG),
+    Vector2d(7, FIRST_RANK[Team.WHITE]): (Team.WHITE, CastleRight.SHORT),
+    Vector2d(0, FIRST_RANK[Team.BLACK]): (Team.BLACK, CastleRight.LONG),
+    Vector2d(7, FIRST_RANK[Team.BLACK]): (Team.BLACK, CastleRight.SHORT)
+}
+
+
+class GameStatus(Enum):
+    ONGOING = auto()
+    CHECKMATE = auto()
+    STALEMATE = auto()
+    INSUFFICIENT_MATERIAL = auto()
+    FIVEFOLD_REPETITION = auto()
+    SEVENTY_FIVE_MOVES = auto()
+
+    @property
+    def draw(self) -> bool:
+        return self not in (GameStatus.ONGOING, GameStatus.CHECKMATE)
 
 
 class CheckStatus:
@@ -27,75 +64,279 @@ class CheckStatus:
         return self.checking_piece_1 is not None and self.checking_piece_2 is not None
 
 
+class UndoRecord:
+    """Everything make_move changes which cannot be recomputed from the move itself."""
+
+    __slots__ = ("move", "moving_piece", "moving_piece_had_moved", "captured_piece", "rook_had_moved",
+                 "castle_rights", "en_passant_target", "en_passant_file", "halfmove_clock", "position",
+                 "position_hash", "piece_square_score", "checking_pieces", "legal_moves", "legal_moves_by_field",
+                 "legal_move_set", "evasion_fields", "pin_rays", "counted_keys")
+
+    def __init__(self, move: AbstractMove, moving_piece: Piece, captured_piece: Optional[Piece],
+                 rook_had_moved: bool):
+        self.move = move
+        self.moving_piece = moving_piece
+        self.moving_piece_had_moved = moving_piece.has_moved
+        self.captured_piece = captured_piece
+        self.rook_had_moved = rook_had_moved
+        self.castle_rights: dict[Team, CastleRight] = {}
+        self.en_passant_target: Optional[Vector2d] = None
+        self.en_passant_file: Optional[int] = None
+        self.halfmove_clock = 0
+        self.position: Optional[Hashable] = None
+        self.position_hash = 0
+        self.piece_square_score = (0, 0, 0)
+        self.checking_pieces: tuple[Optional[Piece], Optional[Piece]] = (None, None)
+        self.legal_moves: Optional[list[AbstractMove]] = None
+        self.legal_moves_by_field: dict[Vector2d, list[AbstractMove]] = {}
+        self.legal_move_set: set[AbstractMove] = set()
+        self.evasion_fields: Optional[set[Vector2d]] = None
+        self.pin_rays: Optional[dict[Vector2d, set[Vector2d]]] = None
+        self.counted_keys: Optional[array] = None
+
+
 class ChessEngine:
-    def __init__(self, pieces: list[Piece] = None, move_history: list[AbstractMove] = None):
-        self.move_history = MoveHistory(move_history)
-        self.board = Chessboard(pieces or _init_pieces())
-        self.currently_moving_team = self._init_currently_moving_team()
+    def __init__(self, pieces: list[Piece] = None, move_history: list[AbstractMove] = None,
+                 board_type: BoardType = BoardType.DICT, hashing: PositionHashing = PositionHashing.ZOBRIST,
+                 currently_moving_team: Team = None, castle_rights: dict[Team, CastleRight] = None,
+                 en_passant_target: Vector2d = None, halfmove_clock: int = None, fullmove_number: int = None,
+                 history_type: HistoryType = HistoryType.FULL):
+        """
+        The currently moving team, castle rights and en passant target are inferred from the move history and
+        has_moved flags of the pieces, unless they are given explicitly (see from_fen).
+        """
+        if history_type == HistoryType.COMPACT:
+            if hashing != PositionHashing.ZOBRIST:
+                raise RuntimeError("Compact move history requires Zobrist hashing")
+            self.move_history = CompactMoveHistory(move_history, halfmove_clock)
+        else:
+            self.move_history = MoveHistory(move_history, halfmove_clock)
+        self.board = _create_board(board_type, pieces or _init_pieces())
+        self.hashing = hashing
+        self.attack_map = AttackMap(self.board)
+        self.currently_moving_team = currently_moving_team or self._init_currently_moving_team()
+        self.castle_rights = castle_rights or self._init_castle_rights()
+        self.en_passant_target = en_passant_target or self._init_en_passant_target()
+        self.fullmove_number = fullmove_number or 1 + len(self.move_history) // 2
         self.check_status = self._init_check_status()
-        self.move_history.add_snapshot(self._board_snapshot())
+        self._legal_moves: Optional[list[AbstractMove]] = None
+        self._legal_moves_by_field: dict[Vector2d, list[AbstractMove]] = {}
+        self._legal_move_set: set[AbstractMove] = set()
+        self._evasion_fields: Optional[set[Vector2d]] = None
+        # None until moves are first generated in the position.
+        self._pin_rays: Optional[dict[Vector2d, set[Vector2d]]] = None
+        self._game_status: Optional[GameStatus] = None
+        self._undo_stack: list[UndoRecord] = []
+        self._current_en_passant_file = self._en_passant_file()
+        self.position_hash = position_key(
+            self.board.pieces[Team.WHITE].all + self.board.pieces[Team.BLACK].all,
+            self.currently_moving_team,
+            self.castle_rights,
+            self._current_en_passant_file
+        )
+        self.piece_square_score = PieceSquareScore(
+            self.board.pieces[Team.WHITE].all + self.board.pieces[Team.BLACK].all
+        )
+        self._add_current_position()
 
-    def available_moves(self, piece_at: Vector2d) -> list[AbstractMove]:
-        piece = self.board.piece_at(piece_at)
-        if piece is None:
-            return []
+    @classmethod
+    def from_fen(cls, fen: str, board_type: BoardType = BoardType.DICT,
+                 hashing: PositionHashing = PositionHashing.ZOBRIST,
+                 history_type: HistoryType = HistoryType.FULL) -> ChessEngine:
+        position = parse_fen(fen)
+        return cls(position.pieces, [], board_type, hashing, position.currently_moving_team, position.castle_rights,
+                   position.en_passant_target, position.halfmove_clock, position.fullmove_number, history_type)
 
-        if not piece.team == self.currently_moving_team:
-            return []
+    def to_fen(self) -> str:
+        return format_fen(self.board, self.currently_moving_team, self.castle_rights, self.en_passant_target,
+                          self.move_history.halfmove_clock, self.fullmove_number)
 
-        if self.check_status.double_checked and piece.type != PieceType.KING:
-            return []
+    def available_moves(self, piece_at: Vector2d) -> list[AbstractMove]:
+        """
+        Returns legal moves of the piece. Moves of every piece are generated at most once per position and cached
+        until the next move is processed, so the returned list must not be modified.
+        """
+        moves = self._legal_moves_by_field.get(piece_at)
+        if moves is None:
+            moves = [] if self._legal_moves is not None else self._generate_piece_moves(piece_at)
+
+        return moves
+
+    def all_legal_moves(self) -> list[AbstractMove]:
+        """
+        Returns every legal move of the currently moving team. Moves are generated once per position and cached
+        until the next move is processed, so the returned list must not be modified.
+        """
+        if self._legal_moves is None:
+            self._generate_legal_moves()
+
+        return self._legal_moves
 
-        if piece.type == PieceType.PAWN:
-            return self._available_pawn_moves(piece)
-        elif piece.type == PieceType.KNIGHT:
-            return self._available_knight_moves(piece)
-        elif piece.type == PieceType.KING:
-            return self._available_king_moves(piece)
+    def process_move(self, move: AbstractMove):
+        team = self.currently_moving_team
+        moving_piece = self.board.piece_at(move.position_from)
+        key = self.position_hash ^ SIDE_KEY
+        self._legal_moves = None
+        self._legal_moves_by_field = {}
+        self._pin_rays = None
+        self._game_status = None
+        castle_rights = self._updated_castle_rights(move, moving_piece)
+        if moving_piece.type == PieceType.PAWN and distance_y(move.position_from, move.position_to) == 2:
+            en_passant_target = centre(move.position_from, move.position_to)
         else:
-            return self._available_other_pieces_moves(piece)
+            en_passant_target = None
+
+        changed_fields = [move.position_from, move.position_to]
+        removed_pieces: list[Piece] = []
+
+        score = self.piece_square_score
 
-    def process_move(self, move: AbstractMove):
         if move.type == MoveType.CAPTURING:
-            self.board.remove_piece(move.position_to)
+            key ^= self._remove_captured_piece(move.position_to, removed_pieces)
         elif move.type == MoveType.CASTLING:
+            key ^= piece_key(PieceType.ROOK, team, move.rook_from) ^ piece_key(PieceType.ROOK, team, move.rook_to)
+            score.move(PieceType.ROOK, team, move.rook_from, move.rook_to)
+            changed_fields += [move.rook_from, move.rook_to]
             self.board.move(move.rook_from, move.rook_to)
         elif move.type == MoveType.EN_PASSANT:
-            self.board.remove_piece(move.captured_position)
+            key ^= self._remove_captured_piece(move.captured_position, removed_pieces)
+            changed_fields.append(move.captured_position)
 
-        if move.type == MoveType.PROMOTION:
-            self.board.remove_piece(move.position_from)
-            self.board.set_piece(_create_promoting_piece(
-                move.piece_type,
-                self.currently_moving_team,
-                move.position_to
-            ))
-        elif move.type == MoveType.PROMOTION_WITH_CAPTURING:
-            self.board.remove_piece(move.position_to)
+        if move.type in (MoveType.PROMOTION, MoveType.PROMOTION_WITH_CAPTURING):
+            if move.type == MoveType.PROMOTION_WITH_CAPTURING:
+                key ^= self._remove_captured_piece(move.position_to, removed_pieces)
+            removed_pieces.append(moving_piece)
             self.board.remove_piece(move.position_from)
-            self.board.set_piece(_create_promoting_piece(
-                move.piece_type,
-                self.currently_moving_team,
-                move.position_to
-            ))
+            self.board.set_piece(_create_promoting_piece(move.piece_type, team, move.position_to))
+            key ^= piece_key(PieceType.PAWN, team, move.position_from) ^ self._piece_key_at(move.position_to)
+            score.remove(PieceType.PAWN, team, move.position_from)
+            score.add(move.piece_type, team, move.position_to)
         else:
+            key ^= piece_key(moving_piece.type, team, move.position_from) \
+                   ^ piece_key(moving_piece.type, team, move.position_to)
+            score.move(moving_piece.type, team, move.position_from, move.position_to)
             self.board.move(move.position_from, move.position_to)
 
+        self.attack_map.update(changed_fields, removed_pieces)
         self.currently_moving_team = self.currently_opposite_team()
-        self.move_history.update(move, self._board_snapshot())
+        self.move_history.add_move(move, moving_piece.type)
+        if team == Team.BLACK:
+            self.fullmove_number += 1
+        key ^= castle_rights_key(self.castle_rights) ^ castle_rights_key(castle_rights)
+        self.castle_rights = castle_rights
+        self.en_passant_target = en_passant_target
         self._update_check_status()
 
+        en_passant_file = self._en_passant_file()
+        self.position_hash = key ^ en_passant_key(self._current_en_passant_file) ^ en_passant_key(en_passant_file)
+        self._current_en_passant_file = en_passant_file
+        self._add_current_position()
+
+    def make_move(self, move: AbstractMove):
+        """
+        Processes the move like process_move, but remembers how to revert it, so that it can be taken back with
+        unmake_move. Moves made this way have to be unmade in the reverse order.
+        """
+        moving_piece = self.board.piece_at(move.position_from)
+        if move.type in (MoveType.CAPTURING, MoveType.PROMOTION_WITH_CAPTURING):
+            captured_piece = self.board.piece_at(move.position_to)
+        elif move.type == MoveType.EN_PASSANT:
+            captured_piece = self.board.piece_at(move.captured_position)
+        else:
+            captured_piece = None
+        rook_had_moved = move.type == MoveType.CASTLING and self.board.piece_at(move.rook_from).has_moved
+
+        record = UndoRecord(move, moving_piece, captured_piece, rook_had_moved)
+        record.castle_rights = self.castle_rights
+        record.en_passant_target = self.en_passant_target
+        record.en_passant_file = self._current_en_passant_file
+        record.halfmove_clock = self.move_history.halfmove_clock
+        record.position = self.move_history.last_position
+        record.position_hash = self.position_hash
+        record.piece_square_score = self.piece_square_score.state
+        record.checking_pieces = (self.check_status.checking_piece_1, self.check_status.checking_piece_2)
+        record.legal_moves = self._legal_moves
+        record.legal_moves_by_field = self._legal_moves_by_field
+        record.legal_move_set = self._legal_move_set
+        record.evasion_fields = self._evasion_fields
+        record.pin_rays = self._pin_rays
+        record.counted_keys = self.move_history.counted_keys
+        self._undo_stack.append(record)
+
+        self.process_move(move)
+
+    def unmake_move(self):
+        """Takes back the last move made with make_move, restoring exactly the position from before it."""
+        if not self._undo_stack:
+            raise RuntimeError("There is no move to unmake")
+
+        record = self._undo_stack.pop()
+        move = record.move
+        changed_fields = [move.position_from, move.position_to]
+        removed_pieces: list[Piece] = []
+
+        if move.type in (MoveType.PROMOTION, MoveType.PROMOTION_WITH_CAPTURING):
+            removed_pieces.append(self.board.piece_at(move.position_to))
+            self.board.remove_piece(move.position_to)
+            self.board.set_piece(record.moving_piece)
+        else:
+            self.board.move(move.position_to, move.position_from)
+        record.moving_piece.has_moved = record.moving_piece_had_moved
+
+        if move.type == MoveType.CASTLING:
+            changed_fields += [move.rook_from, move.rook_to]
+            self.board.move(move.rook_to, move.rook_from)
+            self.board.piece_at(move.rook_from).has_moved = record.rook_had_moved
+        elif move.type == MoveType.EN_PASSANT:
+            changed_fields.append(move.captured_position)
+
+        if record.captured_piece:
+            self.board.set_piece(record.captured_piece)
+
+        self.attack_map.update(changed_fields, removed_pieces)
+        self.currently_moving_team = self.currently_opposite_team()
+        if self.currently_moving_team == Team.BLACK:
+            self.fullmove_number -= 1
+        self.check_status.update_checking_pieces(*record.checking_pieces)
+        self.move_history.undo_last_move(record.halfmove_clock, record.position, record.counted_keys)
+        self.position_hash = record.position_hash
+        self.piece_square_score.state = record.piece_square_score
+        self.castle_rights = record.castle_rights
+        self.en_passant_target = record.en_passant_target
+        self._current_en_passant_file = record.en_passant_file
+        self._legal_moves = record.legal_moves
+        self._game_status = None
+        self._legal_moves_by_field = record.legal_moves_by_field
+        self._legal_move_set = record.legal_move_set
+        self._evasion_fields = record.evasion_fields
+        self._pin_rays = record.pin_rays
+
     def validate_move(self, move: AbstractMove) -> bool:
+        """Only moves of the moving piece are generated, unless all legal moves of the position already are."""
+        if self._legal_moves is not None:
+            return move in self._legal_move_set
+        elif not within_board(move.position_from):
+            return False
+
         return move in self.available_moves(move.position_from)
 
+    def game_status(self, has_legal_moves: bool = None) -> GameStatus:
+        """
+        Evaluates whether the game has ended in the current position. It is computed once per position, from the same
+        legal moves which are used for validation, and cached until the next move. A caller which already knows
+        whether there are any legal moves (e.g. from a cache shared by many games) may pass it, so that no moves are
+        generated.
+        """
+        if self._game_status is None:
+            self._game_status = self._evaluate_game_status(has_legal_moves)
+
+        return self._game_status
+
     def is_checkmate(self) -> bool:
-        return self.check_status.double_checked and not self.available_moves(self._current_king_position()) or \
-               self.check_status.checked and not [piece for piece in self.board.pieces[self.currently_moving_team].all
-                                                  if self.available_moves(piece.position)]
+        return self.game_status() == GameStatus.CHECKMATE
 
     def is_tie(self) -> bool:
-        return not self.has_sufficient_material(Team.WHITE) and not self.has_sufficient_material(Team.BLACK) or \
-               self.move_history.repeated_five_times()
+        return self.game_status().draw
 
     def can_claim_draw(self) -> bool:
         return self.move_history.repeated_three_times() or self.move_history.fifty_moves_rule_satisfied()
@@ -119,14 +360,47 @@ class ChessEngine:
 
         return True
 
+    def _evaluate_game_status(self, has_legal_moves: Optional[bool]) -> GameStatus:
+        if has_legal_moves is None:
+            has_legal_moves = self._has_legal_moves()
+
+        if not has_legal_moves:
+            return GameStatus.CHECKMATE if self.check_status.checked else GameStatus.STALEMATE
+        elif not self.has_sufficient_material(Team.WHITE) and not self.has_sufficient_material(Team.BLACK):
+            return GameStatus.INSUFFICIENT_MATERIAL
+        elif self.move_history.repeated_five_times():
+            return GameStatus.FIVEFOLD_REPETITION
+        elif self.move_history.seventy_five_moves_rule_satisfied():
+            return GameStatus.SEVENTY_FIVE_MOVES
+        else:
+            return GameStatus.ONGOING
+
+    def _add_current_position(self):
+        if self.hashing == PositionHashing.ZOBRIST:
+            self.move_history.add_position_key(self.position_hash)
+        else:
+            self.move_history.add_snapshot(self._board_snapshot())
+
     def _board_snapshot(self):
         return BoardSnapshot(
             {p.position: (p.type, p.team) for p in self.board.pieces[Team.WHITE].all + self.board.pieces[Team.BLACK].all},
             self.currently_moving_team,
-            self._castle_rights(),
-            self._en_passant_available()
+            self.castle_rights,
+            self._current_en_passant_file is not None
         )
 
+    def _remove_captured_piece(self, position: Vector2d, removed_pieces: list[Piece]) -> int:
+        """Removes the piece from the board and the piece-square score. Returns its Zobrist key."""
+        piece = self.board.piece_at(position)
+        removed_pieces.append(piece)
+        self.piece_square_score.remove(piece.type, piece.team, position)
+        self.board.remove_piece(position)
+        return piece_key(piece.type, piece.team, position)
+
+    def _piece_key_at(self, position: Vector2d) -> int:
+        piece = self.board.piece_at(position)
+        return piece_key(piece.type, piece.team, position)
+
     def _init_currently_moving_team(self) -> Team:
         if self.move_history.last_move:
             last_moving_team = self._last_moving_piece().team
@@ -153,97 +427,142 @@ class ChessEngine:
             self.check_status.update_checking_pieces(checking_pieces[0], checking_pieces[1])
 
     def _checking_pieces(self) -> list[Piece]:
-        checking_pieces: list[Piece] = []
-        king_pos = self.board.pieces[self.currently_moving_team].king.position
-
-        for move_vector in Knight.moves:
-            other_pos = king_pos - move_vector
-            if within_board(other_pos):
-                other_piece = self.board.piece_at(other_pos)
-                if other_piece and other_piece.type == PieceType.KNIGHT \
-                        and other_piece.team != self.currently_moving_team:
-                    checking_pieces.append(other_piece)
-
-        for move_vector in Pawn.attacks[self.currently_opposite_team()]:
-            other_pos = king_pos - move_vector
-            if within_board(other_pos):
-                other_piece = self.board.piece_at(other_pos)
-                if other_piece and other_piece.type == PieceType.PAWN \
-                        and other_piece.team != self.currently_moving_team:
-                    checking_pieces.append(other_piece)
-
-        for move_vector in Bishop.moves:
-            other_pos = king_pos - move_vector
-            while within_board(other_pos):
-                other_piece = self.board.piece_at(other_pos)
-                if other_piece:
-                    if other_piece.type in (PieceType.BISHOP, PieceType.QUEEN) \
-                            and other_piece.team != self.currently_moving_team:
-                        checking_pieces.append(other_piece)
-                    break
-                other_pos -= move_vector
-
-        for move_vector in Rook.moves:
-            other_pos = king_pos - move_vector
-            while within_board(other_pos):
-                other_piece = self.board.piece_at(other_pos)
-                if other_piece:
-                    if other_piece.type in (PieceType.ROOK, PieceType.QUEEN) \
-                            and other_piece.team != self.currently_moving_team:
-                        checking_pieces.append(other_piece)
+        return self.attack_map.attackers(self._current_king_position(), self.currently_opposite_team())
+
+    def _has_legal_moves(self) -> bool:
+        """Stops generating moves at the first piece which has any."""
+        if self._legal_moves is not None:
+            return bool(self._legal_moves)
+
+        return any(self.available_moves(piece.position) for piece in self._pieces_which_may_move())
+
+    def _pieces_which_may_move(self) -> list[Piece]:
+        pieces = self.board.pieces[self.currently_moving_team]
+        return [pieces.king] if self.check_status.double_checked else pieces.all
+
+    def _generate_legal_moves(self):
+        self._legal_moves = [move for piece in self._pieces_which_may_move()
+                             for move in self.available_moves(piece.position)]
+        self._legal_move_set = set(self._legal_moves)
+
+    def _generate_piece_moves(self, position: Vector2d) -> list[AbstractMove]:
+        if self._pin_rays is None:
+            self._evasion_fields = self._check_evasion_fields()
+            self._pin_rays = self._find_pin_rays()
+
+        piece = self.board.piece_at(position)
+        if piece is None or piece.team != self.currently_moving_team \
+                or self.check_status.double_checked and piece.type != PieceType.KING:
+            moves = []
+        elif piece.type == PieceType.PAWN:
+            moves = self._available_pawn_moves(piece)
+        elif piece.type == PieceType.KNIGHT:
+            moves = self._available_knight_moves(piece)
+        elif piece.type == PieceType.KING:
+            moves = self._available_king_moves(piece)
+        else:
+            moves = self._available_other_pieces_moves(piece)
+
+        self._legal_moves_by_field[position] = moves
+        return moves
+
+    def _check_evasion_fields(self) -> Optional[set[Vector2d]]:
+        """
+        Returns fields to which a piece other than the king has to move to resolve a single check: the field of the
+        checking piece and, if it is a sliding piece, the fields between it and the king. Returns None if the king is
+        not checked.
+        """
+        if not self.check_status.checked:
+            return None
+
+        checking_pos = self.check_status.checking_piece_1.position
+        fields = {checking_pos}
+        if self.check_status.checking_piece_1.type in (PieceType.BISHOP, PieceType.ROOK, PieceType.QUEEN):
+            king_pos = self._current_king_position()
+            unit_vector = unit_vector_to(checking_pos, king_pos)
+            pos = checking_pos + unit_vector
+            while pos != king_pos:
+                fields.add(pos)
+                pos += unit_vector
+
+        return fields
+
+    def _find_pin_rays(self) -> dict[Vector2d, set[Vector2d]]:
+        """
+        Finds pieces of the currently moving team which are pinned to their king. For each of them returns the only
+        fields it may move to: the fields between the king and the pinning piece, including the latter.
+        """
+        pin_rays: dict[Vector2d, set[Vector2d]] = {}
+        king_square = square_index(self._current_king_position())
+        for line_piece_type in (PieceType.ROOK, PieceType.BISHOP):
+            for ray in RAYS[line_piece_type][king_square]:
+                pinned_pos = None
+                for i, pos in enumerate(ray):
+                    piece = self.board.piece_at(pos)
+                    if not piece:
+                        continue
+                    elif pinned_pos is None and piece.team == self.currently_moving_team:
+                        pinned_pos = pos
+                        continue
+
+                    if pinned_pos is not None and piece.team != self.currently_moving_team \
+                            and piece.type in (line_piece_type, PieceType.QUEEN):
+                        pin_rays[pinned_pos] = set(ray[:i + 1])
                     break
-                other_pos -= move_vector
 
-        return checking_pieces
+        return pin_rays
+
+    def _is_pinned_away(self, pos_from: Vector2d, pos_to: Vector2d) -> bool:
+        """Checks if the move would take a pinned piece off its pin ray, revealing the king."""
+        pin_ray = self._pin_rays.get(pos_from)
+        return pin_ray is not None and pos_to not in pin_ray
 
     def _available_pawn_moves(self, pawn: Pawn) -> list[AbstractMove]:
         available_moves: list[AbstractMove] = []
-        small_move_pos = pawn.position + pawn.move_vectors[0]
+        square = square_index(pawn.position)
+        pushes = PAWN_PUSHES[self.currently_moving_team][square]
 
-        if within_board(small_move_pos) and not self._will_move_reveal_king(pawn.position, small_move_pos) \
-                and not self.board.piece_at(small_move_pos):
-            if not self.check_status.checked or self._will_move_cover_king(small_move_pos):
+        if pushes and not self._is_pinned_away(pawn.position, pushes[0]) \
+                and not self.board.piece_at(pushes[0]):
+            small_move_pos = pushes[0]
+            if self._evasion_fields is None or small_move_pos in self._evasion_fields:
                 if pawn.position.y == SECOND_RANK[self.currently_opposite_team()]:
                     available_moves.append(Promotion(pawn.position, small_move_pos))
                 else:
                     available_moves.append(Move(pawn.position, small_move_pos))
 
-            big_move_pos = small_move_pos + pawn.move_vectors[0]
-            if not pawn.has_moved and not self.board.piece_at(big_move_pos) \
-                    and (not self.check_status.checked or self._will_move_cover_king(big_move_pos)):
-                available_moves.append(Move(pawn.position, big_move_pos))
+            if len(pushes) == 2 and not self.board.piece_at(pushes[1]) \
+                    and (self._evasion_fields is None or pushes[1] in self._evasion_fields):
+                available_moves.append(Move(pawn.position, pushes[1]))
 
-        for attack_vector in pawn.attack_vectors:
-            attack_pos = pawn.position + attack_vector
-
-            if not within_board(attack_pos) or self._will_move_reveal_king(pawn.position, attack_pos) \
-                    or (self.check_status.checked and not self._will_capture_checking_piece(attack_pos)):
+        for attack_pos in PAWN_ATTACKS[self.currently_moving_team][square]:
+            if self._is_pinned_away(pawn.position, attack_pos):
                 continue
 
             if self.board.piece_at(attack_pos) and self.board.piece_at(attack_pos).team != self.currently_moving_team:
+                if self._evasion_fields is not None and attack_pos not in self._evasion_fields:
+                    continue
+
                 if pawn.position.y == SECOND_RANK[self.currently_opposite_team()]:
                     available_moves.append(PromotionWithCapturing(pawn.position, attack_pos))
                 else:
                     available_moves.append(Capturing(pawn.position, attack_pos))
-            elif self._last_moving_piece() and self._last_moving_piece().type == PieceType.PAWN and distance_y(
-                    self.move_history.last_move.position_from, self.move_history.last_move.position_to) == 2 \
-                    and self.move_history.last_move.position_to.x == attack_pos.x \
-                    and pawn.position.y == self.move_history.last_move.position_to.y:
-                available_moves.append(EnPassant(pawn.position, attack_pos, self.move_history.last_move.position_to))
+            elif self.en_passant_target is not None and attack_pos == self.en_passant_target:
+                captured_pos = Vector2d(attack_pos.x, pawn.position.y)
+                if (self._evasion_fields is None or attack_pos in self._evasion_fields
+                        or captured_pos in self._evasion_fields) \
+                        and not self._will_en_passant_reveal_king(pawn.position, attack_pos, captured_pos):
+                    available_moves.append(EnPassant(pawn.position, attack_pos, captured_pos))
 
         return available_moves
 
     def _available_knight_moves(self, knight: Knight) -> list[AbstractMove]:
         available_moves: list[AbstractMove] = []
+        if knight.position in self._pin_rays:
+            return available_moves
 
-        for move_vector in knight.move_vectors:
-            new_pos = knight.position + move_vector
-            if not within_board(new_pos):
-                continue
-            elif self._will_move_reveal_king(knight.position, new_pos):
-                continue
-            elif self.check_status.checked and not self._will_move_cover_king(new_pos) \
-                    and not self._will_capture_checking_piece(new_pos):
+        for new_pos in KNIGHT_TARGETS[square_index(knight.position)]:
+            if self._evasion_fields is not None and new_pos not in self._evasion_fields:
                 continue
             elif self.board.piece_at(new_pos) and self.board.piece_at(new_pos).team == self.currently_moving_team:
                 continue
@@ -257,14 +576,12 @@ class ChessEngine:
 
     def _available_king_moves(self, king: King) -> list[AbstractMove]:
         available_moves: list[AbstractMove] = []
-        attacked_fields = self._attacked_fields()
+        opposite_team = self.currently_opposite_team()
 
-        for move_vector in king.move_vectors:
-            new_pos = king.position + move_vector
-            if not within_board(new_pos) or (self.board.piece_at(new_pos)
-                                             and self.board.piece_at(new_pos).team == self.currently_moving_team):
+        for new_pos in KING_TARGETS[square_index(king.position)]:
+            if self.board.piece_at(new_pos) and self.board.piece_at(new_pos).team == self.currently_moving_team:
                 continue
-            elif new_pos in attacked_fields:
+            elif self.attack_map.is_attacked(new_pos, opposite_team):
                 continue
 
             if self.board.piece_at(new_pos):
@@ -272,48 +589,48 @@ class ChessEngine:
             else:
                 available_moves.append(Move(king.position, new_pos))
 
-        if king.has_moved or self.check_status.checked:
+        castle_right = self.castle_rights[self.currently_moving_team]
+        if castle_right == CastleRight.NONE or self.check_status.checked:
             return available_moves
 
-        rooks = self.board.pieces[self.currently_moving_team].rooks
-        for rook in rooks:
-            if rook.has_moved or self.board.any_piece_between(king.position, rook.position):
+        for rook_x, required_right in ((7, CastleRight.SHORT), (0, CastleRight.LONG)):
+            rook_pos = Vector2d(rook_x, king.position.y)
+            if castle_right not in (required_right, CastleRight.BOTH) \
+                    or self.board.any_piece_between(king.position, rook_pos):
                 continue
 
-            unit_vector = unit_vector_to(king.position, rook.position)
+            unit_vector = unit_vector_to(king.position, rook_pos)
             new_rook_pos = king.position + unit_vector
             new_king_pos = king.position + (2 * unit_vector)
-            if new_rook_pos in attacked_fields or new_king_pos in attacked_fields:
+            if self.attack_map.is_attacked(new_rook_pos, opposite_team) \
+                    or self.attack_map.is_attacked(new_king_pos, opposite_team):
                 continue
 
-            available_moves.append(Castling(king.position, new_king_pos, rook.position, new_rook_pos))
+            available_moves.append(Castling(king.position, new_king_pos, rook_pos, new_rook_pos))
 
         return available_moves
 
     def _available_other_pieces_moves(self, piece: Piece) -> list[AbstractMove]:
         available_moves: list[AbstractMove] = []
 
-        for move_vector in piece.move_vectors:
-            new_pos = piece.position + move_vector
-            if not within_board(new_pos) or self._will_move_reveal_king(piece.position, new_pos):
+        for ray in RAYS[piece.type][square_index(piece.position)]:
+            if self._is_pinned_away(piece.position, ray[0]):
                 continue
 
-            while within_board(new_pos):
-                if self.check_status.checked and not self._will_move_cover_king(new_pos) \
-                        and not self._will_capture_checking_piece(new_pos):
-                    if self.board.piece_at(new_pos):
+            for new_pos in ray:
+                piece_at = self.board.piece_at(new_pos)
+                if self._evasion_fields is not None and new_pos not in self._evasion_fields:
+                    if piece_at:
                         break
                     else:
-                        new_pos += move_vector
                         continue
 
-                if self.board.piece_at(new_pos):
-                    if self.board.piece_at(new_pos).team != self.currently_moving_team:
+                if piece_at:
+                    if piece_at.team != self.currently_moving_team:
                         available_moves.append(Capturing(piece.position, new_pos))
                     break
 
                 available_moves.append(Move(piece.position, new_pos))
-                new_pos += move_vector
 
         return available_moves
 
@@ -323,61 +640,26 @@ class ChessEngine:
     def _current_king_position(self) -> Vector2d:
         return self.board.pieces[self.currently_moving_team].king.position
 
-    def _will_move_cover_king(self, pos_to: Vector2d) -> bool:
-        return self.check_status.checking_piece_1.type != PieceType.KNIGHT \
-               and on_same_line(pos_to, self._current_king_position(), self.check_status.checking_piece_1.position) \
-               and is_between(pos_to, self._current_king_position(), self.check_status.checking_piece_1.position)
-
-    def _will_capture_checking_piece(self, attack_pos: Vector2d) -> bool:
-        return self.check_status.checking_piece_1.position == attack_pos
-
-    def _will_move_reveal_king(self, pos_from: Vector2d, pos_to: Vector2d) -> bool:
-        king_pos = self._current_king_position()
-
-        if not on_same_line(king_pos, pos_from) or on_same_line(king_pos, pos_from, pos_to) \
-                or self.board.any_piece_between(king_pos, pos_from):
-            return False
-
-        revealed_piece = self.board.next_piece_on_line(king_pos, pos_from)
-        if not revealed_piece or revealed_piece.team == self.currently_moving_team:
-            return False
-
-        if revealed_piece.type is PieceType.QUEEN:
-            return True
-
-        if (on_same_row(king_pos, pos_from) and revealed_piece.type is PieceType.ROOK) \
-                or (on_same_diagonal(king_pos, pos_from) and revealed_piece.type is PieceType.BISHOP):
-            return True
-        else:
-            return False
+    def _will_en_passant_reveal_king(self, pos_from: Vector2d, pos_to: Vector2d, captured_pos: Vector2d) -> bool:
+        """
+        En passant removes two pieces from the board at once (e.g. both pawns from the king's rank), which pin rays
+        do not describe, so lines from the king are checked as if the capture had been made.
+        """
+        king_square = square_index(self._current_king_position())
+        for line_piece_type in (PieceType.ROOK, PieceType.BISHOP):
+            for ray in RAYS[line_piece_type][king_square]:
+                for pos in ray:
+                    if pos == pos_to:
+                        break
 
-    def _attacked_fields(self) -> set[Vector2d]:
-        attacked_fields: set[Vector2d] = set()
-        opponent_pieces = self.board.pieces[self.currently_opposite_team()]
-
-        for piece in opponent_pieces.pawns:
-            for attack_vector in piece.attack_vectors:
-                new_pos = piece.position + attack_vector
-                if within_board(new_pos):
-                    attacked_fields.add(new_pos)
-
-        for piece in opponent_pieces.knights + [opponent_pieces.king]:
-            for move_vector in piece.move_vectors:
-                new_pos = piece.position + move_vector
-                if within_board(new_pos):
-                    attacked_fields.add(new_pos)
-
-        for piece in opponent_pieces.bishops + opponent_pieces.rooks + opponent_pieces.queens:
-            for move_vector in piece.move_vectors:
-                new_pos = piece.position + move_vector
-                while within_board(new_pos):
-                    attacked_fields.add(new_pos)
-                    piece_at = self.board.piece_at(new_pos)
-                    if piece_at and (piece_at.team != self.currently_moving_team or piece_at.type != PieceType.KING):
+                    piece = self.board.piece_at(pos)
+                    if piece and pos != pos_from and pos != captured_pos:
+                        if piece.team != self.currently_moving_team \
+                                and piece.type in (line_piece_type, PieceType.QUEEN):
+                            return True
                         break
-                    new_pos += move_vector
 
-        return attacked_fields
+        return False
 
     def _last_moving_piece(self) -> Optional[Piece]:
         if self.move_history.last_move:
@@ -385,7 +667,7 @@ class ChessEngine:
         else:
             return None
 
-    def _castle_rights(self) -> dict[Team, CastleRight]:
+    def _init_castle_rights(self) -> dict[Team, CastleRight]:
         castle_rights: dict[Team, CastleRight] = {}
         for team in self.board.pieces:
             king = self.board.piece_at(Vector2d(4, FIRST_RANK[team]))
@@ -408,12 +690,80 @@ class ChessEngine:
 
         return castle_rights
 
-    def _en_passant_available(self) -> bool:
-        for pawn in self.board.pieces[self.currently_moving_team].pawns:
-            if [move for move in self.available_moves(pawn.position) if move.type == MoveType.EN_PASSANT]:
-                return True
+    def _init_en_passant_target(self) -> Optional[Vector2d]:
+        last_move = self.move_history.last_move
+        if not last_move or distance_y(last_move.position_from, last_move.position_to) != 2:
+            return None
+
+        last_moving_piece = self._last_moving_piece()
+        if not last_moving_piece or last_moving_piece.type != PieceType.PAWN:
+            return None
+
+        return centre(last_move.position_from, last_move.position_to)
+
+    def _updated_castle_rights(self, move: AbstractMove, moving_piece: Piece) -> dict[Team, CastleRight]:
+        """Returns castle rights after the move: moving the king or moving or capturing a rook loses a right."""
+        castle_rights = self.castle_rights
+        if moving_piece.type == PieceType.KING and castle_rights[moving_piece.team] != CastleRight.NONE:
+            castle_rights = {**castle_rights, moving_piece.team: CastleRight.NONE}
+
+        for position in (move.position_from, move.position_to):
+            if position in CASTLE_RIGHTS_BY_ROOK_FIELD:
+                team, lost_right = CASTLE_RIGHTS_BY_ROOK_FIELD[position]
+                castle_rights = {**castle_rights, team: _without_castle_right(castle_rights[team], lost_right)}
+
+        return castle_rights
+
+    def _en_passant_file(self) -> Optional[int]:
+        """Returns the file of a pawn which can be captured en passant in the current position, if there is any."""
+        if self.en_passant_target is None:
+            return None
 
-        return False
+        captured_pos = self.en_passant_target + Pawn.moves[self.currently_opposite_team()][0]
+        for side in (LEFT, RIGHT):
+            pos = captured_pos + side
+            if not within_board(pos):
+                continue
+
+            piece = self.board.piece_at(pos)
+            if piece and piece.type == PieceType.PAWN and piece.team == self.currently_moving_team \
+                    and [move for move in self.available_moves(pos) if move.type == MoveType.EN_PASSANT]:
+                return self.en_passant_target.x
+
+        return None
+
+
+def legal_moves_with_promotions(engine: ChessEngine) -> list[AbstractMove]:
+    """
+    Returns legal moves of the engine with every promotion, which the engine generates without a piece type,
+    expanded into all four promoting piece types.
+    """
+    moves: list[AbstractMove] = []
+    for move in engine.all_legal_moves():
+        if move.type == MoveType.PROMOTION:
+            moves += [Promotion(move.position_from, move.position_to, t) for t in PROMOTION_PIECE_TYPES]
+        elif move.type == MoveType.PROMOTION_WITH_CAPTURING:
+            moves += [PromotionWithCapturing(move.position_from, move.position_to, t) for t in PROMOTION_PIECE_TYPES]
+        else:
+            moves.append(move)
+
+    return moves
+
+
+def _without_castle_right(castle_right: CastleRight, lost_right: CastleRight) -> CastleRight:
+    if castle_right == CastleRight.BOTH:
+        return CastleRight.LONG if lost_right == CastleRight.SHORT else CastleRight.SHORT
+    elif castle_right == lost_right:
+        return CastleRight.NONE
+    else:
+        return castle_right
+
+
+def _create_board(board_type: BoardType, pieces: list[Piece]) -> Union[Chessboard, BitboardChessboard]:
+    if board_type == BoardType.BITBOARD:
+        return BitboardChessboard(pieces)
+    else:
+        return Chessboard(pieces)
 
 
 def _init_pieces() -> list[Piece]:
@@ -1,3 +1,4 @@
+from enum import Enum, auto
 from typing import Optional
 
 from shared.chess_engine.position import Vector2d, distance_x, distance_y
@@ -8,6 +9,11 @@ FIRST_RANK = {Team.WHITE: 0, Team.BLACK: 7}
 SECOND_RANK = {Team.WHITE: 1, Team.BLACK: 6}
 
 
+class BoardType(Enum):
+    DICT = auto()
+    BITBOARD = auto()
+
+
 class Chessboard:
     def __init__(self, pieces: list[Piece]):
         self._fields = {Vector2d(i, j): None for i in range(8) for j in range(8)}
@@ -58,7 +64,7 @@ class Chessboard:
 
 
 def within_board(position: Vector2d) -> bool:
-    return 0 <= position.x < 8 and 0 <= position.y < 8
+    return position.index is not None
 
 
 def distance(pos_1: Vector2d, pos_2: Vector2d) -> int:
@@ -0,0 +1,74 @@
+from shared.chess_engine.attack_tables import KING_TARGETS
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.piece import Team, opposite_team
+from shared.chess_engine.piece_square_tables import MAX_PHASE
+
+# All scores are in centipawns.
+MOBILITY_WEIGHT = 4
+# King safety terms apply in the middlegame only: they are scaled down with the phase.
+PAWN_SHIELD_BONUS = 12
+KING_ZONE_ATTACK_PENALTY = 8
+DOUBLED_PAWN_PENALTY = 15
+ISOLATED_PAWN_PENALTY = 15
+# Bonus of a passed pawn by the number of ranks it has advanced.
+PASSED_PAWN_BONUS = [0, 10, 15, 25, 40, 60, 90, 0]
+
+
+def evaluate(engine: ChessEngine) -> int:
+    """Static evaluation of the position from the point of view of the currently moving team."""
+    score = white_advantage(engine)
+    return score if engine.currently_moving_team == Team.WHITE else -score
+
+
+def white_advantage(engine: ChessEngine) -> int:
+    """
+    Static evaluation of the position from the white point of view: material and piece-square tables (kept up to
+    date incrementally by the engine), mobility, king safety and pawn structure.
+    """
+    score = engine.piece_square_score.score
+    score += MOBILITY_WEIGHT * (engine.attack_map.mobility(Team.WHITE) - engine.attack_map.mobility(Team.BLACK))
+
+    king_safety = _king_safety(engine, Team.WHITE) - _king_safety(engine, Team.BLACK)
+    score += king_safety * min(engine.piece_square_score.phase, MAX_PHASE) // MAX_PHASE
+
+    pawn_files = {team: [p.position.x for p in engine.board.pieces[team].pawns] for team in Team}
+    score += _pawn_structure(engine, Team.WHITE, pawn_files) - _pawn_structure(engine, Team.BLACK, pawn_files)
+    return score
+
+
+def _king_safety(engine: ChessEngine, team: Team) -> int:
+    """Bonus for pawns right in front of the king and penalty for attacks on the fields around it."""
+    king = engine.board.pieces[team].king
+    if king is None:
+        return 0
+
+    forward = 1 if team == Team.WHITE else -1
+    score = 0
+    for pawn in engine.board.pieces[team].pawns:
+        if abs(pawn.position.x - king.position.x) <= 1 and 0 < (pawn.position.y - king.position.y) * forward <= 2:
+            score += PAWN_SHIELD_BONUS
+
+    enemy = opposite_team(team)
+    attacks = engine.attack_map.attack_count(king.position, enemy)
+    for field in KING_TARGETS[king.position.index]:
+        attacks += engine.attack_map.attack_count(field, enemy)
+
+    return score - KING_ZONE_ATTACK_PENALTY * attacks
+
+
+def _pawn_structure(engine: ChessEngine, team: Team, pawn_files: dict[Team, list[int]]) -> int:
+    """Penalties for doubled and isolated pawns and bonuses for passed pawns."""
+    files = pawn_files[team]
+    score = -DOUBLED_PAWN_PENALTY * (len(files) - len(set(files)))
+
+    forward = 1 if team == Team.WHITE else -1
+    enemy_pawns = engine.board.pieces[opposite_team(team)].pawns
+    for pawn in engine.board.pieces[team].pawns:
+        x, y = pawn.position.x, pawn.position.y
+        if x - 1 not in files and x + 1 not in files:
+            score -= ISOLATED_PAWN_PENALTY
+
+        if not any(abs(p.position.x - x) <= 1 and (p.position.y - y) * forward > 0 for p in enemy_pawns):
+            score += PASSED_PAWN_BONUS[y if team == Team.WHITE else 7 - y]
+
+    return score
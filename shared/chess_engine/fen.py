@@ -0,0 +1,195 @@
+from typing import Optional, Union
+
+from shared.chess_engine.bitboard import BitboardChessboard
+from shared.chess_engine.chessboard import Chessboard, FIRST_RANK, SECOND_RANK
+from shared.chess_engine.move import AbstractMove, MoveType
+from shared.chess_engine.move_history import CastleRight
+from shared.chess_engine.piece import Piece, PieceType, Team, Pawn, Knight, Bishop, Rook, Queen, King
+from shared.chess_engine.position import Vector2d
+
+INITIAL_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+FILES = "abcdefgh"
+
+PIECE_CLASSES_BY_LETTER = {"p": Pawn, "n": Knight, "b": Bishop, "r": Rook, "q": Queen, "k": King}
+PIECE_LETTERS = {
+    PieceType.PAWN: "p",
+    PieceType.KNIGHT: "n",
+    PieceType.BISHOP: "b",
+    PieceType.ROOK: "r",
+    PieceType.QUEEN: "q",
+    PieceType.KING: "k"
+}
+
+# Castling letters of both teams; the first one is the short castle.
+_CASTLE_LETTERS = {Team.WHITE: ("K", "Q"), Team.BLACK: ("k", "q")}
+
+
+class FenPosition:
+    """Everything a FEN string describes, parsed into engine types."""
+
+    def __init__(self, pieces: list[Piece], currently_moving_team: Team, castle_rights: dict[Team, CastleRight],
+                 en_passant_target: Optional[Vector2d], halfmove_clock: int, fullmove_number: int):
+        self.pieces = pieces
+        self.currently_moving_team = currently_moving_team
+        self.castle_rights = castle_rights
+        self.en_passant_target = en_passant_target
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+
+
+def parse_fen(fen: str) -> FenPosition:
+    """Clocks may be omitted, as in the EPD format; they default to 0 and 1 then."""
+    fields = fen.split()
+    if len(fields) not in (4, 6):
+        raise RuntimeError("FEN must have 4 or 6 fields: " + fen)
+
+    if fields[1] not in ("w", "b"):
+        raise RuntimeError("Invalid side to move in FEN: " + fields[1])
+    currently_moving_team = Team.WHITE if fields[1] == "w" else Team.BLACK
+
+    castle_rights = _parse_castle_rights(fields[2])
+    en_passant_target = None if fields[3] == "-" else parse_field(fields[3])
+
+    try:
+        halfmove_clock, fullmove_number = (int(fields[4]), int(fields[5])) if len(fields) == 6 else (0, 1)
+    except ValueError:
+        raise RuntimeError("Invalid move clocks in FEN: " + fen)
+
+    return FenPosition(_parse_pieces(fields[0], castle_rights), currently_moving_team, castle_rights,
+                       en_passant_target, halfmove_clock, fullmove_number)
+
+
+def format_fen(board: Union[Chessboard, BitboardChessboard], currently_moving_team: Team,
+               castle_rights: dict[Team, CastleRight], en_passant_target: Optional[Vector2d], halfmove_clock: int,
+               fullmove_number: int) -> str:
+    return " ".join((
+        _format_placement(board),
+        "w" if currently_moving_team == Team.WHITE else "b",
+        _format_castle_rights(castle_rights),
+        "-" if en_passant_target is None else field_name(en_passant_target),
+        str(halfmove_clock),
+        str(fullmove_number)
+    ))
+
+
+def field_name(position: Vector2d) -> str:
+    return FILES[position.x] + str(position.y + 1)
+
+
+def move_name(move: AbstractMove) -> str:
+    """Returns the move in the coordinate notation, e.g. e2e4 or a7a8q."""
+    name = field_name(move.position_from) + field_name(move.position_to)
+    if move.type in (MoveType.PROMOTION, MoveType.PROMOTION_WITH_CAPTURING):
+        name += PIECE_LETTERS[move.piece_type]
+
+    return name
+
+
+def parse_field(name: str) -> Vector2d:
+    if len(name) != 2 or name[0] not in FILES or name[1] not in "12345678":
+        raise RuntimeError("Invalid field name: " + name)
+
+    return Vector2d(FILES.index(name[0]), int(name[1]) - 1)
+
+
+def _parse_pieces(placement: str, castle_rights: dict[Team, CastleRight]) -> list[Piece]:
+    """
+    Pawns off their second rank are marked as moved, as well as kings and rooks which cannot castle any more, so that
+    has_moved flags of the pieces agree with the castle rights.
+    """
+    unmoved = set()
+    for team, right in castle_rights.items():
+        if right != CastleRight.NONE:
+            unmoved.add(Vector2d(4, FIRST_RANK[team]))
+        if right in (CastleRight.SHORT, CastleRight.BOTH):
+            unmoved.add(Vector2d(7, FIRST_RANK[team]))
+        if right in (CastleRight.LONG, CastleRight.BOTH):
+            unmoved.add(Vector2d(0, FIRST_RANK[team]))
+
+    ranks = placement.split("/")
+    if len(ranks) != 8:
+        raise RuntimeError("FEN piece placement must have 8 ranks: " + placement)
+
+    pieces: list[Piece] = []
+    for i, rank in enumerate(ranks):
+        y = 7 - i
+        x = 0
+        for char in rank:
+            if char.isdigit():
+                x += int(char)
+                continue
+            elif char.lower() not in PIECE_CLASSES_BY_LETTER or x > 7:
+                raise RuntimeError("Invalid FEN rank: " + rank)
+
+            team = Team.WHITE if char.isupper() else Team.BLACK
+            position = Vector2d(x, y)
+            piece_class = PIECE_CLASSES_BY_LETTER[char.lower()]
+            if piece_class is Pawn:
+                has_moved = y != SECOND_RANK[team]
+            elif piece_class in (Rook, King):
+                has_moved = position not in unmoved
+            else:
+                has_moved = False
+            pieces.append(piece_class(team, position, has_moved=has_moved))
+            x += 1
+
+        if x != 8:
+            raise RuntimeError("Invalid FEN rank: " + rank)
+
+    return pieces
+
+
+def _format_placement(board: Union[Chessboard, BitboardChessboard]) -> str:
+    ranks: list[str] = []
+    for y in range(7, -1, -1):
+        rank = ""
+        empty = 0
+        for x in range(8):
+            piece = board.piece_at(Vector2d(x, y))
+            if piece is None:
+                empty += 1
+                continue
+
+            if empty:
+                rank += str(empty)
+                empty = 0
+            letter = PIECE_LETTERS[piece.type]
+            rank += letter.upper() if piece.team == Team.WHITE else letter
+
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+
+    return "/".join(ranks)
+
+
+def _parse_castle_rights(field: str) -> dict[Team, CastleRight]:
+    if field != "-" and (not field or any(char not in "KQkq" for char in field)):
+        raise RuntimeError("Invalid castling availability in FEN: " + field)
+
+    castle_rights: dict[Team, CastleRight] = {}
+    for team, (short_letter, long_letter) in _CASTLE_LETTERS.items():
+        short_right = short_letter in field
+        long_right = long_letter in field
+        if short_right and long_right:
+            castle_rights[team] = CastleRight.BOTH
+        elif short_right:
+            castle_rights[team] = CastleRight.SHORT
+        elif long_right:
+            castle_rights[team] = CastleRight.LONG
+        else:
+            castle_rights[team] = CastleRight.NONE
+
+    return castle_rights
+
+
+def _format_castle_rights(castle_rights: dict[Team, CastleRight]) -> str:
+    field = ""
+    for team, (short_letter, long_letter) in _CASTLE_LETTERS.items():
+        if castle_rights[team] in (CastleRight.SHORT, CastleRight.BOTH):
+            field += short_letter
+        if castle_rights[team] in (CastleRight.LONG, CastleRight.BOTH):
+            field += long_letter
+
+    return field or "-"
@@ -37,8 +37,8 @@ class AbstractMove(ABC):
         pass
 
     def __eq__(self, other: AbstractMove):
-        return self.type == other.type and self.position_from == other.position_from \
-               and self.position_to == other.position_to
+        return isinstance(other, AbstractMove) and self.type == other.type \
+               and self.position_from == other.position_from and self.position_to == other.position_to
 
     def __hash__(self):
         return hash((self.type, self.position_from, self.position_to))
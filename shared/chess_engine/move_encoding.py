@@ -0,0 +1,75 @@
+from typing import Optional
+
+from shared.chess_engine.move import AbstractMove, MoveType, Move, Capturing, Castling, EnPassant, Promotion, \
+    PromotionWithCapturing
+from shared.chess_engine.piece import PieceType
+from shared.chess_engine.position import Vector2d, square_index, square_position
+
+# A move is packed into 16 bits: bits 0-5 hold the square index of position_from, bits 6-11 the square index of
+# position_to and bits 12-15 the flags below. Everything else (rook fields of castling, captured field of en passant)
+# follows from the two squares, so the conversion is lossless.
+QUIET = 0
+SHORT_CASTLING = 2
+LONG_CASTLING = 3
+CAPTURE = 4
+EN_PASSANT = 5
+# Promotions whose piece type has not been chosen yet, as generated by the engine.
+PROMOTION = 6
+PROMOTION_WITH_CAPTURING = 7
+# Promotions with a chosen piece type; the two lowest bits are the piece and bit 2 marks a capture.
+PROMOTION_FLAG = 8
+CAPTURE_FLAG = 4
+
+PROMOTION_PIECE_TYPES = (PieceType.KNIGHT, PieceType.BISHOP, PieceType.ROOK, PieceType.QUEEN)
+_PROMOTION_PIECE_CODES = {t: i for i, t in enumerate(PROMOTION_PIECE_TYPES)}
+
+
+def encode_move(move: AbstractMove) -> int:
+    if move.type == MoveType.MOVE:
+        flags = QUIET
+    elif move.type == MoveType.CAPTURING:
+        flags = CAPTURE
+    elif move.type == MoveType.CASTLING:
+        flags = SHORT_CASTLING if move.position_to.x > move.position_from.x else LONG_CASTLING
+    elif move.type == MoveType.EN_PASSANT:
+        flags = EN_PASSANT
+    else:
+        flags = _promotion_flags(move.piece_type, move.type == MoveType.PROMOTION_WITH_CAPTURING)
+
+    return square_index(move.position_from) | square_index(move.position_to) << 6 | flags << 12
+
+
+def decode_move(code: int) -> AbstractMove:
+    position_from = square_position(code & 0x3F)
+    position_to = square_position(code >> 6 & 0x3F)
+    flags = code >> 12
+
+    if flags == QUIET:
+        return Move(position_from, position_to)
+    elif flags == CAPTURE:
+        return Capturing(position_from, position_to)
+    elif flags in (SHORT_CASTLING, LONG_CASTLING):
+        direction = 1 if flags == SHORT_CASTLING else -1
+        rook_from = Vector2d(7 if flags == SHORT_CASTLING else 0, position_from.y)
+        return Castling(position_from, position_to, rook_from, Vector2d(position_from.x + direction, position_from.y))
+    elif flags == EN_PASSANT:
+        return EnPassant(position_from, position_to, Vector2d(position_to.x, position_from.y))
+    elif flags == PROMOTION:
+        return Promotion(position_from, position_to)
+    elif flags == PROMOTION_WITH_CAPTURING:
+        return PromotionWithCapturing(position_from, position_to)
+    elif flags & PROMOTION_FLAG:
+        piece_type = PROMOTION_PIECE_TYPES[flags & 3]
+        if flags & CAPTURE_FLAG:
+            return PromotionWithCapturing(position_from, position_to, piece_type)
+        else:
+            return Promotion(position_from, position_to, piece_type)
+    else:
+        raise RuntimeError("Invalid move code: {}".format(code))
+
+
+def _promotion_flags(piece_type: Optional[PieceType], capturing: bool) -> int:
+    if piece_type is None:
+        return PROMOTION_WITH_CAPTURING if capturing else PROMOTION
+
+    return PROMOTION_FLAG | (CAPTURE_FLAG if capturing else 0) | _PROMOTION_PIECE_CODES[piece_type]
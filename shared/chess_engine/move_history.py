@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from array import array
 from collections import defaultdict
 from enum import Enum, auto
-from typing import Optional, DefaultDict
+from typing import Optional, DefaultDict, Hashable
 
 from shared.chess_engine.move import AbstractMove, MoveType
+from shared.chess_engine.move_encoding import encode_move, decode_move
 from shared.chess_engine.piece import Team, PieceType
 from shared.chess_engine.position import Vector2d
 
@@ -16,6 +18,15 @@ class CastleRight(Enum):
     BOTH = auto()
 
 
+class HistoryType(Enum):
+    """
+    FULL keeps every move object, COMPACT keeps moves and positions packed into integer arrays (see
+    CompactMoveHistory). COMPACT requires Zobrist hashing.
+    """
+    FULL = auto()
+    COMPACT = auto()
+
+
 class BoardSnapshot:
     def __init__(self, pieces: dict[Vector2d, (PieceType, Team)], currently_moving_team: Team,
                  castle_rights: dict[Team, CastleRight], en_passant_available: bool):
@@ -40,36 +51,142 @@ class BoardSnapshot:
 
 
 class MoveHistory:
-    def __init__(self, moves: list[AbstractMove] = None):
-        self._last_pawn_move_or_capturing: int = -1
+    """
+    Positions are counted either as BoardSnapshot objects or as integer (Zobrist) keys, depending on which of
+    add_snapshot and add_position_key is used by the owner.
+    """
+
+    def __init__(self, moves: list[AbstractMove] = None, halfmove_clock: int = None):
         self._moves: list[AbstractMove] = moves or []
-        self._board_snapshots: DefaultDict[BoardSnapshot, int] = defaultdict(int)
-        self._last_snapshot: Optional[BoardSnapshot] = None
+        if halfmove_clock is None:
+            self._last_pawn_move_or_capturing: int = -1
+        else:
+            self._last_pawn_move_or_capturing = len(self._moves) - 1 - halfmove_clock
+        self._positions: DefaultDict[Hashable, int] = defaultdict(int)
+        self._last_position: Optional[Hashable] = None
 
     def update(self, move: AbstractMove, board_snapshot: BoardSnapshot):
-        self._moves.append(move)
+        self.add_move(move, board_snapshot.pieces[move.position_to][0])
         self.add_snapshot(board_snapshot)
 
-        if board_snapshot.pieces[move.position_to][0] == PieceType.PAWN:
+    def add_move(self, move: AbstractMove, moving_piece_type: PieceType):
+        self._moves.append(move)
+
+        if moving_piece_type == PieceType.PAWN:
             self._last_pawn_move_or_capturing = len(self._moves) - 1
         elif move.type in (MoveType.CAPTURING, MoveType.PROMOTION_WITH_CAPTURING):
             self._last_pawn_move_or_capturing = len(self._moves) - 1
 
     def add_snapshot(self, board_snapshot: BoardSnapshot):
-        self._board_snapshots[board_snapshot] += 1
-        self._last_snapshot = board_snapshot
+        self._add_position(board_snapshot)
+
+    def add_position_key(self, key: int):
+        self._add_position(key)
 
     def repeated_three_times(self) -> bool:
-        return self._board_snapshots[self._last_snapshot] >= 3
+        return self._positions[self._last_position] >= 3
 
     def repeated_five_times(self) -> bool:
-        return self._board_snapshots[self._last_snapshot] >= 5
+        return self._positions[self._last_position] >= 5
 
     def fifty_moves_rule_satisfied(self) -> bool:
         return len(self._moves) - self._last_pawn_move_or_capturing > 100
         # That is not a mistake, because this rule specifies that each player have to make 50 moves and that means
         # 100 moves in move_history
 
+    def undo_last_move(self, halfmove_clock: int, previous_position: Optional[Hashable], counted_keys: array = None):
+        """
+        Reverts the last add_move together with the position added after it. The halfmove clock and the previous
+        position (and counted_keys of CompactMoveHistory) cannot be derived from the remaining history, so the caller
+        has to remember them.
+        """
+        self._moves.pop()
+        self._positions[self._last_position] -= 1
+        if self._positions[self._last_position] == 0:
+            del self._positions[self._last_position]
+
+        self._last_pawn_move_or_capturing = len(self._moves) - 1 - halfmove_clock
+        self._last_position = previous_position
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def seventy_five_moves_rule_satisfied(self) -> bool:
+        return self.halfmove_clock >= 150
+
     @property
     def last_move(self) -> Optional[AbstractMove]:
         return None if len(self._moves) == 0 else self._moves[-1]
+
+    @property
+    def last_position(self) -> Optional[Hashable]:
+        return self._last_position
+
+    @property
+    def counted_keys(self) -> Optional[array]:
+        """Keys of the positions whose repetitions are counted, if the history drops older ones; see undo_last_move."""
+        return None
+
+    @property
+    def halfmove_clock(self) -> int:
+        """Number of moves made since the last pawn move or capturing."""
+        return len(self._moves) - 1 - self._last_pawn_move_or_capturing
+
+    def _add_position(self, position: Hashable):
+        self._positions[position] += 1
+        self._last_position = position
+
+
+class CompactMoveHistory(MoveHistory):
+    """
+    MoveHistory for long-running games: moves are stored as 16-bit codes of encode_move and positions as 64-bit
+    Zobrist keys, both in arrays. Only keys of positions since the last pawn move or capturing are kept, because no
+    earlier position can occur again. To undo such a move, its owner passes undo_last_move the counted_keys from before
+    the move; without them the positions before it are no longer counted.
+    """
+
+    def __init__(self, moves: list[AbstractMove] = None, halfmove_clock: int = None):
+        super().__init__(None, None)
+        self._moves: array = array("H", [encode_move(move) for move in moves or []])
+        if halfmove_clock is not None:
+            self._last_pawn_move_or_capturing = len(self._moves) - 1 - halfmove_clock
+        self._keys = array("Q")
+        self._irreversible_move_made = False
+
+    def add_move(self, move: AbstractMove, moving_piece_type: PieceType):
+        self._moves.append(encode_move(move))
+
+        if moving_piece_type == PieceType.PAWN or move.type in (MoveType.CAPTURING, MoveType.PROMOTION_WITH_CAPTURING):
+            self._last_pawn_move_or_capturing = len(self._moves) - 1
+            self._irreversible_move_made = True
+
+    def add_snapshot(self, board_snapshot: BoardSnapshot):
+        raise RuntimeError("Compact move history counts positions by Zobrist keys only")
+
+    def add_position_key(self, key: int):
+        if self._irreversible_move_made:
+            self._positions.clear()
+            # A new array, so that the old one stays intact for whoever keeps it to undo the move.
+            self._keys = array("Q")
+            self._irreversible_move_made = False
+
+        self._keys.append(key)
+        self._add_position(key)
+
+    def undo_last_move(self, halfmove_clock: int, previous_position: Optional[int], counted_keys: array = None):
+        super().undo_last_move(halfmove_clock, previous_position)
+        self._keys.pop()
+        self._irreversible_move_made = False
+        if not self._keys and counted_keys is not None:
+            # The undone move was irreversible, so the positions before it have to be counted again.
+            self._keys = counted_keys
+            for key in self._keys:
+                self._positions[key] += 1
+
+    @property
+    def counted_keys(self) -> array:
+        return self._keys
+
+    @property
+    def last_move(self) -> Optional[AbstractMove]:
+        return None if len(self._moves) == 0 else decode_move(self._moves[-1])
@@ -0,0 +1,172 @@
+import mmap
+import os
+import random
+import struct
+from typing import Optional
+
+from shared.chess_engine.chess_engine import ChessEngine, legal_moves_with_promotions
+from shared.chess_engine.fen import move_name
+from shared.chess_engine.move import AbstractMove
+from shared.chess_engine.move_encoding import encode_move, decode_move
+
+# File format, all numbers big-endian:
+#   header: magic, format version, reserved, number of entries, number of opening names
+#   entries sorted by position key: Zobrist key, encode_move code, weight, index of the opening name or NO_NAME
+#   opening names: length in bytes followed by UTF-8 text, in the order of their indexes
+# Entries are binary-searched directly in the memory-mapped file, so processes opening the same book share its pages.
+MAGIC = b"CEBK"
+VERSION = 1
+HEADER = struct.Struct(">4sHHII")
+ENTRY = struct.Struct(">QHHI")
+NAME_LENGTH = struct.Struct(">H")
+NO_NAME = 0xFFFFFFFF
+
+SAMPLE_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books", "sample.bin")
+
+# Lines of the sample book in the coordinate notation, each one named after the opening its last move leads to.
+SAMPLE_LINES = [
+    ("King's Pawn Game", "e2e4"),
+    ("Queen's Pawn Game", "d2d4"),
+    ("English Opening", "c2c4"),
+    ("Reti Opening", "g1f3"),
+    ("Open Game", "e2e4 e7e5"),
+    ("Sicilian Defence", "e2e4 c7c5"),
+    ("French Defence", "e2e4 e7e6"),
+    ("Caro-Kann Defence", "e2e4 c7c6"),
+    ("King's Knight Opening", "e2e4 e7e5 g1f3"),
+    ("Petrov's Defence", "e2e4 e7e5 g1f3 g8f6"),
+    ("Italian Game", "e2e4 e7e5 g1f3 b8c6 f1c4"),
+    ("Ruy Lopez", "e2e4 e7e5 g1f3 b8c6 f1b5"),
+    ("Scotch Game", "e2e4 e7e5 g1f3 b8c6 d2d4"),
+    ("Sicilian Defence, Najdorf Variation", "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6"),
+    ("Indian Defence", "d2d4 g8f6"),
+    ("Queen's Gambit", "d2d4 d7d5 c2c4"),
+    ("Queen's Gambit Accepted", "d2d4 d7d5 c2c4 d5c4"),
+    ("Queen's Gambit Declined", "d2d4 d7d5 c2c4 e7e6"),
+    ("Slav Defence", "d2d4 d7d5 c2c4 c7c6"),
+    ("King's Indian Defence", "d2d4 g8f6 c2c4 g7g6"),
+    ("Nimzo-Indian Defence", "d2d4 g8f6 c2c4 e7e6 b1c3 f8b4")
+]
+
+
+class BookMove:
+    def __init__(self, move: AbstractMove, weight: int, opening_name: Optional[str]):
+        self.move = move
+        self.weight = weight
+        self.opening_name = opening_name
+
+
+class OpeningBook:
+    """
+    Read-only opening book keyed by Zobrist position keys. Every entry is a move played from the position, its weight
+    (how often it is played) and optionally the name of the opening the move leads to.
+    """
+
+    def __init__(self, path: str = SAMPLE_BOOK_PATH):
+        with open(path, "rb") as file:
+            # An empty file cannot be mapped at all.
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise RuntimeError("Opening book is too short: " + path)
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self._entry_count, name_count = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise RuntimeError("Unsupported opening book format: " + path)
+
+        self._names: list[str] = []
+        offset = HEADER.size + self._entry_count * ENTRY.size
+        for _ in range(name_count):
+            length, = NAME_LENGTH.unpack_from(self._buffer, offset)
+            offset += NAME_LENGTH.size
+            self._names.append(self._buffer[offset:offset + length].decode("utf-8"))
+            offset += length
+
+    def __len__(self) -> int:
+        return self._entry_count
+
+    def moves(self, key: int) -> list[BookMove]:
+        moves: list[BookMove] = []
+        for i in range(self._first_entry(key), self._entry_count):
+            entry_key, code, weight, name = ENTRY.unpack_from(self._buffer, HEADER.size + i * ENTRY.size)
+            if entry_key != key:
+                break
+            moves.append(BookMove(decode_move(code), weight, None if name == NO_NAME else self._names[name]))
+
+        return moves
+
+    def choose_move(self, engine: ChessEngine, random_source: random.Random = None) -> Optional[AbstractMove]:
+        """Picks a legal book move of the current position at random, proportionally to the weights."""
+        moves = [m for m in self.moves(engine.position_hash) if engine.validate_move(m.move)]
+        if not moves:
+            return None
+
+        return (random_source or random).choices([m.move for m in moves], [m.weight for m in moves])[0]
+
+    def opening_name(self, key: int, move: AbstractMove) -> Optional[str]:
+        """Returns the name of the opening which the move played from the position leads to, if it has one."""
+        code = encode_move(move)
+        return next((m.opening_name for m in self.moves(key) if encode_move(m.move) == code), None)
+
+    def close(self):
+        self._buffer.close()
+
+    def _first_entry(self, key: int) -> int:
+        low, high = 0, self._entry_count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, = struct.unpack_from(">Q", self._buffer, HEADER.size + middle * ENTRY.size)
+            if middle_key < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+
+def write_book(path: str, entries: list[tuple[int, AbstractMove, int, Optional[str]]]):
+    """Writes entries (position key, move, weight, opening name) in the book format."""
+    names: list[str] = []
+    name_indexes: dict[str, int] = {}
+    packed: list[tuple[int, int, int, int]] = []
+    for key, move, weight, name in entries:
+        if name is not None and name not in name_indexes:
+            name_indexes[name] = len(names)
+            names.append(name)
+        packed.append((key, encode_move(move), weight, NO_NAME if name is None else name_indexes[name]))
+    packed.sort()
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(packed), len(names)))
+        for entry in packed:
+            file.write(ENTRY.pack(*entry))
+        for name in names:
+            encoded = name.encode("utf-8")
+            file.write(NAME_LENGTH.pack(len(encoded)))
+            file.write(encoded)
+
+
+def build_book(path: str, lines: list[tuple[str, str]]):
+    """
+    Writes a book of named lines of moves in the coordinate notation. Weights count the lines a move belongs to and
+    a move gets the name of the line it ends.
+    """
+    entries: dict[tuple[int, int], list] = {}
+    for name, line in lines:
+        engine = ChessEngine()
+        names = line.split()
+        for ply, coordinates in enumerate(names):
+            move = next((m for m in legal_moves_with_promotions(engine) if move_name(m) == coordinates), None)
+            if move is None:
+                raise RuntimeError("Illegal move {} in line {}".format(coordinates, name))
+
+            entry = entries.setdefault((engine.position_hash, encode_move(move)), [engine.position_hash, move, 0, None])
+            entry[2] += 1
+            if ply == len(names) - 1:
+                entry[3] = name
+            engine.process_move(move)
+
+    write_book(path, [tuple(entry) for entry in entries.values()])
+
+
+if __name__ == "__main__":
+    build_book(SAMPLE_BOOK_PATH, SAMPLE_LINES)
@@ -0,0 +1,103 @@
+import argparse
+import time
+
+from shared.chess_engine.chess_engine import ChessEngine, legal_moves_with_promotions
+from shared.chess_engine.chessboard import BoardType
+from shared.chess_engine.fen import INITIAL_FEN, move_name
+
+
+class PerftPosition:
+    """A position with known perft node counts: nodes[0] is the number of nodes at depth 1 and so on."""
+
+    def __init__(self, name: str, fen: str, nodes: list[int]):
+        self.name = name
+        self.fen = fen
+        self.nodes = nodes
+
+
+# Reference positions from the Chess Programming Wiki 'Perft Results' page.
+SUITE = [
+    PerftPosition("initial", INITIAL_FEN, [20, 400, 8902, 197281]),
+    PerftPosition("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                  [48, 2039, 97862, 4085603]),
+    PerftPosition("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    PerftPosition("promotions", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                  [6, 264, 9467, 422333]),
+    PerftPosition("talkchess", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    PerftPosition("middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+                  [46, 2079, 89890, 3894594])
+]
+
+
+def perft(engine: ChessEngine, depth: int) -> int:
+    """Counts leaf nodes of the legal move tree of the given depth. The engine is left in its initial position."""
+    moves = legal_moves_with_promotions(engine)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    for move in moves:
+        engine.make_move(move)
+        nodes += perft(engine, depth - 1)
+        engine.unmake_move()
+
+    return nodes
+
+
+def divide(engine: ChessEngine, depth: int) -> dict[str, int]:
+    """Returns perft node counts of the given depth split by the first move, which is the usual way to find bugs."""
+    results: dict[str, int] = {}
+    for move in legal_moves_with_promotions(engine):
+        engine.make_move(move)
+        results[move_name(move)] = perft(engine, depth - 1)
+        engine.unmake_move()
+
+    return results
+
+
+def run_suite(max_depth: int, board_type: BoardType = BoardType.DICT) -> bool:
+    """Runs every position of the suite up to max_depth, printing node counts and speed. Returns True if all match."""
+    all_passed = True
+    total_nodes = 0
+    total_time = 0.0
+    for position in SUITE:
+        for depth in range(1, min(max_depth, len(position.nodes)) + 1):
+            engine = ChessEngine.from_fen(position.fen, board_type)
+            start = time.perf_counter()
+            nodes = perft(engine, depth)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+
+            expected = position.nodes[depth - 1]
+            passed = nodes == expected
+            all_passed = all_passed and passed
+            print("{:<12} depth {} {:>10} nodes {:>9.2f} s {:>10.0f} nps {}".format(
+                position.name, depth, nodes, elapsed, nodes / elapsed if elapsed else 0,
+                "ok" if passed else "FAILED (expected {})".format(expected)
+            ))
+
+    print("total {} nodes in {:.2f} s, {:.0f} nps".format(total_nodes, total_time,
+                                                           total_nodes / total_time if total_time else 0))
+    return all_passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Counts leaf nodes of the move tree to test and benchmark the engine")
+    parser.add_argument("depth", type=int, nargs="?", default=3)
+    parser.add_argument("--position", choices=[p.name for p in SUITE],
+                        help="run divide for a single position instead of the whole suite")
+    parser.add_argument("--bitboard", action="store_true", help="use the bitboard chessboard")
+    args = parser.parse_args()
+    chosen_board_type = BoardType.BITBOARD if args.bitboard else BoardType.DICT
+
+    if args.position:
+        chosen = next(p for p in SUITE if p.name == args.position)
+        divide_start = time.perf_counter()
+        divided = divide(ChessEngine.from_fen(chosen.fen, chosen_board_type), args.depth)
+        divide_time = time.perf_counter() - divide_start
+        for name, count in sorted(divided.items()):
+            print("{}: {}".format(name, count))
+        print("total {} nodes in {:.2f} s".format(sum(divided.values()), divide_time))
+    else:
+        exit(0 if run_suite(args.depth, chosen_board_type) else 1)
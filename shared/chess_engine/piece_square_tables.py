@@ -0,0 +1,163 @@
+from shared.chess_engine.piece import Piece, PieceType, Team
+from shared.chess_engine.position import Vector2d
+
+PIECE_VALUES = {
+    PieceType.PAWN: 100,
+    PieceType.KNIGHT: 320,
+    PieceType.BISHOP: 330,
+    PieceType.ROOK: 500,
+    PieceType.QUEEN: 900,
+    PieceType.KING: 0
+}
+
+# Game phase weights of pieces: the phase is MAX_PHASE with all pieces on the board and 0 with pawns and kings only.
+PHASE_WEIGHTS = {
+    PieceType.PAWN: 0,
+    PieceType.KNIGHT: 1,
+    PieceType.BISHOP: 1,
+    PieceType.ROOK: 2,
+    PieceType.QUEEN: 4,
+    PieceType.KING: 0
+}
+MAX_PHASE = 24
+
+# Bonuses of white pieces by field, written as seen from the white side: the eighth rank first. Black pieces use
+# the tables mirrored vertically. Only the king plays differently in the endgame.
+_PAWN_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0
+]
+_KNIGHT_TABLE = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50
+]
+_BISHOP_TABLE = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20
+]
+_ROOK_TABLE = [
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0
+]
+_QUEEN_TABLE = [
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    0, 0, 5, 5, 5, 5, 0, -5,
+    -10, 5, 5, 5, 5, 5, 0, -10,
+    -10, 0, 5, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20
+]
+_KING_MIDDLEGAME_TABLE = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20
+]
+_KING_ENDGAME_TABLE = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50
+]
+
+_MIDDLEGAME_TABLES = {
+    PieceType.PAWN: _PAWN_TABLE,
+    PieceType.KNIGHT: _KNIGHT_TABLE,
+    PieceType.BISHOP: _BISHOP_TABLE,
+    PieceType.ROOK: _ROOK_TABLE,
+    PieceType.QUEEN: _QUEEN_TABLE,
+    PieceType.KING: _KING_MIDDLEGAME_TABLE
+}
+_ENDGAME_TABLES = {**_MIDDLEGAME_TABLES, PieceType.KING: _KING_ENDGAME_TABLE}
+
+
+def _square_scores(tables: dict[PieceType, list[int]]) -> dict[Team, dict[PieceType, list[int]]]:
+    """Material and table bonus by square_index, positive for white pieces and negative for black ones."""
+    return {
+        Team.WHITE: {t: [PIECE_VALUES[t] + table[(7 - s // 8) * 8 + s % 8] for s in range(64)]
+                     for t, table in tables.items()},
+        Team.BLACK: {t: [-PIECE_VALUES[t] - table[s] for s in range(64)] for t, table in tables.items()}
+    }
+
+
+MIDDLEGAME_SCORES = _square_scores(_MIDDLEGAME_TABLES)
+ENDGAME_SCORES = _square_scores(_ENDGAME_TABLES)
+
+
+class PieceSquareScore:
+    """
+    Material and piece-square table score of the position, from the white point of view, kept up to date by
+    the engine as pieces are added, removed and moved, instead of being summed up over all pieces for every
+    evaluation. Middlegame and endgame scores are kept separately and blended by the game phase.
+    """
+
+    def __init__(self, pieces: list[Piece]):
+        self.middlegame = 0
+        self.endgame = 0
+        self.phase = 0
+        for piece in pieces:
+            self.add(piece.type, piece.team, piece.position)
+
+    def add(self, piece_type: PieceType, team: Team, position: Vector2d):
+        self.middlegame += MIDDLEGAME_SCORES[team][piece_type][position.index]
+        self.endgame += ENDGAME_SCORES[team][piece_type][position.index]
+        self.phase += PHASE_WEIGHTS[piece_type]
+
+    def remove(self, piece_type: PieceType, team: Team, position: Vector2d):
+        self.middlegame -= MIDDLEGAME_SCORES[team][piece_type][position.index]
+        self.endgame -= ENDGAME_SCORES[team][piece_type][position.index]
+        self.phase -= PHASE_WEIGHTS[piece_type]
+
+    def move(self, piece_type: PieceType, team: Team, position_from: Vector2d, position_to: Vector2d):
+        middlegame_scores = MIDDLEGAME_SCORES[team][piece_type]
+        endgame_scores = ENDGAME_SCORES[team][piece_type]
+        self.middlegame += middlegame_scores[position_to.index] - middlegame_scores[position_from.index]
+        self.endgame += endgame_scores[position_to.index] - endgame_scores[position_from.index]
+
+    @property
+    def state(self) -> tuple[int, int, int]:
+        return self.middlegame, self.endgame, self.phase
+
+    @state.setter
+    def state(self, state: tuple[int, int, int]):
+        self.middlegame, self.endgame, self.phase = state
+
+    @property
+    def score(self) -> int:
+        """Middlegame and endgame scores blended by the phase; promotions may push the phase above MAX_PHASE."""
+        phase = min(self.phase, MAX_PHASE)
+        return (self.middlegame * phase + self.endgame * (MAX_PHASE - phase)) // MAX_PHASE
@@ -2,16 +2,41 @@ from __future__ import annotations
 
 
 class Vector2d:
-    def __init__(self, x: int, y: int):
-        self.coords = (x, y)
+    """
+    Immutable integer 2d vector. Vectors pointing at fields of the chessboard are interned: Vector2d(x, y) returns
+    the same instance every time, which carries its square index, so comparing them is usually an identity check and
+    hashing them costs nothing. Since an instance is shared by everything using the field, setting its attributes
+    raises AttributeError.
+    """
 
-    @property
-    def x(self) -> int:
-        return self.coords[0]
+    __slots__ = ("x", "y", "index", "_hash")
+
+    def __new__(cls, x: int, y: int) -> Vector2d:
+        if 0 <= x < 8 and 0 <= y < 8 and _SQUARES:
+            return _SQUARES[y * 8 + x]
+
+        return cls._create(x, y)
+
+    @classmethod
+    def _create(cls, x: int, y: int) -> Vector2d:
+        vector = object.__new__(cls)
+        index = y * 8 + x if 0 <= x < 8 and 0 <= y < 8 else None
+        object.__setattr__(vector, "x", x)
+        object.__setattr__(vector, "y", y)
+        object.__setattr__(vector, "index", index)
+        object.__setattr__(vector, "_hash", hash((x, y)) if index is None else index)
+
+        return vector
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError("Vector2d is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("Vector2d is immutable")
 
     @property
-    def y(self) -> int:
-        return self.coords[1]
+    def coords(self) -> tuple[int, int]:
+        return self.x, self.y
 
     def upper(self) -> Vector2d:
         return self + UP
@@ -56,14 +81,24 @@ class Vector2d:
         return Vector2d(self.x // other, self.y // other)
 
     def __eq__(self, other: Vector2d) -> bool:
-        return self.x == other.x and self.y == other.y
+        return self is other or (isinstance(other, Vector2d) and self.x == other.x and self.y == other.y)
 
     def __hash__(self) -> int:
-        return hash(self.coords)
+        return self._hash
+
+    def __reduce__(self):
+        return Vector2d, (self.x, self.y)
 
     def __str__(self) -> str:
         return "({}, {})".format(self.x, self.y)
 
+    def __repr__(self) -> str:
+        return "Vector2d({}, {})".format(self.x, self.y)
+
+
+_SQUARES: list[Vector2d] = []
+_SQUARES.extend(Vector2d._create(i % 8, i // 8) for i in range(64))
+
 
 def centre(pos_1: Vector2d, pos_2: Vector2d) -> Vector2d:
     return Vector2d((pos_1.x + pos_2.x) // 2, (pos_1.y + pos_2.y) // 2)
@@ -77,6 +112,15 @@ def distance_y(pos_1: Vector2d, pos_2: Vector2d) -> int:
     return abs(pos_1.y - pos_2.y)
 
 
+def square_index(position: Vector2d) -> int:
+    """Numbers fields from 0 to 63 rank by rank, starting from the white side."""
+    return position.index
+
+
+def square_position(index: int) -> Vector2d:
+    return _SQUARES[index]
+
+
 UP = Vector2d(0, 1)
 UP_RIGHT = Vector2d(1, 1)
 RIGHT = Vector2d(1, 0)
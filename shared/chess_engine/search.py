@@ -0,0 +1,301 @@
+import time
+from typing import Optional
+
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.evaluation import evaluate
+from shared.chess_engine.move import AbstractMove, MoveType, Promotion, PromotionWithCapturing
+from shared.chess_engine.opening_book import OpeningBook
+from shared.chess_engine.piece import PieceType, Team
+from shared.chess_engine.piece_square_tables import PIECE_VALUES
+from shared.chess_engine.position import Vector2d
+from shared.chess_engine.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+MATE_SCORE = 100_000
+INFINITY = 1_000_000
+MAX_PLY = 64
+DEFAULT_MAX_DEPTH = 32
+
+# Value of the king as a capturing piece for MVV-LVA ordering: it should capture last.
+KING_ATTACKER_VALUE = 1000
+
+# A rook or a bishop is never a better choice than a queen, apart from rare stalemate tricks, so only a queen and
+# a knight are searched.
+PROMOTION_PIECE_TYPES = (PieceType.QUEEN, PieceType.KNIGHT)
+
+CAPTURE_MOVE_TYPES = (MoveType.CAPTURING, MoveType.EN_PASSANT, MoveType.PROMOTION_WITH_CAPTURING)
+PROMOTION_MOVE_TYPES = (MoveType.PROMOTION, MoveType.PROMOTION_WITH_CAPTURING)
+
+# Move ordering scores: the transposition table move first, then captures and promotions, then killer moves, then
+# quiet moves by their history score.
+_TABLE_MOVE_ORDER = 20_000_000
+_CAPTURE_ORDER = 10_000_000
+_KILLER_ORDER = 9_000_000
+
+# How many nodes are searched between two checks of the clock.
+TIME_CHECK_INTERVAL = 64
+
+
+class SearchResult:
+    """
+    The best move found and its score in centipawns from the point of view of the moving team. Mates are scored
+    MATE_SCORE minus the number of plies to the mate. best_move is None if there are no legal moves. Moves taken
+    from the opening book are not searched, so their score and depth are 0.
+    """
+
+    def __init__(self, best_move: Optional[AbstractMove], score: int, depth: int, nodes: int, elapsed: float,
+                 from_book: bool = False):
+        self.best_move = best_move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.from_book = from_book
+
+    @property
+    def mate_found(self) -> bool:
+        return abs(self.score) >= MATE_SCORE - MAX_PLY
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class Searcher:
+    """
+    Negamax alpha-beta search with iterative deepening and quiescence search. Moves are ordered by the best move
+    from the transposition table, MVV-LVA (most valuable victim, least valuable attacker), then killer moves and the
+    history heuristic. The table may be shared by consecutive searches of the same game, which keeps what earlier
+    searches have learnt. If an opening book is given, positions found in it are not searched at all.
+
+    The engine is searched in place, with make_move and unmake_move, and is back in its original position when
+    search returns, also when the time budget runs out. It must not be used by anything else in the meantime.
+    """
+
+    def __init__(self, transposition_table: TranspositionTable = None, opening_book: OpeningBook = None):
+        self.transposition_table = transposition_table or TranspositionTable()
+        self.opening_book = opening_book
+        self.nodes = 0
+        self._killers: list[list[Optional[AbstractMove]]] = []
+        self._history: dict[tuple[Team, Vector2d, Vector2d], int] = {}
+        self._deadline: Optional[float] = None
+
+    def search(self, engine: ChessEngine, max_depth: int = DEFAULT_MAX_DEPTH,
+               time_limit: Optional[float] = None) -> SearchResult:
+        """
+        Searches one ply deeper at a time until max_depth is reached or time_limit (in seconds) runs out. The result
+        of the deepest completed iteration is returned; if not even the first one completes, the result is a legal
+        move of depth 0.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self._killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        self._history = {}
+        self._deadline = None if time_limit is None else start + time_limit
+        self.transposition_table.new_search()
+
+        moves = _expand_promotions(engine.all_legal_moves())
+        if not moves:
+            score = -MATE_SCORE if engine.check_status.checked else 0
+            return SearchResult(None, score, 0, 0, time.perf_counter() - start)
+
+        if self.opening_book is not None:
+            book_move = self.opening_book.choose_move(engine)
+            if book_move is not None:
+                return SearchResult(book_move, 0, 0, 0, time.perf_counter() - start, True)
+
+        result = SearchResult(moves[0], 0, 0, 0, 0.0)
+        moves = self._order_moves(engine, moves, 0)
+        for depth in range(1, min(max_depth, MAX_PLY) + 1):
+            try:
+                score, best_move = self._search_root(engine, moves, depth)
+            except _SearchTimeout:
+                break
+
+            result = SearchResult(best_move, score, depth, self.nodes, time.perf_counter() - start)
+            if result.mate_found:
+                break
+
+            # The best move of the previous iteration is searched first, which makes the most cutoffs. Promotions to
+            # different pieces are equal, hence the identity check.
+            moves.insert(0, moves.pop(next(i for i, m in enumerate(moves) if m is best_move)))
+
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _search_root(self, engine: ChessEngine, moves: list[AbstractMove], depth: int) -> tuple[int, AbstractMove]:
+        alpha = -INFINITY
+        best_move = moves[0]
+        for move in moves:
+            engine.make_move(move)
+            try:
+                score = -self._negamax(engine, depth - 1, -INFINITY, -alpha, 1)
+            finally:
+                engine.unmake_move()
+
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        return alpha, best_move
+
+    def _negamax(self, engine: ChessEngine, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self._count_node()
+        if engine.can_claim_draw():
+            return 0
+
+        checked = engine.check_status.checked
+        # Positions in check are not left to the quiescence search, which would miss quiet evasions.
+        if depth <= 0 and not checked or ply >= MAX_PLY:
+            return self._quiescence(engine, alpha, beta, ply)
+
+        key = engine.position_hash
+        entry = self.transposition_table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_move = entry.best_move
+            if entry.depth >= depth:
+                score = _score_from_table(entry.score, ply)
+                if entry.bound == EXACT:
+                    return score
+                elif entry.bound == LOWER_BOUND and score >= beta:
+                    return beta
+                elif entry.bound == UPPER_BOUND and score <= alpha:
+                    return alpha
+
+        moves = engine.all_legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if checked else 0
+
+        team = engine.currently_moving_team
+        best_move = None
+        for move in self._order_moves(engine, _expand_promotions(moves), ply, table_move):
+            engine.make_move(move)
+            try:
+                score = -self._negamax(engine, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                engine.unmake_move()
+
+            if score >= beta:
+                if move.type not in CAPTURE_MOVE_TYPES:
+                    self._store_killer(move, ply)
+                    history_key = (team, move.position_from, move.position_to)
+                    self._history[history_key] = self._history.get(history_key, 0) + depth * depth
+                self.transposition_table.store(key, depth, LOWER_BOUND, _score_to_table(beta, ply), move)
+                return beta
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        bound = UPPER_BOUND if best_move is None else EXACT
+        self.transposition_table.store(key, depth, bound, _score_to_table(alpha, ply), best_move)
+        return alpha
+
+    def _quiescence(self, engine: ChessEngine, alpha: int, beta: int, ply: int) -> int:
+        """Searches captures and promotions only, until the position is quiet, to avoid the horizon effect."""
+        self._count_node()
+        moves = engine.all_legal_moves()
+        if engine.check_status.checked:
+            if not moves:
+                return -MATE_SCORE + ply
+        else:
+            stand_pat = evaluate(engine)
+            if stand_pat >= beta:
+                return beta
+            elif ply >= MAX_PLY:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            moves = [m for m in moves if m.type in CAPTURE_MOVE_TYPES or m.type == MoveType.PROMOTION]
+
+        for move in self._order_moves(engine, _expand_promotions(moves), ply):
+            engine.make_move(move)
+            try:
+                score = -self._quiescence(engine, -beta, -alpha, ply + 1)
+            finally:
+                engine.unmake_move()
+
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def _order_moves(self, engine: ChessEngine, moves: list[AbstractMove], ply: int,
+                     table_move: AbstractMove = None) -> list[AbstractMove]:
+        killers = self._killers[ply] if ply < len(self._killers) else (None, None)
+        team = engine.currently_moving_team
+        board = engine.board
+
+        def order(move: AbstractMove) -> int:
+            if move == table_move and (move.type not in PROMOTION_MOVE_TYPES
+                                       or move.piece_type == table_move.piece_type):
+                return _TABLE_MOVE_ORDER
+            elif move.type in CAPTURE_MOVE_TYPES or move.type in PROMOTION_MOVE_TYPES:
+                score = _CAPTURE_ORDER
+                if move.type == MoveType.EN_PASSANT:
+                    score += 10 * PIECE_VALUES[PieceType.PAWN] - PIECE_VALUES[PieceType.PAWN]
+                elif move.type != MoveType.PROMOTION:
+                    attacker = board.piece_at(move.position_from).type
+                    score += 10 * PIECE_VALUES[board.piece_at(move.position_to).type] \
+                        - (KING_ATTACKER_VALUE if attacker == PieceType.KING else PIECE_VALUES[attacker])
+                if move.type in PROMOTION_MOVE_TYPES:
+                    score += 10 * PIECE_VALUES[move.piece_type]
+                return score
+            elif move == killers[0]:
+                return _KILLER_ORDER
+            elif move == killers[1]:
+                return _KILLER_ORDER - 1
+            else:
+                return self._history.get((team, move.position_from, move.position_to), 0)
+
+        return sorted(moves, key=order, reverse=True)
+
+    def _store_killer(self, move: AbstractMove, ply: int):
+        killers = self._killers[ply]
+        if move != killers[0]:
+            killers[1] = killers[0]
+            killers[0] = move
+
+    def _count_node(self):
+        self.nodes += 1
+        if self._deadline is not None and self.nodes % TIME_CHECK_INTERVAL == 0 \
+                and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+
+
+def find_best_move(engine: ChessEngine, max_depth: int = DEFAULT_MAX_DEPTH,
+                   time_limit: Optional[float] = None) -> Optional[AbstractMove]:
+    return Searcher().search(engine, max_depth, time_limit).best_move
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    """Mate scores are stored as the distance from the stored position, not from the root, which may differ."""
+    if score >= MATE_SCORE - MAX_PLY:
+        return score + ply
+    elif score <= -MATE_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    if score >= MATE_SCORE - MAX_PLY:
+        return score - ply
+    elif score <= -MATE_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+def _expand_promotions(moves: list[AbstractMove]) -> list[AbstractMove]:
+    """Generated promotions have no piece type chosen; they are replaced with a move for every searched piece type."""
+    expanded: list[AbstractMove] = []
+    for move in moves:
+        if move.type == MoveType.PROMOTION and move.piece_type is None:
+            expanded += [Promotion(move.position_from, move.position_to, t) for t in PROMOTION_PIECE_TYPES]
+        elif move.type == MoveType.PROMOTION_WITH_CAPTURING and move.piece_type is None:
+            expanded += [PromotionWithCapturing(move.position_from, move.position_to, t)
+                         for t in PROMOTION_PIECE_TYPES]
+        else:
+            expanded.append(move)
+
+    return expanded
@@ -0,0 +1,107 @@
+from array import array
+from typing import Optional
+
+from shared.chess_engine.move import AbstractMove
+from shared.chess_engine.move_encoding import encode_move, decode_move
+
+DEFAULT_SIZE_MB = 16
+
+# Bound types of stored scores. Zero is left out, so that a zero data word marks an empty slot.
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+# Every entry takes two 64-bit words: the position key and the data word packed as below.
+ENTRY_SIZE = 16
+BUCKET_SIZE = 2
+_NO_MOVE = 0
+_SCORE_OFFSET = 1 << 31
+_MOVE_BITS = 16
+_SCORE_SHIFT = 16
+_DEPTH_SHIFT = 48
+_BOUND_SHIFT = 56
+_AGE_SHIFT = 58
+_MAX_AGE = 63
+
+
+class TranspositionEntry:
+    def __init__(self, depth: int, bound: int, score: int, best_move: Optional[AbstractMove]):
+        self.depth = depth
+        self.bound = bound
+        self.score = score
+        self.best_move = best_move
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by 64-bit Zobrist position keys. Entries are kept in two
+    preallocated flat arrays, keys and packed data words, grouped into buckets of two slots: the first slot keeps
+    the deepest result (unless it is left from an older search), the second one is always replaced.
+
+    Best moves are stored with encode_move, so a move read back is a new object equal to the stored one.
+    """
+
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB):
+        buckets = max(1, int(size_mb * 1024 * 1024) // (ENTRY_SIZE * BUCKET_SIZE))
+        # Rounded down to a power of two, so that a bucket is found by masking the key.
+        buckets = 1 << (buckets.bit_length() - 1)
+        self._mask = buckets - 1
+        self._keys = array("Q", [0]) * (buckets * BUCKET_SIZE)
+        self._data = array("Q", [0]) * (buckets * BUCKET_SIZE)
+        self._age = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._keys)
+
+    @property
+    def hit_rate(self) -> float:
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def new_search(self):
+        """Marks entries stored so far as old, so that deep results of previous searches can be replaced."""
+        self._age = (self._age + 1) & _MAX_AGE
+
+    def probe(self, key: int) -> Optional[TranspositionEntry]:
+        slot = (key & self._mask) * BUCKET_SIZE
+        for i in (slot, slot + 1):
+            data = self._data[i]
+            if data and self._keys[i] == key:
+                self.hits += 1
+                move = data & 0xFFFF
+                return TranspositionEntry(
+                    data >> _DEPTH_SHIFT & 0xFF,
+                    data >> _BOUND_SHIFT & 3,
+                    (data >> _SCORE_SHIFT & 0xFFFFFFFF) - _SCORE_OFFSET,
+                    None if move == _NO_MOVE else decode_move(move)
+                )
+
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, best_move: Optional[AbstractMove]):
+        data = (_NO_MOVE if best_move is None else encode_move(best_move)) \
+               | (score + _SCORE_OFFSET) << _SCORE_SHIFT \
+               | max(0, min(depth, 0xFF)) << _DEPTH_SHIFT \
+               | bound << _BOUND_SHIFT \
+               | self._age << _AGE_SHIFT
+
+        slot = (key & self._mask) * BUCKET_SIZE
+        stored = self._data[slot]
+        if not stored or self._keys[slot] == key or stored >> _AGE_SHIFT != self._age \
+                or depth >= (stored >> _DEPTH_SHIFT & 0xFF):
+            self._keys[slot] = key
+            self._data[slot] = data
+        else:
+            self._keys[slot + 1] = key
+            self._data[slot + 1] = data
+
+    def clear(self):
+        self._keys = array("Q", [0]) * len(self._keys)
+        self._data = array("Q", [0]) * len(self._data)
+        self._age = 0
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,59 @@
+import random
+from enum import Enum, auto
+from typing import Optional
+
+from shared.chess_engine.move_history import CastleRight
+from shared.chess_engine.piece import Team, PieceType, Piece
+from shared.chess_engine.position import Vector2d
+
+# Keys have to be the same in every process (and between the client and the server), so they are generated from
+# a fixed seed instead of the default random source.
+SEED = 0x5EED_C4E5
+
+_random = random.Random(SEED)
+
+
+def _random_key() -> int:
+    return _random.getrandbits(64)
+
+
+PIECE_KEYS: dict[Team, dict[PieceType, list[int]]] = {
+    team: {piece_type: [_random_key() for _ in range(64)] for piece_type in PieceType} for team in Team
+}
+SIDE_KEY = _random_key()
+CASTLE_RIGHT_KEYS: dict[Team, dict[CastleRight, int]] = {
+    team: {right: 0 if right == CastleRight.NONE else _random_key() for right in CastleRight} for team in Team
+}
+EN_PASSANT_KEYS: list[int] = [_random_key() for _ in range(8)]
+
+
+class PositionHashing(Enum):
+    """Decides what MoveHistory counts to detect repetitions: whole board snapshots or 64-bit Zobrist keys."""
+    SNAPSHOT = auto()
+    ZOBRIST = auto()
+
+
+def piece_key(piece_type: PieceType, team: Team, position: Vector2d) -> int:
+    return PIECE_KEYS[team][piece_type][position.y * 8 + position.x]
+
+
+def castle_rights_key(castle_rights: dict[Team, CastleRight]) -> int:
+    return CASTLE_RIGHT_KEYS[Team.WHITE][castle_rights[Team.WHITE]] \
+           ^ CASTLE_RIGHT_KEYS[Team.BLACK][castle_rights[Team.BLACK]]
+
+
+def en_passant_key(en_passant_file: Optional[int]) -> int:
+    return 0 if en_passant_file is None else EN_PASSANT_KEYS[en_passant_file]
+
+
+def position_key(pieces: list[Piece], currently_moving_team: Team, castle_rights: dict[Team, CastleRight],
+                 en_passant_file: Optional[int]) -> int:
+    """Computes the key from scratch. During a game the key should be updated incrementally instead."""
+    key = castle_rights_key(castle_rights) ^ en_passant_key(en_passant_file)
+    if currently_moving_team == Team.BLACK:
+        key ^= SIDE_KEY
+
+    for piece in pieces:
+        key ^= piece_key(piece.type, piece.team, piece.position)
+
+    return key
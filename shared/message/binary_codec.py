@@ -0,0 +1,97 @@
+import json
+import struct
+from typing import Optional
+
+from shared.chess_engine.move_encoding import encode_move, decode_move
+from shared.message.message_code import MessageCode
+
+# Version of the binary framing. A client asks for it with the "binaryProtocol" field of its sign-in or sign-up
+# message and the server confirms it with the same field of the response; from then on both sides may send the
+# messages below as binary frames. All other messages, and all messages of clients which did not ask, stay JSON.
+BINARY_PROTOCOL_VERSION = 1
+
+# Every frame starts with the message code, followed by the payload of the code, all numbers big-endian:
+#   GAME_MOVE: encode_move code, and the time left of the moving player in ms when sent by the server, followed by the
+#     UTF-8 name of the opening the move leads to, if there is one
+#   GAME_RESPOND_TO_DRAW_OFFER: whether the offer was accepted
+#   GAME_OFFER_DRAW, GAME_TIME_END: nothing
+HEADER = struct.Struct(">B")
+MOVE = struct.Struct(">H")
+MOVE_WITH_TIME = struct.Struct(">Hi")
+DRAW_RESPONSE = struct.Struct(">?")
+
+BINARY_CODES = frozenset((
+    MessageCode.GAME_MOVE,
+    MessageCode.GAME_OFFER_DRAW,
+    MessageCode.GAME_RESPOND_TO_DRAW_OFFER,
+    MessageCode.GAME_TIME_END
+))
+_BINARY_CODE_VALUES = frozenset(c.value for c in BINARY_CODES)
+
+
+def has_binary_form(code: int) -> bool:
+    return code in _BINARY_CODE_VALUES
+
+
+def encode_message(message: dict) -> bytes:
+    """
+    Packs a message of one of BINARY_CODES. The message has the same fields as its JSON form, except for the move of
+    GAME_MOVE, which is an AbstractMove instead of its dictionary.
+    """
+    code = message["code"]
+    if code not in _BINARY_CODE_VALUES:
+        raise ValueError("Message has no binary form: {}".format(code))
+
+    header = HEADER.pack(code)
+    if code == MessageCode.GAME_MOVE.value:
+        if "timeLeft" in message:
+            frame = header + MOVE_WITH_TIME.pack(encode_move(message["move"]), message["timeLeft"])
+            if "openingName" in message:
+                frame += message["openingName"].encode("utf-8")
+            return frame
+        else:
+            return header + MOVE.pack(encode_move(message["move"]))
+    elif code == MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value:
+        return header + DRAW_RESPONSE.pack(message["accepted"])
+    else:
+        return header
+
+
+def encode_frames(message: dict, binary_message: dict = None, binary: bool = True) -> tuple[str, Optional[bytes]]:
+    """
+    Serializes the message to JSON and, if binary is true and the message has a binary form, to a binary frame.
+    binary_message is the message in the form taken by encode_message, if it differs from the JSON one.
+    """
+    frame = None
+    if binary and has_binary_form(message["code"]):
+        frame = encode_message(binary_message or message)
+
+    return json.dumps(message), frame
+
+
+def decode_message(frame: bytes) -> dict:
+    """The inverse of encode_message. Raises ValueError if the frame is malformed."""
+    if len(frame) < HEADER.size:
+        raise ValueError("Empty frame")
+
+    code, = HEADER.unpack_from(frame)
+    payload = memoryview(frame)[HEADER.size:]
+    try:
+        if code == MessageCode.GAME_MOVE.value:
+            if len(payload) >= MOVE_WITH_TIME.size:
+                move, time_left = MOVE_WITH_TIME.unpack_from(payload)
+                message = {"code": code, "move": decode_move(move), "timeLeft": time_left}
+                if len(payload) > MOVE_WITH_TIME.size:
+                    message["openingName"] = bytes(payload[MOVE_WITH_TIME.size:]).decode("utf-8")
+                return message
+            move, = MOVE.unpack(payload)
+            return {"code": code, "move": decode_move(move)}
+        elif code == MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value:
+            accepted, = DRAW_RESPONSE.unpack(payload)
+            return {"code": code, "accepted": accepted}
+        elif code in _BINARY_CODE_VALUES and not payload:
+            return {"code": code}
+    except (struct.error, RuntimeError, UnicodeDecodeError) as e:
+        raise ValueError("Malformed frame of message {}: {}".format(code, e))
+
+    raise ValueError("Malformed frame of message {}".format(code))
@@ -20,3 +20,6 @@ class MessageCode(Enum):
     GAME_MOVE = 16
     GAME_TIME_END = 17
     PLAYER_DISCONNECTED = 18
+    SPECTATE = 19
+    STOP_SPECTATING = 20
+    GAME_SNAPSHOT = 21
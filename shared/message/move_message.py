@@ -0,0 +1,20 @@
+from shared.chess_engine.move import AbstractMove, MoveType
+
+
+def move_to_message(move: AbstractMove) -> dict:
+    """The move as sent in JSON messages."""
+    move_dict = {
+        "type": move.type.value,
+        "positionFrom": move.position_from.coords,
+        "positionTo": move.position_to.coords
+    }
+
+    if move.type == MoveType.CASTLING:
+        move_dict["rookFrom"] = move.rook_from.coords
+        move_dict["rookTo"] = move.rook_to.coords
+    elif move.type == MoveType.EN_PASSANT:
+        move_dict["capturedPosition"] = move.captured_position.coords
+    elif move.type == MoveType.PROMOTION or move.type == MoveType.PROMOTION_WITH_CAPTURING:
+        move_dict["pieceType"] = move.piece_type.value
+
+    return move_dict
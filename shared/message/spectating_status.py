@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class SpectatingStatus(Enum):
+    SUCCESS = 1
+    GAME_NOT_EXIST = 2
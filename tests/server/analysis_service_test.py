@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from server.game.analysis_service import AnalysisService, analyse_fen
+from shared.chess_engine.move import Move
+from shared.chess_engine.move_encoding import decode_move
+from shared.chess_engine.opening_book import SAMPLE_BOOK_PATH
+from shared.chess_engine.position import Vector2d
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+INITIAL = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+MIDDLEGAME = "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"
+
+
+def test_analyse_fen():
+    best_move, score, depth, nodes, from_book = analyse_fen(MATE_IN_ONE, 2, 5.0)
+
+    assert decode_move(best_move) == Move(Vector2d(0, 0), Vector2d(0, 7))
+    assert depth == 1
+    assert nodes > 0
+    assert not from_book
+
+
+@pytest.mark.asyncio
+async def test_analyse():
+    service = AnalysisService(1, transposition_table_mb=1)
+    try:
+        result = await service.analyse(MATE_IN_ONE, time_limit=10.0, max_depth=2)
+
+        assert result.best_move == Move(Vector2d(0, 0), Vector2d(0, 7))
+        assert not result.from_book
+        assert service.pending == 0
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_analyse_with_opening_book():
+    service = AnalysisService(1, transposition_table_mb=1, opening_book_path=SAMPLE_BOOK_PATH)
+    try:
+        result = await service.analyse(INITIAL, time_limit=10.0)
+
+        assert result.from_book
+        assert result.best_move is not None
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_analyse_deadline():
+    service = AnalysisService(1, max_pending=1, transposition_table_mb=1)
+    try:
+        await service.warm_up()
+        slow = asyncio.ensure_future(service.analyse(MIDDLEGAME, time_limit=3.0))
+        await asyncio.sleep(0.1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await service.analyse(MATE_IN_ONE, time_limit=0.5)
+
+        assert (await slow).best_move is not None
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slot_held_until_search_ends():
+    service = AnalysisService(1, max_pending=1, transposition_table_mb=1)
+    owner = object()
+    try:
+        await service.warm_up()
+        cancelled = asyncio.ensure_future(service.analyse(MIDDLEGAME, owner, time_limit=1.0))
+        await asyncio.sleep(0.1)
+
+        service.cancel(owner)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        assert service._slots.locked()
+        result = await service.analyse(MATE_IN_ONE, time_limit=10.0, max_depth=2)
+        assert result.best_move == Move(Vector2d(0, 0), Vector2d(0, 7))
+        assert not service._slots.locked()
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_backpressure():
+    service = AnalysisService(1, max_pending=1, transposition_table_mb=1)
+    try:
+        slow = asyncio.ensure_future(service.analyse(MIDDLEGAME, time_limit=2.0))
+        waiting = [asyncio.ensure_future(service.analyse(MATE_IN_ONE, time_limit=10.0, max_depth=2))
+                   for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        assert service.pending == 3
+        assert service._slots.locked()
+        assert not any(request.done() for request in waiting)
+
+        results = await asyncio.gather(slow, *waiting)
+        assert all(r.best_move == Move(Vector2d(0, 0), Vector2d(0, 7)) for r in results[1:])
+        assert service.pending == 0
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    service = AnalysisService(1, max_pending=1, transposition_table_mb=1)
+    owner = object()
+    try:
+        first = asyncio.ensure_future(service.analyse(MIDDLEGAME, owner, time_limit=1.0))
+        second = asyncio.ensure_future(service.analyse(MIDDLEGAME, owner, time_limit=1.0))
+        other = asyncio.ensure_future(service.analyse(MATE_IN_ONE, time_limit=10.0, max_depth=2))
+        await asyncio.sleep(0.1)
+
+        service.cancel(owner)
+
+        for request in (first, second):
+            with pytest.raises(asyncio.CancelledError):
+                await request
+        assert (await other).best_move == Move(Vector2d(0, 0), Vector2d(0, 7))
+        assert service.pending == 0
+    finally:
+        service.shutdown()
@@ -1,6 +1,7 @@
-from typing import Optional
+import asyncio
+from typing import Optional, Hashable, Union
 
-from websockets import WebSocketServerProtocol
+from websockets import WebSocketServerProtocol, ConnectionClosed
 
 from server.player.player import Player
 from server.player.player_repo import PlayerModel
@@ -70,9 +71,32 @@ class FakePlayerRepository:
 
 
 class FakePlayer(Player):
+    connected = True
+
     def __init__(self, nick: str, elo: dict[GameType, int], connection: WebSocketServerProtocol = None):
         super().__init__(nick, elo, connection)
         self.sent_messages: list[str] = []
 
-    async def send(self, message: str):
-        self.sent_messages.append(message)
\ No newline at end of file
+    async def send(self, message: str, coalesce_key: Hashable = None):
+        self.sent_messages.append(message)
+
+
+class FakeWebSocket:
+    """Records sent messages; while blocked, sends wait as if the client did not read them."""
+
+    def __init__(self):
+        self.sent_messages: list[Union[str, bytes]] = []
+        self.unblocked = asyncio.Event()
+        self.unblocked.set()
+        self.closed = False
+        self.close_code: Optional[int] = None
+
+    async def send(self, message: Union[str, bytes]):
+        if self.closed:
+            raise ConnectionClosed(1006, "")
+        await self.unblocked.wait()
+        self.sent_messages.append(message)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed = True
+        self.close_code = code
@@ -1,12 +1,20 @@
+import asyncio
+import json
+
 import pytest
 
 from server.game.game_runner import GameRunner
 from server.game_room.game_room import PrivateGameRoom, RankedGameRoom
 from server.game_room.game_room_service import GameRoomService
+from shared.chess_engine.move import Move
+from shared.chess_engine.opening_book import OpeningBook
 from shared.chess_engine.piece import Team
+from shared.chess_engine.position import Vector2d
 from shared.game.game_type import GameType
+from shared.message.binary_codec import decode_message
 from shared.message.message_code import MessageCode
 from shared.message.private_room_joining_status import PrivateRoomJoiningStatus
+from shared.message.spectating_status import SpectatingStatus
 from tests.server.fakes import FakePlayerRepository, FakePlayer
 
 
@@ -268,3 +276,137 @@ async def test_offer_draw():
     assert len(player1.sent_messages) > 0
     assert len(player2.sent_messages) > 0
 
+
+@pytest.mark.asyncio
+async def test_binary_move():
+    service = GameRoomService(FakePlayerRepository())
+    player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1200, GameType.CLASSIC: 1000})
+    player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 4000, GameType.CLASSIC: 999})
+
+    room = RankedGameRoom(player1, player2, GameRunner())
+    service.ranked_rooms[player1] = room
+    service.ranked_rooms[player2] = room
+    room.runner.start(player1, player2, GameType.RAPID, lambda: None)
+
+    white = player1 if room.runner.teams[player1] == Team.WHITE else player2
+    black = player2 if white is player1 else player1
+    white.binary_protocol = True
+
+    move = Move(Vector2d(4, 1), Vector2d(4, 3))
+    await service.binary_move({"code": MessageCode.GAME_MOVE.value, "move": move}, white)
+    room.runner.clean()
+
+    binary_message = decode_message(white.sent_messages[-1])
+    json_message = json.loads(black.sent_messages[-1])
+    assert binary_message["move"] == move
+    assert json_message["move"] == {"type": move.type.value, "positionFrom": [4, 1], "positionTo": [4, 3]}
+    assert binary_message["timeLeft"] == json_message["timeLeft"]
+
+
+@pytest.mark.asyncio
+async def test_move_opening_name():
+    service = GameRoomService(FakePlayerRepository(), OpeningBook())
+    player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1200, GameType.CLASSIC: 1000})
+    player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 4000, GameType.CLASSIC: 999})
+    await service._create_ranked(player1, player2, GameType.RAPID)
+    room = service.ranked_rooms[player1]
+
+    white = player1 if room.runner.teams[player1] == Team.WHITE else player2
+    black = player2 if white is player1 else player1
+    white.binary_protocol = True
+
+    await service.move({"code": MessageCode.GAME_MOVE.value, "move": {
+        "type": 1, "positionFrom": [4, 1], "positionTo": [4, 3]
+    }}, white)
+    await service.move({"code": MessageCode.GAME_MOVE.value, "move": {
+        "type": 1, "positionFrom": [0, 6], "positionTo": [0, 5]
+    }}, black)
+    room.runner.clean()
+
+    assert decode_message(white.sent_messages[-2])["openingName"] == "King's Pawn Game"
+    assert json.loads(black.sent_messages[-2])["openingName"] == "King's Pawn Game"
+    assert "openingName" not in decode_message(white.sent_messages[-1])
+    assert "openingName" not in json.loads(black.sent_messages[-1])
+
+
+@pytest.mark.asyncio
+async def test_offer_draw_binary():
+    service = GameRoomService(FakePlayerRepository())
+    player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1200, GameType.CLASSIC: 1000})
+    player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 4000, GameType.CLASSIC: 999})
+    player1.binary_protocol = True
+
+    room = RankedGameRoom(player1, player2, GameRunner())
+    service.ranked_rooms[player1] = room
+    service.ranked_rooms[player2] = room
+    room.runner.start(player1, player2, GameType.RAPID, lambda: None)
+
+    current_player = player1 if room.runner.teams[player1] == Team.WHITE else player2
+    await service.offer_draw({}, current_player)
+    room.runner.clean()
+
+    assert decode_message(player1.sent_messages[-1]) == {"code": MessageCode.GAME_OFFER_DRAW.value}
+    assert json.loads(player2.sent_messages[-1]) == {"code": MessageCode.GAME_OFFER_DRAW.value}
+
+
+@pytest.mark.asyncio
+async def test_spectate_not_existing_game():
+    service = GameRoomService(FakePlayerRepository())
+    spectator = FakePlayer("player3", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+
+    await service.spectate({"code": MessageCode.SPECTATE.value, "nick": "player1"}, spectator)
+
+    assert json.loads(spectator.sent_messages[0]) == {
+        "code": MessageCode.SPECTATE.value,
+        "status": SpectatingStatus.GAME_NOT_EXIST.value
+    }
+    assert spectator not in service.spectated_rooms
+
+
+@pytest.mark.asyncio
+async def test_spectate_private_room_without_game():
+    service = GameRoomService(FakePlayerRepository())
+    host = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+    spectator = FakePlayer("player3", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+    await service.create_private_room({}, host)
+
+    await service.spectate({"code": MessageCode.SPECTATE.value, "nick": "player1"}, spectator)
+
+    assert json.loads(spectator.sent_messages[0]) == {
+        "code": MessageCode.SPECTATE.value,
+        "status": SpectatingStatus.GAME_NOT_EXIST.value
+    }
+    assert spectator not in service.spectated_rooms
+
+
+@pytest.mark.asyncio
+async def test_spectate():
+    service = GameRoomService(FakePlayerRepository())
+    player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1200, GameType.CLASSIC: 1000})
+    player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 4000, GameType.CLASSIC: 999})
+    spectator = FakePlayer("player3", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+
+    room = RankedGameRoom(player1, player2, GameRunner())
+    service.ranked_rooms[player1] = room
+    service.ranked_rooms[player2] = room
+    room.runner.start(player1, player2, GameType.RAPID, lambda: None)
+    white = player1 if room.runner.teams[player1] == Team.WHITE else player2
+
+    await service.spectate({"code": MessageCode.SPECTATE.value, "nick": "player2"}, spectator)
+    await service.move({"code": MessageCode.GAME_MOVE.value, "move": {
+        "type": 1, "positionFrom": [4, 1], "positionTo": [4, 3]
+    }}, white)
+    await service.surrender({}, white)
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    messages = [json.loads(m) for m in spectator.sent_messages]
+    assert messages[0]["status"] == SpectatingStatus.SUCCESS.value
+    assert messages[0]["fen"] == "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+    assert [m["code"] for m in messages[1:]] == [
+        MessageCode.GAME_MOVE.value,
+        MessageCode.GAME_SURRENDER.value,
+        MessageCode.STOP_SPECTATING.value
+    ]
+    assert messages[1] == json.loads(player1.sent_messages[0])
+    assert len(room.spectators) == 0
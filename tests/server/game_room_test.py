@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from server.game.game_runner import GameRunner
+from server.game_room.game_room import RankedGameRoom, broadcast
+from shared.chess_engine.move import Move
+from shared.chess_engine.position import Vector2d
+from shared.game.game_type import GameType
+from shared.message.binary_codec import decode_message
+from shared.message.message_code import MessageCode
+from tests.server.fakes import FakePlayer
+
+
+def _players(count: int) -> list[FakePlayer]:
+    return [FakePlayer("player" + str(i), {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+            for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_message_once():
+    players = _players(3)
+
+    await broadcast(players, {"code": MessageCode.KICK_FROM_PRIVATE_ROOM.value})
+
+    assert json.loads(players[0].sent_messages[0]) == {"code": MessageCode.KICK_FROM_PRIVATE_ROOM.value}
+    assert all(p.sent_messages[0] is players[0].sent_messages[0] for p in players)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_skips_closed_connections():
+    players = _players(2)
+    players[1].connected = False
+
+    await broadcast(players, {"code": MessageCode.GAME_TIME_END.value})
+
+    assert len(players[0].sent_messages) == 1
+    assert players[1].sent_messages == []
+
+
+@pytest.mark.asyncio
+async def test_broadcast_sends_binary_form_to_negotiated_players():
+    players = _players(3)
+    players[0].binary_protocol = True
+    players[1].binary_protocol = True
+    move = Move(Vector2d(4, 1), Vector2d(4, 3))
+
+    await broadcast(
+        players,
+        {"code": MessageCode.GAME_MOVE.value, "move": {"type": 1, "positionFrom": [4, 1], "positionTo": [4, 3]}},
+        {"code": MessageCode.GAME_MOVE.value, "move": move}
+    )
+
+    assert players[0].sent_messages[0] is players[1].sent_messages[0]
+    assert decode_message(players[0].sent_messages[0])["move"] == move
+    assert json.loads(players[2].sent_messages[0])["move"]["positionTo"] == [4, 3]
+
+
+@pytest.mark.asyncio
+async def test_room_broadcast_sends_to_players():
+    players = _players(2)
+    room = RankedGameRoom(players[0], players[1], GameRunner())
+
+    await room.broadcast({"code": MessageCode.GAME_OFFER_DRAW.value})
+
+    assert players[0].sent_messages == players[1].sent_messages == ['{"code": 13}']
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from server.game.analysis_service import AnalysisService
+from server.game.game_runner import GameRunner, replay_moves
+from server.game.legal_move_cache import LegalMoveCache
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.move import Move
+from shared.chess_engine.opening_book import OpeningBook, SAMPLE_BOOK_PATH
+from shared.chess_engine.piece import Team
+from shared.chess_engine.position import Vector2d
+from shared.game.game_type import GameType
+from tests.server.fakes import FakePlayer
+
+FOOLS_MATE = [
+    Move(Vector2d(5, 1), Vector2d(5, 2)),
+    Move(Vector2d(4, 6), Vector2d(4, 4)),
+    Move(Vector2d(6, 1), Vector2d(6, 3)),
+    Move(Vector2d(3, 7), Vector2d(7, 3))
+]
+
+
+async def _on_time_end(_):
+    pass
+
+
+def _started_runner(opening_book: OpeningBook = None) -> tuple[GameRunner, FakePlayer, FakePlayer]:
+    player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+    player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+    runner = GameRunner(LegalMoveCache(), opening_book)
+    runner.start(player1, player2, GameType.BLITZ, _on_time_end)
+    if runner.teams[player1] == Team.WHITE:
+        return runner, player1, player2
+    else:
+        return runner, player2, player1
+
+
+def test_replay_moves():
+    engine = ChessEngine()
+
+    assert replay_moves(engine, FOOLS_MATE[:3], LegalMoveCache()) is None
+    assert engine.currently_moving_team == Team.BLACK
+
+
+def test_replay_moves_reports_first_illegal_ply():
+    engine = ChessEngine()
+    moves = FOOLS_MATE[:2] + [Move(Vector2d(6, 1), Vector2d(6, 4)), Move(Vector2d(3, 7), Vector2d(7, 3))]
+
+    assert replay_moves(engine, moves, LegalMoveCache()) == 2
+    assert engine.currently_moving_team == Team.WHITE
+    assert engine.board.piece_at(Vector2d(4, 4)) is not None
+
+
+@pytest.mark.asyncio
+async def test_on_moves():
+    runner, white, black = _started_runner()
+
+    status = runner.on_moves(FOOLS_MATE[:3])
+
+    assert status.successful
+    assert status.applied_moves == 3
+    assert status.game_end_status is None
+    assert runner.timer.current_team == Team.BLACK
+    assert not runner.on_move(Move(Vector2d(4, 1), Vector2d(4, 3)), white).successful
+    runner.clean()
+
+
+@pytest.mark.asyncio
+async def test_on_moves_checkmate():
+    runner, white, black = _started_runner()
+
+    status = runner.on_moves(FOOLS_MATE)
+
+    assert status.successful
+    assert status.applied_moves == 4
+    assert not status.game_end_status.draw
+    assert status.game_end_status.winner is black
+    assert status.game_end_status.loser is white
+    assert not runner.running
+
+
+@pytest.mark.asyncio
+async def test_on_moves_illegal():
+    runner, white, black = _started_runner()
+
+    status = runner.on_moves(FOOLS_MATE[:1] + [Move(Vector2d(4, 6), Vector2d(4, 3))] + FOOLS_MATE[2:])
+
+    assert not status.successful
+    assert status.illegal_ply == 1
+    assert status.applied_moves == 1
+    assert runner.timer.current_team == Team.BLACK
+    runner.clean()
+
+
+def test_on_moves_not_running():
+    status = GameRunner(LegalMoveCache()).on_moves(FOOLS_MATE)
+
+    assert not status.successful
+    assert status.applied_moves == 0
+
+
+@pytest.mark.asyncio
+async def test_on_move_opening_name():
+    runner, white, black = _started_runner(OpeningBook())
+
+    assert runner.on_move(Move(Vector2d(4, 1), Vector2d(4, 3)), white).opening_name == "King's Pawn Game"
+    assert runner.on_move(Move(Vector2d(0, 6), Vector2d(0, 5)), black).opening_name is None
+
+    runner, white, black = _started_runner()
+    assert runner.on_move(Move(Vector2d(4, 1), Vector2d(4, 3)), white).opening_name is None
+
+
+@pytest.mark.asyncio
+async def test_analyse_cancelled_when_game_ends():
+    service = AnalysisService(1, transposition_table_mb=1, opening_book_path=SAMPLE_BOOK_PATH)
+    try:
+        runner = GameRunner(LegalMoveCache(), analysis_service=service)
+        assert await runner.analyse() is None
+
+        player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+        player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+        runner.start(player1, player2, GameType.BLITZ, _on_time_end)
+        result = await runner.analyse(10.0)
+        assert result.from_book
+
+        analysis = asyncio.ensure_future(runner.analyse(10.0))
+        await asyncio.sleep(0)
+        runner.clean()
+        with pytest.raises(asyncio.CancelledError):
+            await analysis
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_analyse_cancelled_on_time_end():
+    service = AnalysisService(1, transposition_table_mb=1)
+    try:
+        runner = GameRunner(LegalMoveCache(), analysis_service=service)
+        player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+        player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+        time_ends = []
+
+        async def on_time_end(status):
+            time_ends.append(status)
+
+        runner.start(player1, player2, GameType.BLITZ, on_time_end)
+        analysis = asyncio.ensure_future(runner.analyse(10.0))
+        await asyncio.sleep(0)
+
+        runner.timer.times_left[Team.WHITE] = 0
+        runner.timer.restart(Team.WHITE)
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(analysis, 1.0)
+
+        assert len(time_ends) == 1
+        assert not runner.running
+        assert runner.timer is None
+    finally:
+        service.shutdown()
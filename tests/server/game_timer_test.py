@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from server.game.game_timer import GameTimer
+from server.game.timer_wheel import TimerWheel
+from shared.chess_engine.piece import Team
+
+
+@pytest.mark.asyncio
+async def test_moves_reschedule_one_deadline():
+    wheel = TimerWheel(tick_ms=1)
+    ended = []
+
+    async def on_time_end(team: Team):
+        ended.append(team)
+
+    timer = GameTimer(50, on_time_end, wheel)
+    timer.next()
+    timer.next()
+
+    assert len(wheel) == 1
+
+    await asyncio.sleep(0.2)
+
+    assert ended == [Team.WHITE]
+    assert len(wheel) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    wheel = TimerWheel(tick_ms=1)
+    ended = []
+
+    async def on_time_end(team: Team):
+        ended.append(team)
+
+    timer = GameTimer(20, on_time_end, wheel)
+    timer.next()
+    timer.cancel()
+    await asyncio.sleep(0.1)
+
+    assert ended == []
+    assert len(wheel) == 0
+
+
+@pytest.mark.asyncio
+async def test_restart():
+    wheel = TimerWheel(tick_ms=1)
+    ended = []
+
+    async def on_time_end(team: Team):
+        ended.append(team)
+
+    timer = GameTimer(50, on_time_end, wheel)
+    timer.restart(Team.BLACK)
+
+    assert timer.current_team == Team.BLACK
+    assert len(wheel) == 1
+
+    await asyncio.sleep(0.2)
+
+    assert ended == [Team.BLACK]
+    assert len(wheel) == 0
@@ -0,0 +1,126 @@
+import pytest
+
+from server.game.game_runner import GameRunner
+from server.game.legal_move_cache import LegalMoveCache
+from shared.chess_engine.chess_engine import ChessEngine, GameStatus
+from shared.chess_engine.move import Move, Castling, Promotion
+from shared.chess_engine.move_encoding import encode_move
+from shared.chess_engine.piece import Team, PieceType
+from shared.chess_engine.position import Vector2d
+from shared.game.game_type import GameType
+from tests.server.fakes import FakePlayer
+
+
+def test_hits_and_misses():
+    cache = LegalMoveCache()
+    engine = ChessEngine()
+
+    assert cache.validate_move(engine, Move(Vector2d(4, 1), Vector2d(4, 3)))
+    assert len(cache) == 0
+    assert len(cache.legal_move_codes(engine)) == 20
+    assert cache.validate_move(engine, Move(Vector2d(4, 1), Vector2d(4, 3)))
+    assert not cache.validate_move(ChessEngine(), Move(Vector2d(4, 1), Vector2d(4, 4)))
+
+    assert cache.misses == 2
+    assert cache.hits == 2
+    assert cache.hit_rate == 2 / 4
+
+
+def test_positions_cached_when_reached_again():
+    cache = LegalMoveCache()
+    fen = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"
+
+    engine = ChessEngine.from_fen(fen)
+    assert cache.game_status(engine) == GameStatus.CHECKMATE
+    assert len(cache) == 0
+    assert engine.all_legal_moves() == []
+
+    assert cache.game_status(ChessEngine.from_fen(fen)) == GameStatus.CHECKMATE
+    assert len(cache) == 1
+
+    engine = ChessEngine.from_fen(fen)
+    assert cache.game_status(engine) == GameStatus.CHECKMATE
+    assert cache.hits == 1
+    assert engine._legal_moves is None
+
+
+def test_transposition_hits():
+    cache = LegalMoveCache()
+    engine_1 = ChessEngine()
+    engine_2 = ChessEngine()
+    for move in (Move(Vector2d(6, 0), Vector2d(5, 2)), Move(Vector2d(6, 7), Vector2d(5, 5)),
+                 Move(Vector2d(1, 0), Vector2d(2, 2))):
+        engine_1.process_move(move)
+    for move in (Move(Vector2d(1, 0), Vector2d(2, 2)), Move(Vector2d(6, 7), Vector2d(5, 5)),
+                 Move(Vector2d(6, 0), Vector2d(5, 2))):
+        engine_2.process_move(move)
+
+    assert cache.legal_move_codes(engine_1) is cache.legal_move_codes(engine_2)
+    assert cache.hits == 1
+
+
+def test_castle_rights_are_part_of_key():
+    cache = LegalMoveCache()
+    castling = Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0))
+    engine_1 = ChessEngine.from_fen("4k3/8/8/8/8/8/8/4K2R w K - 0 1")
+    engine_2 = ChessEngine.from_fen("4k3/8/8/8/8/8/8/4K2R w - - 0 1")
+
+    assert encode_move(castling) in cache.legal_move_codes(engine_1)
+    assert encode_move(castling) not in cache.legal_move_codes(engine_2)
+    assert cache.misses == 2
+
+
+def test_moves_validated_by_code():
+    cache = LegalMoveCache()
+    engine = ChessEngine.from_fen("4k3/1P6/8/8/8/8/8/4K2R w K - 0 1")
+    cache.legal_move_codes(engine)
+
+    assert cache.validate_move(engine, Promotion(Vector2d(1, 6), Vector2d(1, 7), PieceType.KNIGHT))
+    assert cache.validate_move(engine, Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0)))
+    assert not cache.validate_move(engine, Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(0, 0), Vector2d(5, 0)))
+    assert not cache.validate_move(engine, Move(Vector2d(7, 0), Vector2d(8, 0)))
+    assert cache.misses == 1
+
+
+def test_least_recently_used_evicted():
+    cache = LegalMoveCache(max_size=2)
+    engines = [ChessEngine.from_fen(fen) for fen in (
+        "4k3/8/8/8/8/8/8/4K3 w - - 0 1",
+        "4k3/8/8/8/8/8/8/3K4 w - - 0 1",
+        "4k3/8/8/8/8/8/8/2K5 w - - 0 1"
+    )]
+
+    cache.legal_move_codes(engines[0])
+    cache.legal_move_codes(engines[1])
+    cache.legal_move_codes(engines[0])
+    cache.legal_move_codes(engines[2])
+    assert len(cache) == 2
+
+    cache.legal_move_codes(engines[0])
+    assert cache.hits == 2
+    cache.legal_move_codes(engines[1])
+    assert cache.misses == 4
+
+
+@pytest.mark.asyncio
+async def test_game_runner_uses_cache():
+    cache = LegalMoveCache()
+    player1 = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+    player2 = FakePlayer("player2", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+    runner = GameRunner(cache)
+
+    async def on_time_end(_):
+        pass
+
+    # Positions after both moves are cached in the second game and taken from the cache in the third one.
+    for cached_positions, hits in ((0, 0), (2, 2), (2, 6)):
+        runner.start(player1, player2, GameType.BLITZ, on_time_end)
+        white, black = (player1, player2) if runner.teams[player1] == Team.WHITE else (player2, player1)
+
+        assert runner.on_move(Move(Vector2d(4, 1), Vector2d(4, 3)), white).successful
+        assert not runner.on_move(Move(Vector2d(4, 6), Vector2d(4, 3)), black).successful
+        assert runner.on_move(Move(Vector2d(4, 6), Vector2d(4, 4)), black).successful
+        runner.clean()
+
+        assert len(cache) == cached_positions
+        assert cache.hits == hits
@@ -0,0 +1,36 @@
+import pytest
+
+from server.game_room.game_room_service import GameRoomService
+from server.message_broker import MessageBroker
+from server.player.auth_service import AuthService
+from server.request import InvalidRequestException
+from shared.game.game_type import GameType
+from shared.message.binary_codec import encode_message
+from shared.message.message_code import MessageCode
+from tests.server.fakes import FakePlayerRepository, FakePlayer
+
+
+def _broker() -> MessageBroker:
+    player_repo = FakePlayerRepository()
+    return MessageBroker(AuthService(player_repo), GameRoomService(player_repo))
+
+
+@pytest.mark.asyncio
+async def test_binary_message_requires_negotiation():
+    broker = _broker()
+    player = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+
+    with pytest.raises(InvalidRequestException):
+        await broker.on_authenticated_message(encode_message({"code": MessageCode.GAME_OFFER_DRAW.value}), player)
+
+
+@pytest.mark.asyncio
+async def test_binary_message_is_handled():
+    broker = _broker()
+    player = FakePlayer("player1", {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+    player.binary_protocol = True
+
+    await broker.on_authenticated_message(encode_message({"code": MessageCode.GAME_OFFER_DRAW.value}), player)
+
+    with pytest.raises(InvalidRequestException):
+        await broker.on_authenticated_message(bytes([MessageCode.GAME_SURRENDER.value]), player)
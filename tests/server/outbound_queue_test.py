@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from server.outbound_queue import OutboundQueue, OverflowPolicy, OVERFLOW_CLOSE_CODE
+from tests.server.fakes import FakeWebSocket
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_writer_sends_messages_in_order():
+    websocket = FakeWebSocket()
+    queue = OutboundQueue(websocket)
+    queue.start()
+
+    assert queue.put("a")
+    assert queue.put(b"b")
+    await _settle()
+    queue.close()
+
+    assert websocket.sent_messages == ["a", b"b"]
+    assert queue.metrics.sent == 2
+    assert queue.metrics.depth == 0
+    assert queue.metrics.max_depth == 2
+
+
+@pytest.mark.asyncio
+async def test_put_does_not_wait_for_slow_connection():
+    websocket = FakeWebSocket()
+    websocket.unblocked.clear()
+    queue = OutboundQueue(websocket, max_size=4)
+    queue.start()
+
+    for message in ("a", "b", "c"):
+        assert queue.put(message)
+    await _settle()
+
+    assert websocket.sent_messages == []
+    assert queue.depth == 2
+
+    websocket.unblocked.set()
+    await _settle()
+    queue.close()
+
+    assert websocket.sent_messages == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_drop_policy():
+    queue = OutboundQueue(FakeWebSocket(), max_size=2, overflow_policy=OverflowPolicy.DROP)
+
+    assert queue.put("a")
+    assert queue.put("b")
+    assert not queue.put("c")
+
+    assert queue.depth == 2
+    assert queue.metrics.dropped == 1
+    assert not queue.closed
+
+
+@pytest.mark.asyncio
+async def test_coalesce_policy():
+    websocket = FakeWebSocket()
+    queue = OutboundQueue(websocket, max_size=2, overflow_policy=OverflowPolicy.COALESCE)
+
+    assert queue.put("snapshot 1", "snapshot")
+    assert queue.put("move")
+    assert queue.put("snapshot 2", "snapshot")
+    assert not queue.put("other move")
+
+    queue.start()
+    await _settle()
+    queue.close()
+
+    assert websocket.sent_messages == ["move", "snapshot 2"]
+    assert queue.metrics.coalesced == 1
+    assert queue.metrics.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy():
+    websocket = FakeWebSocket()
+    queue = OutboundQueue(websocket, max_size=1, overflow_policy=OverflowPolicy.DISCONNECT)
+
+    assert queue.put("a")
+    assert not queue.put("b")
+    await _settle()
+
+    assert queue.closed
+    assert websocket.close_code == OVERFLOW_CLOSE_CODE
+    assert not queue.put("c")
+
+
+@pytest.mark.asyncio
+async def test_closed_connection_closes_queue():
+    websocket = FakeWebSocket()
+    websocket.closed = True
+    queue = OutboundQueue(websocket)
+    queue.start()
+
+    queue.put("a")
+    await _settle()
+
+    assert queue.closed
+    assert websocket.sent_messages == []
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from typing import Hashable
+
+import pytest
+
+from server.game_room.spectators import SpectatorGroup
+from shared.game.game_type import GameType
+from shared.message.message_code import MessageCode
+from tests.server.fakes import FakePlayer
+
+SNAPSHOT = {"code": MessageCode.GAME_SNAPSHOT.value, "fen": "8/8/8/8/8/8/8/8 w - - 0 1"}
+MOVE = {"code": MessageCode.GAME_MOVE.value, "move": {"type": 1, "positionFrom": [4, 1], "positionTo": [4, 3]}}
+
+
+class BlockedPlayer(FakePlayer):
+    """A spectator whose connection does not accept messages until unblocked."""
+
+    def __init__(self, nick: str):
+        super().__init__(nick, {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+        self.unblocked = asyncio.Event()
+
+    async def send(self, message: str, coalesce_key: Hashable = None):
+        await self.unblocked.wait()
+        await super().send(message, coalesce_key)
+
+
+def _spectators(count: int) -> list[FakePlayer]:
+    return [FakePlayer("spectator" + str(i), {GameType.BLITZ: 1000, GameType.RAPID: 1000, GameType.CLASSIC: 1000})
+            for i in range(count)]
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def _codes(player: FakePlayer) -> list[int]:
+    return [json.loads(m)["code"] for m in player.sent_messages]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_sends_first_message_then_published_ones():
+    group = SpectatorGroup(lambda: SNAPSHOT)
+    spectator, = _spectators(1)
+
+    group.subscribe(spectator, SNAPSHOT)
+    group.publish(MOVE)
+    await _settle()
+
+    assert _codes(spectator) == [MessageCode.GAME_SNAPSHOT.value, MessageCode.GAME_MOVE.value]
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_all_batches_with_one_serialization():
+    group = SpectatorGroup(lambda: SNAPSHOT, batch_size=2)
+    spectators = _spectators(5)
+    for spectator in spectators:
+        group.subscribe(spectator, SNAPSHOT)
+
+    group.publish(MOVE)
+    await _settle()
+
+    assert all(len(s.sent_messages) == 2 for s in spectators)
+    assert all(s.sent_messages[1] is spectators[0].sent_messages[1] for s in spectators)
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_wait_for_slow_spectators():
+    group = SpectatorGroup(lambda: SNAPSHOT)
+    slow = BlockedPlayer("slow")
+    fast, = _spectators(1)
+    group.subscribe(slow, SNAPSHOT)
+    group.subscribe(fast, SNAPSHOT)
+
+    group.publish(MOVE)
+    await _settle()
+
+    assert slow.sent_messages == []
+    assert len(fast.sent_messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_spectator_is_degraded_to_snapshots():
+    group = SpectatorGroup(lambda: SNAPSHOT, max_backlog=2, snapshot_interval=0.01)
+    slow = BlockedPlayer("slow")
+    group.subscribe(slow, SNAPSHOT)
+
+    for _ in range(3):
+        group.publish(MOVE)
+        await _settle()
+
+    assert group.degraded == [slow]
+
+    slow.unblocked.set()
+    await asyncio.sleep(0.05)
+    group.publish(MOVE)
+    await _settle()
+
+    assert group.degraded == []
+    # Moves queued before the spectator was degraded are replaced by the snapshot.
+    assert _codes(slow) == [MessageCode.GAME_SNAPSHOT.value, MessageCode.GAME_SNAPSHOT.value, MessageCode.GAME_MOVE.value]
+
+
+@pytest.mark.asyncio
+async def test_stalled_spectator_is_dropped():
+    group = SpectatorGroup(lambda: SNAPSHOT, max_backlog=1, snapshot_interval=0.01, drop_after=0.02)
+    slow = BlockedPlayer("slow")
+    group.subscribe(slow, SNAPSHOT)
+
+    for _ in range(2):
+        group.publish(MOVE)
+        await _settle()
+    await asyncio.sleep(0.1)
+
+    assert slow not in group
+    assert len(group) == 0
+
+
+@pytest.mark.asyncio
+async def test_close_sends_stop_spectating_and_unsubscribes():
+    group = SpectatorGroup(lambda: SNAPSHOT)
+    spectator, = _spectators(1)
+    group.subscribe(spectator, SNAPSHOT)
+
+    group.publish(MOVE)
+    group.close()
+    group.publish(MOVE)
+    await _settle()
+
+    assert _codes(spectator) == [
+        MessageCode.GAME_SNAPSHOT.value,
+        MessageCode.GAME_MOVE.value,
+        MessageCode.STOP_SPECTATING.value
+    ]
+    assert len(group) == 0
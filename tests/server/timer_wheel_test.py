@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from server.game.timer_wheel import TimerWheel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _wheel(clock: FakeClock) -> TimerWheel:
+    # Small wheels, so that timers cascade through all levels: 4, 16 and 64 ticks of 10 ms.
+    return TimerWheel(tick_ms=10, wheel_size=4, levels=3, clock=clock)
+
+
+@pytest.mark.parametrize("delay_ms", [10, 30, 50, 170, 630, 2000])
+def test_timer_expires_at_deadline(delay_ms):
+    clock = FakeClock()
+    wheel = _wheel(clock)
+    expired = []
+    wheel.schedule(delay_ms, lambda: expired.append(clock.now))
+
+    for tick in range(1, 300):
+        clock.now = tick / 100
+        wheel.advance()
+
+    assert expired == [pytest.approx(delay_ms / 1000)]
+    assert len(wheel) == 0
+
+
+def test_reschedule_moves_deadline():
+    clock = FakeClock()
+    wheel = _wheel(clock)
+    expired = []
+    handle = wheel.schedule(100, lambda: expired.append(clock.now))
+
+    clock.now = 0.05
+    wheel.advance()
+    wheel.reschedule(handle, 500)
+    for tick in range(6, 100):
+        clock.now = tick / 100
+        wheel.advance()
+
+    assert expired == [pytest.approx(0.55)]
+
+
+def test_cancel():
+    clock = FakeClock()
+    wheel = _wheel(clock)
+    expired = []
+    handle = wheel.schedule(100, lambda: expired.append(clock.now))
+
+    wheel.cancel(handle)
+    clock.now = 1.0
+    wheel.advance()
+
+    assert expired == []
+    assert not handle.scheduled
+    assert len(wheel) == 0
+
+
+def test_timers_expiring_together_are_delivered_in_one_batch():
+    clock = FakeClock()
+    wheel = _wheel(clock)
+    expired = []
+    for delay_ms in (100, 120, 140, 900):
+        wheel.schedule(delay_ms, lambda d=delay_ms: expired.append(d))
+
+    clock.now = 0.5
+    wheel.advance()
+
+    assert sorted(expired) == [100, 120, 140]
+    assert len(wheel) == 1
+
+
+@pytest.mark.asyncio
+async def test_driver_awaits_coroutine_callbacks():
+    wheel = TimerWheel(tick_ms=1)
+    done = asyncio.Event()
+
+    async def on_expired():
+        done.set()
+
+    wheel.schedule(5, on_expired)
+
+    await asyncio.wait_for(done.wait(), 1)
+    assert len(wheel) == 0
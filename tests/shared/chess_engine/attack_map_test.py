@@ -0,0 +1,79 @@
+from shared.chess_engine.attack_map import AttackMap
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.chessboard import Chessboard
+from shared.chess_engine.move import Move, Capturing, Castling, EnPassant, Promotion
+from shared.chess_engine.piece import Team, King, Rook, Pawn, Knight, Bishop, Queen, PieceType
+from shared.chess_engine.position import Vector2d
+
+
+def _assert_same_as_fresh(engine: ChessEngine):
+    fresh = AttackMap(engine.board)
+    for team in (Team.WHITE, Team.BLACK):
+        assert engine.attack_map.attacked_fields(team) == fresh.attacked_fields(team)
+        for i in range(8):
+            for j in range(8):
+                pos = Vector2d(i, j)
+                assert set(engine.attack_map.attackers(pos, team)) == set(fresh.attackers(pos, team))
+
+
+def test_attacked_fields():
+    rook = Rook(Team.WHITE, Vector2d(0, 0))
+    pawn = Pawn(Team.WHITE, Vector2d(0, 3))
+    knight = Knight(Team.BLACK, Vector2d(7, 7))
+    board = Chessboard([rook, pawn, knight])
+
+    attack_map = AttackMap(board)
+
+    assert attack_map.attacked_fields(Team.WHITE) == {
+        Vector2d(0, 1), Vector2d(0, 2), Vector2d(0, 3),
+        Vector2d(1, 0), Vector2d(2, 0), Vector2d(3, 0), Vector2d(4, 0), Vector2d(5, 0), Vector2d(6, 0), Vector2d(7, 0),
+        Vector2d(1, 4)
+    }
+    assert attack_map.attacked_fields(Team.BLACK) == {Vector2d(5, 6), Vector2d(6, 5)}
+    assert attack_map.attackers(Vector2d(0, 3), Team.WHITE) == [rook]
+    assert attack_map.is_attacked(Vector2d(6, 5), Team.BLACK)
+    assert not attack_map.is_attacked(Vector2d(6, 5), Team.WHITE)
+
+
+def test_sliding_pieces_see_through_opposite_king():
+    board = Chessboard([Rook(Team.WHITE, Vector2d(0, 4)), King(Team.BLACK, Vector2d(3, 4)),
+                        King(Team.WHITE, Vector2d(0, 0))])
+
+    attack_map = AttackMap(board)
+
+    assert attack_map.is_attacked(Vector2d(3, 4), Team.WHITE)
+    assert attack_map.is_attacked(Vector2d(4, 4), Team.WHITE)
+    assert attack_map.is_attacked(Vector2d(7, 4), Team.WHITE)
+
+
+def test_incremental_update():
+    pieces = [
+        Rook(Team.WHITE, Vector2d(0, 0)),
+        Rook(Team.WHITE, Vector2d(7, 0)),
+        King(Team.WHITE, Vector2d(4, 0)),
+        Bishop(Team.WHITE, Vector2d(2, 2)),
+        Pawn(Team.WHITE, Vector2d(1, 4), has_moved=True),
+        Pawn(Team.WHITE, Vector2d(6, 6), has_moved=True),
+        Queen(Team.BLACK, Vector2d(3, 7)),
+        Pawn(Team.BLACK, Vector2d(2, 6), has_moved=False),
+        Knight(Team.BLACK, Vector2d(1, 7)),
+        King(Team.BLACK, Vector2d(4, 7))
+    ]
+
+    engine = ChessEngine(pieces, [])
+    _assert_same_as_fresh(engine)
+
+    for move in (
+        Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0)),
+        Move(Vector2d(2, 6), Vector2d(2, 4)),
+        EnPassant(Vector2d(1, 4), Vector2d(2, 5), Vector2d(2, 4)),
+        Move(Vector2d(3, 7), Vector2d(3, 0)),
+        Capturing(Vector2d(5, 0), Vector2d(3, 0)),
+        Move(Vector2d(1, 7), Vector2d(0, 5)),
+        Promotion(Vector2d(6, 6), Vector2d(6, 7), PieceType.QUEEN),
+    ):
+        engine.process_move(move)
+        _assert_same_as_fresh(engine)
+
+    assert engine.check_status.checked
+    assert engine.check_status.checking_piece_1 is engine.board.piece_at(Vector2d(6, 7))
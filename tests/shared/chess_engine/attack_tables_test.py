@@ -0,0 +1,29 @@
+from shared.chess_engine.attack_tables import RAYS, KNIGHT_TARGETS, KING_TARGETS, PAWN_ATTACKS, PAWN_PUSHES
+from shared.chess_engine.piece import PieceType, Team
+from shared.chess_engine.position import Vector2d, square_index
+
+
+def test_rays():
+    rays = RAYS[PieceType.ROOK][square_index(Vector2d(0, 0))]
+
+    assert rays == (
+        tuple(Vector2d(0, y) for y in range(1, 8)),
+        tuple(Vector2d(x, 0) for x in range(1, 8))
+    )
+    assert len(RAYS[PieceType.BISHOP][square_index(Vector2d(0, 0))]) == 1
+    assert sum(len(ray) for ray in RAYS[PieceType.QUEEN][square_index(Vector2d(3, 3))]) == 27
+
+
+def test_knight_and_king_targets():
+    assert set(KNIGHT_TARGETS[square_index(Vector2d(0, 0))]) == {Vector2d(1, 2), Vector2d(2, 1)}
+    assert len(KNIGHT_TARGETS[square_index(Vector2d(4, 4))]) == 8
+    assert set(KING_TARGETS[square_index(Vector2d(7, 7))]) == {Vector2d(6, 7), Vector2d(6, 6), Vector2d(7, 6)}
+
+
+def test_pawn_tables():
+    assert PAWN_PUSHES[Team.WHITE][square_index(Vector2d(4, 1))] == (Vector2d(4, 2), Vector2d(4, 3))
+    assert PAWN_PUSHES[Team.WHITE][square_index(Vector2d(4, 2))] == (Vector2d(4, 3),)
+    assert PAWN_PUSHES[Team.BLACK][square_index(Vector2d(4, 6))] == (Vector2d(4, 5), Vector2d(4, 4))
+    assert PAWN_PUSHES[Team.BLACK][square_index(Vector2d(4, 0))] == ()
+    assert PAWN_ATTACKS[Team.WHITE][square_index(Vector2d(0, 1))] == (Vector2d(1, 2),)
+    assert set(PAWN_ATTACKS[Team.BLACK][square_index(Vector2d(3, 3))]) == {Vector2d(2, 2), Vector2d(4, 2)}
@@ -0,0 +1,142 @@
+import pytest
+
+from shared.chess_engine.bitboard import BitboardChessboard, square_mask, BETWEEN
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.chessboard import BoardType
+from shared.chess_engine.move import Move, Capturing, Castling
+from shared.chess_engine.piece import Pawn, Team, Queen, Knight, PieceType, King, Rook
+from shared.chess_engine.position import Vector2d, square_index
+
+
+def test_init():
+    white_pawn = Pawn(Team.WHITE, Vector2d(2, 5))
+    white_knight = Knight(Team.WHITE, Vector2d(1, 1))
+    black_queen = Queen(Team.BLACK, Vector2d(5, 7))
+
+    board = BitboardChessboard([white_pawn, white_knight, black_queen])
+
+    assert board.piece_at(Vector2d(2, 5)) is white_pawn
+    assert board.piece_at(Vector2d(1, 1)) is white_knight
+    assert board.piece_at(Vector2d(5, 7)) is black_queen
+
+    assert board.bitboards[Team.WHITE][PieceType.PAWN] == square_mask(Vector2d(2, 5))
+    assert board.bitboards[Team.WHITE][PieceType.KNIGHT] == square_mask(Vector2d(1, 1))
+    assert board.bitboards[Team.BLACK][PieceType.QUEEN] == square_mask(Vector2d(5, 7))
+    assert board.occupancy[Team.WHITE] == square_mask(Vector2d(2, 5)) | square_mask(Vector2d(1, 1))
+    assert board.occupied == board.occupancy[Team.WHITE] | square_mask(Vector2d(5, 7))
+
+    assert len(board.pieces[Team.WHITE].all) == 2
+    assert len(board.pieces[Team.BLACK].all) == 1
+
+    for i in range(8):
+        for j in range(8):
+            if (i, j) not in ((2, 5), (1, 1), (5, 7)):
+                assert board.piece_at(Vector2d(i, j)) is None
+
+
+def test_outside_board():
+    board = BitboardChessboard([])
+
+    with pytest.raises(KeyError):
+        board.piece_at(Vector2d(-1, 5))
+
+    with pytest.raises(KeyError):
+        board.piece_at(Vector2d(8, 5))
+
+
+def test_remove_piece():
+    board = BitboardChessboard([Pawn(Team.WHITE, Vector2d(2, 5))])
+
+    board.remove_piece(Vector2d(2, 5))
+
+    assert board.piece_at(Vector2d(2, 5)) is None
+    assert board.bitboards[Team.WHITE][PieceType.PAWN] == 0
+    assert board.occupied == 0
+    assert len(board.pieces[Team.WHITE].all) == 0
+
+
+def test_move():
+    white_pawn = Pawn(Team.WHITE, Vector2d(2, 5))
+    board = BitboardChessboard([white_pawn])
+
+    board.move(Vector2d(2, 5), Vector2d(2, 6))
+
+    assert board.piece_at(Vector2d(2, 5)) is None
+    assert board.piece_at(Vector2d(2, 6)) is white_pawn
+    assert white_pawn.position == Vector2d(2, 6)
+    assert board.bitboards[Team.WHITE][PieceType.PAWN] == square_mask(Vector2d(2, 6))
+    assert board.occupied == square_mask(Vector2d(2, 6))
+
+
+def test_between():
+    assert BETWEEN[square_index(Vector2d(0, 0))][square_index(Vector2d(3, 0))] == \
+           square_mask(Vector2d(1, 0)) | square_mask(Vector2d(2, 0))
+    assert BETWEEN[square_index(Vector2d(3, 3))][square_index(Vector2d(1, 1))] == square_mask(Vector2d(2, 2))
+    assert BETWEEN[square_index(Vector2d(3, 3))][square_index(Vector2d(4, 4))] == 0
+    assert BETWEEN[square_index(Vector2d(0, 0))][square_index(Vector2d(1, 2))] == 0
+
+
+def test_any_piece_between():
+    board = BitboardChessboard([Pawn(Team.WHITE, Vector2d(4, 5)), Pawn(Team.BLACK, Vector2d(6, 5))])
+
+    assert not board.any_piece_between(Vector2d(5, 1), Vector2d(5, 7))
+    assert not board.any_piece_between(Vector2d(2, 6), Vector2d(5, 6))
+    assert not board.any_piece_between(Vector2d(5, 3), Vector2d(1, 7))
+    assert not board.any_piece_between(Vector2d(6, 6), Vector2d(3, 3))
+    assert board.any_piece_between(Vector2d(7, 6), Vector2d(5, 4))
+    assert board.any_piece_between(Vector2d(4, 7), Vector2d(7, 4))
+    assert board.any_piece_between(Vector2d(6, 2), Vector2d(6, 6))
+    assert board.any_piece_between(Vector2d(5, 5), Vector2d(2, 5))
+
+
+def test_next_piece_on_line():
+    white_pawn_1 = Pawn(Team.WHITE, Vector2d(0, 5))
+    white_pawn_2 = Pawn(Team.WHITE, Vector2d(2, 1))
+    white_pawn_3 = Pawn(Team.WHITE, Vector2d(2, 3))
+    black_pawn_1 = Pawn(Team.WHITE, Vector2d(4, 3))
+    black_pawn_2 = Pawn(Team.WHITE, Vector2d(4, 5))
+
+    board = BitboardChessboard([
+        white_pawn_1,
+        white_pawn_2,
+        white_pawn_3,
+        black_pawn_1,
+        black_pawn_2
+    ])
+
+    assert board.next_piece_on_line(Vector2d(2, 1), Vector2d(2, 3)) is None
+    assert board.next_piece_on_line(Vector2d(0, 5), Vector2d(2, 3)) is None
+    assert board.next_piece_on_line(Vector2d(4, 3), Vector2d(2, 3)) is None
+    assert board.next_piece_on_line(Vector2d(4, 5), Vector2d(2, 3)) is None
+    assert board.next_piece_on_line(Vector2d(0, 1), Vector2d(2, 3)) is black_pawn_2
+    assert board.next_piece_on_line(Vector2d(0, 3), Vector2d(2, 3)) is black_pawn_1
+    assert board.next_piece_on_line(Vector2d(2, 7), Vector2d(2, 3)) is white_pawn_2
+    assert board.next_piece_on_line(Vector2d(3, 2), Vector2d(2, 3)) is white_pawn_1
+
+
+def test_engine_with_bitboard():
+    pieces = [
+        Rook(Team.WHITE, Vector2d(0, 0)),
+        Rook(Team.WHITE, Vector2d(7, 0)),
+        King(Team.WHITE, Vector2d(4, 0)),
+        Knight(Team.BLACK, Vector2d(2, 2)),
+        King(Team.BLACK, Vector2d(4, 7))
+    ]
+
+    engine = ChessEngine(pieces, [], board_type=BoardType.BITBOARD)
+
+    assert isinstance(engine.board, BitboardChessboard)
+    assert not engine.check_status.checked
+
+    moves = engine.available_moves(Vector2d(4, 0))
+    assert Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0)) in moves
+    assert Castling(Vector2d(4, 0), Vector2d(2, 0), Vector2d(0, 0), Vector2d(3, 0)) not in moves
+    assert Move(Vector2d(4, 0), Vector2d(3, 0)) not in moves
+
+    engine.process_move(Move(Vector2d(0, 0), Vector2d(0, 2)))
+    engine.process_move(Move(Vector2d(4, 7), Vector2d(3, 7)))
+    assert engine.validate_move(Capturing(Vector2d(0, 2), Vector2d(2, 2)))
+    engine.process_move(Capturing(Vector2d(0, 2), Vector2d(2, 2)))
+
+    assert engine.board.bitboards[Team.BLACK][PieceType.KNIGHT] == 0
+    assert engine.board.piece_at(Vector2d(2, 2)) is pieces[0]
@@ -1,7 +1,11 @@
-from shared.chess_engine.chess_engine import ChessEngine
-from shared.chess_engine.move import Move, Capturing, Promotion, PromotionWithCapturing, EnPassant, Castling
+import pytest
+
+from shared.chess_engine.chess_engine import ChessEngine, GameStatus
+from shared.chess_engine.move_history import HistoryType
+from shared.chess_engine.move import MoveType, Move, Capturing, Promotion, PromotionWithCapturing, EnPassant, Castling
 from shared.chess_engine.position import Vector2d
 from shared.chess_engine.piece import Team, Pawn, Bishop, Knight, King, Rook, Queen, PieceType
+from shared.chess_engine.zobrist import PositionHashing
 
 
 def test_default_init():
@@ -1131,4 +1135,282 @@ def test_processing_move_repetition_different_castle_rights():
     assert not engine.is_tie()
     engine.process_move(Move(Vector2d(4, 7), Vector2d(3, 7)))
     assert engine.can_claim_draw()
-    assert not engine.is_tie()
\ No newline at end of file
+    assert not engine.is_tie()
+
+
+def test_all_legal_moves_initial_position():
+    engine = ChessEngine()
+
+    moves = engine.all_legal_moves()
+
+    assert len(moves) == 20
+    assert Move(Vector2d(4, 1), Vector2d(4, 3)) in moves
+    assert Move(Vector2d(6, 0), Vector2d(5, 2)) in moves
+    assert engine.all_legal_moves() is moves
+    assert engine.available_moves(Vector2d(1, 0)) == [Move(Vector2d(1, 0), Vector2d(0, 2)),
+                                                       Move(Vector2d(1, 0), Vector2d(2, 2))]
+    assert engine.available_moves(Vector2d(1, 7)) == []
+
+    engine.process_move(Move(Vector2d(4, 1), Vector2d(4, 3)))
+
+    assert engine.all_legal_moves() is not moves
+    assert len(engine.all_legal_moves()) == 20
+    assert all(engine.board.piece_at(move.position_from).team == Team.BLACK for move in engine.all_legal_moves())
+
+
+def test_moves_generated_per_piece():
+    engine = ChessEngine()
+
+    assert engine.validate_move(Move(Vector2d(4, 1), Vector2d(4, 3)))
+    assert not engine.validate_move(Move(Vector2d(1, 0), Vector2d(1, 2)))
+    assert not engine.validate_move(Move(Vector2d(8, 1), Vector2d(8, 3)))
+    assert engine.game_status() == GameStatus.ONGOING
+    assert engine._legal_moves is None
+
+    engine.make_move(Move(Vector2d(4, 1), Vector2d(4, 3)))
+    assert engine.validate_move(Move(Vector2d(4, 6), Vector2d(4, 4)))
+    engine.unmake_move()
+
+    assert len(engine.all_legal_moves()) == 20
+    assert engine.available_moves(Vector2d(1, 0)) == [Move(Vector2d(1, 0), Vector2d(0, 2)),
+                                                       Move(Vector2d(1, 0), Vector2d(2, 2))]
+
+
+def test_all_legal_moves_single_checked():
+    pieces = [
+        Rook(Team.WHITE, Vector2d(0, 0)),
+        Knight(Team.WHITE, Vector2d(2, 2)),
+        King(Team.WHITE, Vector2d(4, 0)),
+        Queen(Team.BLACK, Vector2d(4, 5)),
+        King(Team.BLACK, Vector2d(4, 7))
+    ]
+
+    engine = ChessEngine(pieces, [Move(Vector2d(3, 5), Vector2d(4, 5))])
+
+    assert set(engine.all_legal_moves()) == {
+        Move(Vector2d(4, 0), Vector2d(3, 0)),
+        Move(Vector2d(4, 0), Vector2d(5, 0)),
+        Move(Vector2d(4, 0), Vector2d(3, 1)),
+        Move(Vector2d(4, 0), Vector2d(5, 1)),
+        Move(Vector2d(2, 2), Vector2d(4, 1)),
+        Move(Vector2d(2, 2), Vector2d(4, 3)),
+    }
+
+
+def test_en_passant_capturing_checking_pawn():
+    pieces = [
+        Pawn(Team.WHITE, Vector2d(4, 4), has_moved=True),
+        King(Team.WHITE, Vector2d(2, 3)),
+        Pawn(Team.BLACK, Vector2d(3, 4), has_moved=True),
+        King(Team.BLACK, Vector2d(4, 7))
+    ]
+
+    engine = ChessEngine(pieces, [Move(Vector2d(3, 6), Vector2d(3, 4))])
+
+    assert engine.check_status.checked
+    assert engine.validate_move(EnPassant(Vector2d(4, 4), Vector2d(3, 5), Vector2d(3, 4)))
+
+
+def _engine_state(engine: ChessEngine) -> tuple:
+    pieces = engine.board.pieces[Team.WHITE].all + engine.board.pieces[Team.BLACK].all
+    return (
+        {(p.position, p.type, p.team, p.has_moved) for p in pieces},
+        engine.currently_moving_team,
+        engine.position_hash,
+        engine.move_history.last_move,
+        engine.move_history.halfmove_clock,
+        engine.check_status.checking_piece_1,
+        engine.check_status.checking_piece_2,
+        set(engine.all_legal_moves()),
+        engine.attack_map.attacked_fields(Team.WHITE),
+        engine.attack_map.attacked_fields(Team.BLACK)
+    )
+
+
+def test_make_and_unmake_move():
+    pieces = [
+        Rook(Team.WHITE, Vector2d(0, 0)),
+        Rook(Team.WHITE, Vector2d(7, 0)),
+        King(Team.WHITE, Vector2d(4, 0)),
+        Pawn(Team.WHITE, Vector2d(1, 4), has_moved=True),
+        Pawn(Team.WHITE, Vector2d(6, 6), has_moved=True),
+        Knight(Team.WHITE, Vector2d(3, 3), has_moved=True),
+        Rook(Team.BLACK, Vector2d(7, 7)),
+        Bishop(Team.BLACK, Vector2d(5, 7)),
+        Pawn(Team.BLACK, Vector2d(2, 6)),
+        Queen(Team.BLACK, Vector2d(3, 6), has_moved=True),
+        King(Team.BLACK, Vector2d(4, 7))
+    ]
+    engine = ChessEngine(pieces, [])
+
+    def walk(depth: int):
+        if depth == 0:
+            return
+
+        for move in list(engine.all_legal_moves()):
+            if move.type in (MoveType.PROMOTION, MoveType.PROMOTION_WITH_CAPTURING):
+                move.piece_type = PieceType.QUEEN
+
+            state = _engine_state(engine)
+            engine.make_move(move)
+            walk(depth - 1)
+            engine.unmake_move()
+            assert _engine_state(engine) == state
+
+    engine.make_move(Move(Vector2d(4, 0), Vector2d(4, 1)))
+    engine.make_move(Move(Vector2d(2, 6), Vector2d(2, 4)))
+    walk(2)
+
+    engine.unmake_move()
+    engine.unmake_move()
+    assert _engine_state(engine) == _engine_state(ChessEngine(pieces, []))
+    assert engine.validate_move(Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0)))
+
+
+def test_unmake_restores_repetition_count():
+    pieces = [Bishop(Team.WHITE, Vector2d(3, 3)), King(Team.WHITE, Vector2d(4, 0)), King(Team.BLACK, Vector2d(4, 7))]
+    engine = ChessEngine(pieces, [])
+
+    for _ in range(2):
+        for move in (Move(Vector2d(3, 3), Vector2d(4, 4)), Move(Vector2d(4, 7), Vector2d(3, 7)),
+                     Move(Vector2d(4, 4), Vector2d(3, 3)), Move(Vector2d(3, 7), Vector2d(4, 7))):
+            engine.make_move(move)
+
+    assert engine.can_claim_draw()
+    engine.unmake_move()
+    assert not engine.can_claim_draw()
+    engine.make_move(Move(Vector2d(3, 7), Vector2d(4, 7)))
+    assert engine.can_claim_draw()
+
+
+def test_unmake_without_moves():
+    with pytest.raises(RuntimeError):
+        ChessEngine().unmake_move()
+
+
+def test_en_passant_revealing_king_on_rank():
+    pieces = [
+        King(Team.WHITE, Vector2d(0, 4)),
+        Pawn(Team.WHITE, Vector2d(1, 4), has_moved=True),
+        Pawn(Team.BLACK, Vector2d(2, 4), has_moved=True),
+        Rook(Team.BLACK, Vector2d(7, 4)),
+        King(Team.BLACK, Vector2d(4, 7))
+    ]
+
+    engine = ChessEngine(pieces, [Move(Vector2d(2, 6), Vector2d(2, 4))])
+
+    assert not engine.validate_move(EnPassant(Vector2d(1, 4), Vector2d(2, 5), Vector2d(2, 4)))
+    assert engine.validate_move(Move(Vector2d(1, 4), Vector2d(1, 5)))
+
+
+def test_pin_rays():
+    engine = ChessEngine.from_fen("4k3/8/8/q7/1N6/2R5/3P4/4KNNr w - - 0 1")
+
+    assert engine._find_pin_rays() == {}
+
+    engine = ChessEngine.from_fen("4k3/8/8/b7/8/8/3P4/4KR1q w - - 0 1")
+
+    assert engine._find_pin_rays() == {
+        Vector2d(3, 1): {Vector2d(3, 1), Vector2d(2, 2), Vector2d(1, 3), Vector2d(0, 4)},
+        Vector2d(5, 0): {Vector2d(5, 0), Vector2d(6, 0), Vector2d(7, 0)}
+    }
+    assert engine.available_moves(Vector2d(3, 1)) == []
+    assert set(engine.available_moves(Vector2d(5, 0))) == {
+        Move(Vector2d(5, 0), Vector2d(6, 0)),
+        Capturing(Vector2d(5, 0), Vector2d(7, 0))
+    }
+
+
+def test_pinned_pieces_move_along_pin_ray():
+    engine = ChessEngine.from_fen("4k3/8/8/8/1b6/8/3B4/4K3 w - - 0 1")
+
+    assert set(engine.available_moves(Vector2d(3, 1))) == {
+        Move(Vector2d(3, 1), Vector2d(2, 2)),
+        Capturing(Vector2d(3, 1), Vector2d(1, 3))
+    }
+
+    engine = ChessEngine.from_fen("4k3/4r3/8/8/8/8/4N3/4K3 w - - 0 1")
+
+    assert engine.available_moves(Vector2d(4, 1)) == []
+
+
+def test_game_status_checkmate_and_stalemate():
+    engine = ChessEngine.from_fen("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+    assert engine.game_status() == GameStatus.CHECKMATE
+    assert engine.is_checkmate()
+    assert not engine.is_tie()
+
+    engine = ChessEngine.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+    assert engine.game_status() == GameStatus.STALEMATE
+    assert not engine.is_checkmate()
+    assert engine.is_tie()
+
+
+def test_game_status_draws():
+    engine = ChessEngine.from_fen("7k/8/6K1/8/8/8/8/1N6 w - - 0 1")
+    assert engine.game_status() == GameStatus.INSUFFICIENT_MATERIAL
+
+    engine = ChessEngine.from_fen("7k/8/6K1/8/8/8/8/1R6 w - - 149 100")
+    assert engine.game_status() == GameStatus.ONGOING
+    engine.process_move(Move(Vector2d(1, 0), Vector2d(1, 1)))
+    assert engine.game_status() == GameStatus.SEVENTY_FIVE_MOVES
+    assert engine.game_status().draw
+
+    engine = ChessEngine.from_fen("7k/8/6K1/8/8/8/8/1R6 w - - 0 1")
+    for _ in range(4):
+        for move in (Move(Vector2d(1, 0), Vector2d(1, 1)), Move(Vector2d(7, 7), Vector2d(7, 6)),
+                     Move(Vector2d(1, 1), Vector2d(1, 0)), Move(Vector2d(7, 6), Vector2d(7, 7))):
+            engine.process_move(move)
+    assert engine.game_status() == GameStatus.FIVEFOLD_REPETITION
+
+
+def test_game_status_cached_per_position():
+    engine = ChessEngine()
+    assert engine.game_status() == GameStatus.ONGOING
+    moves = engine.all_legal_moves()
+    assert engine.game_status() == GameStatus.ONGOING
+    assert engine.all_legal_moves() is moves
+
+    for move in (Move(Vector2d(5, 1), Vector2d(5, 2)), Move(Vector2d(4, 6), Vector2d(4, 4)),
+                 Move(Vector2d(6, 1), Vector2d(6, 3))):
+        engine.process_move(move)
+    engine.make_move(Move(Vector2d(3, 7), Vector2d(7, 3)))
+    assert engine.game_status() == GameStatus.CHECKMATE
+
+    engine.unmake_move()
+    assert engine.game_status() == GameStatus.ONGOING
+
+
+def test_game_status_with_known_legal_moves():
+    engine = ChessEngine.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+
+    assert engine.game_status(False) == GameStatus.STALEMATE
+    assert engine._legal_moves is None
+    assert engine._pin_rays is None
+
+
+def test_compact_history():
+    engine = ChessEngine.from_fen("7k/8/6K1/8/8/8/1P6/1R6 w - - 0 1", history_type=HistoryType.COMPACT)
+    shuffle = (Move(Vector2d(1, 0), Vector2d(0, 0)), Move(Vector2d(7, 7), Vector2d(7, 6)),
+               Move(Vector2d(0, 0), Vector2d(1, 0)), Move(Vector2d(7, 6), Vector2d(7, 7)))
+
+    for move in shuffle:
+        engine.make_move(move)
+    engine.make_move(Move(Vector2d(1, 1), Vector2d(1, 2)))
+    assert engine.move_history.last_move == Move(Vector2d(1, 1), Vector2d(1, 2))
+    assert not engine.can_claim_draw()
+
+    engine.unmake_move()
+    for move in shuffle:
+        engine.make_move(move)
+    assert engine.can_claim_draw()
+
+    for _ in range(2):
+        for move in shuffle:
+            engine.process_move(move)
+    assert engine.game_status() == GameStatus.FIVEFOLD_REPETITION
+
+
+def test_compact_history_requires_zobrist_hashing():
+    with pytest.raises(RuntimeError):
+        ChessEngine(hashing=PositionHashing.SNAPSHOT, history_type=HistoryType.COMPACT)
@@ -0,0 +1,78 @@
+from shared.chess_engine.chess_engine import ChessEngine, legal_moves_with_promotions
+from shared.chess_engine.evaluation import evaluate, white_advantage
+from shared.chess_engine.move import Move
+from shared.chess_engine.perft import SUITE
+from shared.chess_engine.piece_square_tables import PieceSquareScore, MAX_PHASE
+from shared.chess_engine.piece import Team
+from shared.chess_engine.position import Vector2d
+
+
+def _all_pieces(engine: ChessEngine):
+    return engine.board.pieces[Team.WHITE].all + engine.board.pieces[Team.BLACK].all
+
+
+def test_initial_position_is_equal():
+    engine = ChessEngine()
+
+    assert engine.piece_square_score.score == 0
+    assert engine.piece_square_score.phase == MAX_PHASE
+    assert evaluate(engine) == 0
+
+
+def test_evaluate_from_moving_team_point_of_view():
+    white_to_move = ChessEngine.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+    black_to_move = ChessEngine.from_fen("4k3/8/8/8/8/8/8/R3K3 b - - 0 1")
+
+    assert evaluate(white_to_move) > 400
+    assert evaluate(black_to_move) == -evaluate(white_to_move)
+    assert white_advantage(black_to_move) == white_advantage(white_to_move)
+
+
+def test_mirrored_positions_are_evaluated_alike():
+    white = ChessEngine.from_fen("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    black = ChessEngine.from_fen("rnbqk2r/pppp1ppp/5n2/2b1p3/4P3/2N2N2/PPPP1PPP/R1BQKB1R b KQkq - 4 4")
+
+    assert evaluate(white) == evaluate(black)
+
+
+def test_piece_square_tables():
+    centralized = ChessEngine.from_fen("4k3/8/8/8/3N4/8/8/4K3 w - - 0 1")
+    cornered = ChessEngine.from_fen("4k3/8/8/8/8/8/8/N3K3 w - - 0 1")
+
+    assert centralized.piece_square_score.score > cornered.piece_square_score.score
+
+
+def test_pawn_structure():
+    healthy = ChessEngine.from_fen("4k3/pp6/8/8/8/8/PP6/4K3 w - - 0 1")
+    doubled = ChessEngine.from_fen("4k3/pp6/8/8/8/1P6/1P6/4K3 w - - 0 1")
+    passed = ChessEngine.from_fen("4k3/pp6/8/7P/8/8/PP6/4K3 w - - 0 1")
+
+    assert white_advantage(doubled) < white_advantage(healthy)
+    assert white_advantage(passed) > white_advantage(healthy) + 100
+
+
+def test_king_safety():
+    sheltered = ChessEngine.from_fen("rnbq1rk1/ppppbppp/5n2/4p3/4P3/5N2/PPPPBPPP/RNBQ1RK1 w - - 6 5")
+    exposed = ChessEngine.from_fen("rnbq1rk1/ppppbppp/5n2/4p3/4P3/5NP1/PPPPBP1P/RNBQ1RK1 w - - 6 5")
+
+    assert white_advantage(exposed) < white_advantage(sheltered)
+
+
+def test_score_updated_incrementally():
+    for position in SUITE:
+        engine = ChessEngine.from_fen(position.fen)
+        initial_state = engine.piece_square_score.state
+
+        for move in legal_moves_with_promotions(engine):
+            engine.make_move(move)
+            assert engine.piece_square_score.state == PieceSquareScore(_all_pieces(engine)).state
+            engine.unmake_move()
+            assert engine.piece_square_score.state == initial_state
+
+
+def test_score_updated_by_process_move():
+    engine = ChessEngine()
+    engine.process_move(Move(Vector2d(4, 1), Vector2d(4, 3)))
+
+    assert engine.piece_square_score.state == PieceSquareScore(_all_pieces(engine)).state
+    assert engine.piece_square_score.score == 40
@@ -0,0 +1,111 @@
+import pytest
+
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.chessboard import BoardType
+from shared.chess_engine.fen import INITIAL_FEN, parse_fen, field_name, parse_field, move_name
+from shared.chess_engine.move import Move, Castling, EnPassant, Capturing, PromotionWithCapturing
+from shared.chess_engine.move_history import CastleRight
+from shared.chess_engine.piece import Team, PieceType
+from shared.chess_engine.position import Vector2d
+
+
+def test_parse_initial_fen():
+    position = parse_fen(INITIAL_FEN)
+
+    assert len(position.pieces) == 32
+    assert position.currently_moving_team == Team.WHITE
+    assert position.castle_rights == {Team.WHITE: CastleRight.BOTH, Team.BLACK: CastleRight.BOTH}
+    assert position.en_passant_target is None
+    assert position.halfmove_clock == 0
+    assert position.fullmove_number == 1
+
+
+def test_from_fen():
+    engine = ChessEngine.from_fen("r3k2r/8/8/3pP3/8/8/8/4K2R w Kq d6 3 20")
+
+    assert engine.currently_moving_team == Team.WHITE
+    assert engine.castle_rights == {Team.WHITE: CastleRight.SHORT, Team.BLACK: CastleRight.LONG}
+    assert engine.en_passant_target == Vector2d(3, 5)
+    assert engine.move_history.halfmove_clock == 3
+    assert engine.fullmove_number == 20
+    assert engine.board.piece_at(Vector2d(4, 4)).type == PieceType.PAWN
+    assert engine.board.piece_at(Vector2d(4, 4)).has_moved
+    assert not engine.board.piece_at(Vector2d(7, 0)).has_moved
+    assert engine.board.piece_at(Vector2d(7, 7)).has_moved
+
+    assert engine.validate_move(EnPassant(Vector2d(4, 4), Vector2d(3, 5), Vector2d(3, 4)))
+    assert engine.validate_move(Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0)))
+
+
+def test_black_to_move():
+    engine = ChessEngine.from_fen("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1")
+
+    assert engine.currently_moving_team == Team.BLACK
+    assert engine.validate_move(Castling(Vector2d(4, 7), Vector2d(2, 7), Vector2d(0, 7), Vector2d(3, 7)))
+    assert not engine.validate_move(Move(Vector2d(4, 0), Vector2d(4, 1)))
+
+
+def test_to_fen():
+    engine = ChessEngine()
+    assert engine.to_fen() == INITIAL_FEN
+
+    engine.process_move(Move(Vector2d(4, 1), Vector2d(4, 3)))
+    assert engine.to_fen() == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+
+    engine.process_move(Move(Vector2d(6, 7), Vector2d(5, 5)))
+    assert engine.to_fen() == "rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2"
+
+    engine.process_move(Move(Vector2d(4, 0), Vector2d(4, 1)))
+    assert engine.to_fen() == "rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPPKPPP/RNBQ1BNR b kq - 2 2"
+
+
+def test_castle_rights_lost_by_capturing_rook():
+    engine = ChessEngine.from_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", BoardType.BITBOARD)
+
+    engine.process_move(Capturing(Vector2d(0, 0), Vector2d(0, 7)))
+
+    assert engine.to_fen() == "R3k2r/8/8/8/8/8/8/4K2R b Kk - 0 1"
+
+
+@pytest.mark.parametrize("fen", [
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 12 40",
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+])
+def test_round_trip(fen: str):
+    assert ChessEngine.from_fen(fen).to_fen() == fen
+
+
+def test_fen_hash_matches_played_position():
+    engine = ChessEngine()
+    for move in (Move(Vector2d(4, 1), Vector2d(4, 3)), Move(Vector2d(1, 7), Vector2d(2, 5)),
+                 Move(Vector2d(4, 3), Vector2d(4, 4)), Move(Vector2d(3, 6), Vector2d(3, 4))):
+        engine.process_move(move)
+
+    assert engine.position_hash == ChessEngine.from_fen(engine.to_fen()).position_hash
+
+
+@pytest.mark.parametrize("fen", [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KX - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq z9 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - a 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w"
+])
+def test_invalid_fen(fen: str):
+    with pytest.raises(RuntimeError):
+        parse_fen(fen)
+
+
+def test_field_names():
+    assert field_name(Vector2d(0, 0)) == "a1"
+    assert field_name(Vector2d(7, 5)) == "h6"
+    assert parse_field("e4") == Vector2d(4, 3)
+
+
+def test_move_name():
+    assert move_name(Move(Vector2d(4, 1), Vector2d(4, 3))) == "e2e4"
+    assert move_name(PromotionWithCapturing(Vector2d(1, 6), Vector2d(0, 7), PieceType.KNIGHT)) == "b7a8n"
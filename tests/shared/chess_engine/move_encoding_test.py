@@ -0,0 +1,64 @@
+import pytest
+
+from shared.chess_engine.chess_engine import ChessEngine, legal_moves_with_promotions
+from shared.chess_engine.move import Move, Capturing, Castling, EnPassant, Promotion, PromotionWithCapturing
+from shared.chess_engine.move_encoding import encode_move, decode_move
+from shared.chess_engine.perft import SUITE
+from shared.chess_engine.piece import PieceType
+from shared.chess_engine.position import Vector2d
+
+
+def test_encode_move_fits_in_16_bits():
+    move = PromotionWithCapturing(Vector2d(6, 6), Vector2d(7, 7), PieceType.QUEEN)
+
+    assert 0 <= encode_move(move) < 1 << 16
+
+
+def test_encode_move_packs_squares():
+    code = encode_move(Move(Vector2d(4, 1), Vector2d(4, 3)))
+
+    assert code & 0x3F == 12
+    assert code >> 6 & 0x3F == 28
+    assert code >> 12 == 0
+
+
+@pytest.mark.parametrize("move", [
+    Move(Vector2d(1, 0), Vector2d(2, 2)),
+    Capturing(Vector2d(3, 3), Vector2d(4, 4)),
+    Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0)),
+    Castling(Vector2d(4, 7), Vector2d(2, 7), Vector2d(0, 7), Vector2d(3, 7)),
+    EnPassant(Vector2d(4, 4), Vector2d(3, 5), Vector2d(3, 4)),
+    EnPassant(Vector2d(2, 3), Vector2d(1, 2), Vector2d(1, 3)),
+    Promotion(Vector2d(0, 6), Vector2d(0, 7)),
+    Promotion(Vector2d(0, 6), Vector2d(0, 7), PieceType.KNIGHT),
+    PromotionWithCapturing(Vector2d(1, 1), Vector2d(0, 0)),
+    PromotionWithCapturing(Vector2d(1, 1), Vector2d(0, 0), PieceType.ROOK)
+])
+def test_decode_move_restores_encoded_move(move):
+    decoded = decode_move(encode_move(move))
+
+    assert decoded == move
+    assert decoded.__dict__ == move.__dict__
+
+
+def test_encode_move_distinguishes_promotion_pieces():
+    codes = {encode_move(Promotion(Vector2d(0, 6), Vector2d(0, 7), t))
+             for t in (None, PieceType.KNIGHT, PieceType.BISHOP, PieceType.ROOK, PieceType.QUEEN)}
+
+    assert len(codes) == 5
+
+
+def test_decode_move_restores_all_legal_moves_of_perft_suite():
+    for position in SUITE:
+        engine = ChessEngine.from_fen(position.fen)
+        moves = list(engine.all_legal_moves()) + legal_moves_with_promotions(engine)
+
+        for move in moves:
+            decoded = decode_move(encode_move(move))
+            assert decoded == move
+            assert decoded.__dict__ == move.__dict__
+
+
+def test_decode_move_rejects_unused_flags():
+    with pytest.raises(RuntimeError):
+        decode_move(1 << 12)
@@ -1,5 +1,7 @@
-from shared.chess_engine.move import Move, Capturing
-from shared.chess_engine.move_history import MoveHistory, BoardSnapshot, CastleRight
+import pytest
+
+from shared.chess_engine.move import Move, Capturing, Castling
+from shared.chess_engine.move_history import MoveHistory, BoardSnapshot, CastleRight, CompactMoveHistory
 from shared.chess_engine.piece import PieceType, Team
 from shared.chess_engine.position import Vector2d
 
@@ -95,3 +97,65 @@ def test_fifty_move_rule():
         move_history.update(black_move, snapshot)
 
     assert not move_history.fifty_moves_rule_satisfied()
+
+
+def test_compact_history_stores_moves_as_ints():
+    castling = Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0))
+    move_history = CompactMoveHistory([Move(Vector2d(4, 1), Vector2d(4, 3))])
+    move_history.add_move(castling, PieceType.KING)
+
+    assert len(move_history) == 2
+    assert move_history._moves.typecode == "H"
+    assert move_history.last_move == castling
+    assert move_history.last_move.rook_to == Vector2d(5, 0)
+
+
+def test_compact_history_repetitions():
+    move_history = CompactMoveHistory()
+    move = Move(Vector2d(1, 0), Vector2d(1, 1))
+
+    move_history.add_position_key(1)
+    for key in (2, 1, 2, 1):
+        move_history.add_move(move, PieceType.ROOK)
+        move_history.add_position_key(key)
+
+    assert move_history.repeated_three_times()
+    assert not move_history.repeated_five_times()
+    assert move_history.last_position == 1
+
+    move_history.add_move(Capturing(Vector2d(1, 1), Vector2d(1, 2)), PieceType.ROOK)
+    move_history.add_position_key(3)
+
+    assert move_history._positions == {3: 1}
+    assert list(move_history._keys) == [3]
+    assert move_history.halfmove_clock == 0
+
+
+def test_compact_history_undo_irreversible_move():
+    move_history = CompactMoveHistory()
+    move = Move(Vector2d(1, 0), Vector2d(1, 1))
+
+    move_history.add_position_key(1)
+    for key in (2, 1, 2, 1):
+        move_history.add_move(move, PieceType.ROOK)
+        move_history.add_position_key(key)
+    counted_keys = move_history.counted_keys
+    move_history.add_move(Move(Vector2d(4, 1), Vector2d(4, 2)), PieceType.PAWN)
+    move_history.add_position_key(3)
+
+    assert not move_history.repeated_three_times()
+    assert list(counted_keys) == [1, 2, 1, 2, 1]
+    move_history.undo_last_move(4, 1, counted_keys)
+
+    assert move_history.last_position == 1
+    assert move_history.halfmove_clock == 4
+    assert move_history.repeated_three_times()
+    move_history.undo_last_move(3, 2)
+    assert not move_history.repeated_three_times()
+
+
+def test_compact_history_rejects_snapshots():
+    snapshot = BoardSnapshot({}, Team.WHITE, {Team.WHITE: CastleRight.NONE, Team.BLACK: CastleRight.NONE}, False)
+
+    with pytest.raises(RuntimeError):
+        CompactMoveHistory().add_snapshot(snapshot)
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.move import Move, Castling
+from shared.chess_engine.opening_book import OpeningBook, SAMPLE_LINES, SAMPLE_BOOK_PATH, build_book, write_book
+from shared.chess_engine.position import Vector2d
+
+E4 = Move(Vector2d(4, 1), Vector2d(4, 3))
+E5 = Move(Vector2d(4, 6), Vector2d(4, 4))
+
+
+def test_sample_book_is_up_to_date(tmp_path):
+    path = str(tmp_path / "sample.bin")
+    build_book(path, SAMPLE_LINES)
+
+    with open(path, "rb") as built, open(SAMPLE_BOOK_PATH, "rb") as shipped:
+        assert built.read() == shipped.read()
+
+
+def test_moves():
+    book = OpeningBook()
+    engine = ChessEngine()
+
+    moves = {m.move: m for m in book.moves(engine.position_hash)}
+
+    assert len(moves) == 4
+    assert moves[E4].weight == 11
+    assert moves[E4].opening_name == "King's Pawn Game"
+    assert book.moves(engine.position_hash ^ 1) == []
+
+
+def test_opening_name():
+    book = OpeningBook()
+    engine = ChessEngine()
+    engine.process_move(E4)
+
+    assert book.opening_name(engine.position_hash, E5) == "Open Game"
+    assert book.opening_name(engine.position_hash, Move(Vector2d(0, 6), Vector2d(0, 5))) is None
+
+    engine.process_move(E5)
+    assert book.opening_name(engine.position_hash, Move(Vector2d(5, 0), Vector2d(2, 3))) is None
+
+
+def test_opening_name_after_transposition():
+    book = OpeningBook()
+    engine = ChessEngine()
+    for move in (Move(Vector2d(2, 1), Vector2d(2, 3)), Move(Vector2d(6, 7), Vector2d(5, 5)),
+                 Move(Vector2d(3, 1), Vector2d(3, 3))):
+        engine.process_move(move)
+
+    assert book.opening_name(engine.position_hash, Move(Vector2d(6, 6), Vector2d(6, 5))) == "King's Indian Defence"
+
+
+def test_choose_move():
+    book = OpeningBook()
+    engine = ChessEngine()
+    source = random.Random(1)
+
+    chosen = {book.choose_move(engine, source) for _ in range(50)}
+
+    assert chosen <= {m.move for m in book.moves(engine.position_hash)}
+    assert E4 in chosen
+    assert book.choose_move(ChessEngine.from_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1")) is None
+
+
+def test_write_book(tmp_path):
+    path = str(tmp_path / "book.bin")
+    castling = Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0))
+    write_book(path, [
+        (7, castling, 3, "Castles"), (2, E4, 1, None), (7, E4, 5, None), (0xFFFF_FFFF_FFFF_FFFF, E5, 1, "Last")
+    ])
+
+    book = OpeningBook(path)
+
+    assert len(book) == 4
+    assert [(m.move, m.weight, m.opening_name) for m in book.moves(7)] == [(E4, 5, None), (castling, 3, "Castles")]
+    assert book.moves(7)[1].move.rook_to == Vector2d(5, 0)
+    assert book.opening_name(0xFFFF_FFFF_FFFF_FFFF, E5) == "Last"
+    assert book.moves(1) == []
+    book.close()
+
+
+def test_invalid_book(tmp_path):
+    path = tmp_path / "book.bin"
+    path.write_bytes(b"not a book at all")
+
+    with pytest.raises(RuntimeError):
+        OpeningBook(str(path))
+
+
+def test_empty_book(tmp_path):
+    path = tmp_path / "book.bin"
+    path.write_bytes(b"")
+
+    with pytest.raises(RuntimeError):
+        OpeningBook(str(path))
@@ -0,0 +1,35 @@
+import pytest
+
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.chessboard import BoardType
+from shared.chess_engine.perft import SUITE, perft, divide
+
+POSITIONS = {position.name: position for position in SUITE}
+
+
+@pytest.mark.parametrize("name", [position.name for position in SUITE])
+def test_perft_shallow(name: str):
+    position = POSITIONS[name]
+    engine = ChessEngine.from_fen(position.fen)
+
+    assert perft(engine, 1) == position.nodes[0]
+    assert perft(engine, 2) == position.nodes[1]
+
+
+@pytest.mark.parametrize("name", ["endgame", "promotions"])
+def test_perft_depth_3(name: str):
+    position = POSITIONS[name]
+
+    assert perft(ChessEngine.from_fen(position.fen), 3) == position.nodes[2]
+    assert perft(ChessEngine.from_fen(position.fen, BoardType.BITBOARD), 3) == position.nodes[2]
+
+
+def test_divide():
+    engine = ChessEngine()
+
+    results = divide(engine, 2)
+
+    assert len(results) == 20
+    assert results["e2e4"] == 20
+    assert results["g1f3"] == 20
+    assert sum(results.values()) == 400
@@ -1,3 +1,8 @@
+import copy
+import pickle
+
+import pytest
+
 from shared.chess_engine.position import Vector2d, centre, distance_x, distance_y
 
 
@@ -68,3 +73,40 @@ def test_distance_x():
 
 def test_distance_y():
     assert distance_y(Vector2d(1, -4), Vector2d(2, 7)) == 11
+
+def test_interned_on_board():
+    assert Vector2d(3, 5) is Vector2d(3, 5)
+    assert Vector2d(1, 2) + Vector2d(2, 3) is Vector2d(3, 5)
+    assert Vector2d(3, 5).index == 43
+    assert hash(Vector2d(3, 5)) == 43
+
+def test_outside_board():
+    assert Vector2d(-1, 5) is not Vector2d(-1, 5)
+    assert Vector2d(-1, 5) == Vector2d(-1, 5)
+    assert hash(Vector2d(-1, 5)) == hash(Vector2d(-1, 5))
+    assert Vector2d(8, 0).index is None
+    assert Vector2d(8, 0) != Vector2d(0, 1)
+
+def test_coords():
+    assert Vector2d(3, 5).coords == (3, 5)
+    assert Vector2d(-3, 9).coords == (-3, 9)
+
+def test_not_equal_to_other_types():
+    assert Vector2d(3, 5) not in ((3, 5), None, "(3, 5)")
+
+def test_copy_keeps_interning():
+    assert copy.deepcopy(Vector2d(3, 5)) is Vector2d(3, 5)
+    assert pickle.loads(pickle.dumps(Vector2d(3, 5))) is Vector2d(3, 5)
+    assert pickle.loads(pickle.dumps(Vector2d(-3, 9))) == Vector2d(-3, 9)
+
+def test_immutable():
+    vector = Vector2d(3, 5)
+    for name in ("x", "y", "index"):
+        with pytest.raises(AttributeError):
+            setattr(vector, name, 0)
+    with pytest.raises(AttributeError):
+        del vector.x
+    with pytest.raises(AttributeError):
+        Vector2d(-3, 9).x = 0
+
+    assert Vector2d(3, 5).coords == (3, 5)
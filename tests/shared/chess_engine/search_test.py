@@ -0,0 +1,112 @@
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.move import Capturing, Move, Promotion
+from shared.chess_engine.opening_book import OpeningBook
+from shared.chess_engine.piece import PieceType
+from shared.chess_engine.position import Vector2d
+from shared.chess_engine.search import Searcher, MATE_SCORE, find_best_move
+from shared.chess_engine.transposition_table import TranspositionTable
+
+
+def test_search_finds_mate_in_one():
+    engine = ChessEngine.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+
+    result = Searcher().search(engine, 3)
+
+    assert result.best_move == Move(Vector2d(0, 0), Vector2d(0, 7))
+    assert result.score == MATE_SCORE - 1
+    assert result.mate_found
+
+
+def test_search_finds_mate_in_two():
+    engine = ChessEngine.from_fen("7k/8/5K2/8/8/8/8/R7 w - - 0 1")
+
+    result = Searcher().search(engine, 3)
+
+    assert result.score == MATE_SCORE - 3
+    engine.make_move(result.best_move)
+    for reply in engine.all_legal_moves():
+        engine.make_move(reply)
+        assert Searcher().search(engine, 1).score == MATE_SCORE - 1
+        engine.unmake_move()
+
+
+def test_search_captures_hanging_queen():
+    engine = ChessEngine.from_fen("4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1")
+
+    assert find_best_move(engine, 2) == Capturing(Vector2d(3, 0), Vector2d(3, 4))
+
+
+def test_search_avoids_defended_pawn():
+    engine = ChessEngine.from_fen("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1")
+
+    result = Searcher().search(engine, 2)
+
+    assert result.best_move != Capturing(Vector2d(3, 0), Vector2d(3, 4))
+    assert result.score >= 700
+
+
+def test_search_promotes_to_queen():
+    engine = ChessEngine.from_fen("8/P7/8/8/8/8/8/k1K5 w - - 0 1")
+
+    result = Searcher().search(engine, 2)
+
+    assert result.best_move == Promotion(Vector2d(0, 6), Vector2d(0, 7))
+    assert result.best_move.piece_type == PieceType.QUEEN
+
+
+def test_search_without_legal_moves():
+    checkmate = ChessEngine.from_fen("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+    stalemate = ChessEngine.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+
+    assert Searcher().search(checkmate).best_move is None
+    assert Searcher().search(checkmate).score == -MATE_SCORE
+    assert Searcher().search(stalemate).score == 0
+
+
+def test_search_leaves_engine_unchanged():
+    engine = ChessEngine.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    fen = engine.to_fen()
+    position_hash = engine.position_hash
+
+    Searcher().search(engine, 2)
+
+    assert engine.to_fen() == fen
+    assert engine.position_hash == position_hash
+
+
+def test_search_stops_when_time_runs_out():
+    engine = ChessEngine()
+    fen = engine.to_fen()
+
+    result = Searcher().search(engine, time_limit=0.2)
+
+    assert result.best_move is not None
+    assert 1 <= result.depth < 10
+    assert result.elapsed < 1.5
+    assert engine.to_fen() == fen
+
+
+def test_search_reuses_transposition_table():
+    engine = ChessEngine.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3")
+    table = TranspositionTable(1)
+    searcher = Searcher(table)
+
+    first = searcher.search(engine, 3)
+    second = searcher.search(engine, 3)
+
+    assert second.best_move == first.best_move
+    assert second.score == first.score
+    assert second.nodes < first.nodes
+    assert table.hit_rate > 0
+
+
+def test_search_plays_book_moves():
+    engine = ChessEngine()
+    searcher = Searcher(TranspositionTable(1), OpeningBook())
+
+    result = searcher.search(engine, 3)
+    assert result.from_book
+    assert result.nodes == 0
+
+    engine = ChessEngine.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+    assert not searcher.search(engine, 1).from_book
@@ -0,0 +1,81 @@
+from shared.chess_engine.move import Castling, Move, PromotionWithCapturing
+from shared.chess_engine.piece import PieceType
+from shared.chess_engine.position import Vector2d
+from shared.chess_engine.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+def test_size_in_megabytes():
+    assert TranspositionTable(1).capacity == 1024 * 1024 // 16
+    assert TranspositionTable(1.5).capacity == 1024 * 1024 // 16
+    assert TranspositionTable(0).capacity == 2
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    move = PromotionWithCapturing(Vector2d(1, 6), Vector2d(0, 7), PieceType.KNIGHT)
+
+    assert table.probe(0xDEAD_BEEF_0000_0001) is None
+    table.store(0xDEAD_BEEF_0000_0001, 5, LOWER_BOUND, -99_990, move)
+    table.store(0xDEAD_BEEF_0000_0002, 0, UPPER_BOUND, 7, None)
+
+    entry = table.probe(0xDEAD_BEEF_0000_0001)
+    assert (entry.depth, entry.bound, entry.score) == (5, LOWER_BOUND, -99_990)
+    assert entry.best_move == move
+    assert entry.best_move.piece_type == PieceType.KNIGHT
+
+    entry = table.probe(0xDEAD_BEEF_0000_0002)
+    assert (entry.depth, entry.bound, entry.score, entry.best_move) == (0, UPPER_BOUND, 7, None)
+
+
+def test_hit_rate():
+    table = TranspositionTable(1)
+    table.store(1, 1, EXACT, 0, None)
+
+    table.probe(1)
+    table.probe(2)
+    table.probe(1)
+    table.probe(3)
+
+    assert (table.hits, table.misses) == (2, 2)
+    assert table.hit_rate == 0.5
+
+
+def test_depth_preferred_and_always_replace_slots():
+    table = TranspositionTable(0)
+    castling = Castling(Vector2d(4, 0), Vector2d(6, 0), Vector2d(7, 0), Vector2d(5, 0))
+
+    table.store(1, 8, EXACT, 10, castling)
+    table.store(2, 3, EXACT, 20, None)
+    table.store(3, 4, EXACT, 30, None)
+
+    assert table.probe(1).best_move == castling
+    assert table.probe(2) is None
+    assert table.probe(3).score == 30
+
+    table.store(4, 9, EXACT, 40, None)
+    assert table.probe(1) is None
+    assert table.probe(4).score == 40
+
+
+def test_old_entries_are_replaced():
+    table = TranspositionTable(0)
+    table.store(1, 8, EXACT, 10, None)
+    table.new_search()
+
+    table.store(2, 1, EXACT, 20, Move(Vector2d(0, 1), Vector2d(0, 2)))
+    table.store(3, 0, EXACT, 30, None)
+
+    assert table.probe(1) is None
+    assert table.probe(2).score == 20
+    assert table.probe(3).score == 30
+
+
+def test_clear():
+    table = TranspositionTable(1)
+    table.store(1, 1, EXACT, 0, None)
+    table.probe(1)
+
+    table.clear()
+
+    assert table.probe(1) is None
+    assert table.hits == 0
@@ -0,0 +1,132 @@
+from shared.chess_engine.chess_engine import ChessEngine
+from shared.chess_engine.move import Move, Capturing, Castling, EnPassant, PromotionWithCapturing
+from shared.chess_engine.move_history import CastleRight
+from shared.chess_engine.piece import Team, King, Rook, Pawn, Knight, Bishop, PieceType
+from shared.chess_engine.position import Vector2d
+from shared.chess_engine.zobrist import PositionHashing, position_key, SIDE_KEY
+
+
+def _recomputed_key(engine: ChessEngine) -> int:
+    return position_key(
+        engine.board.pieces[Team.WHITE].all + engine.board.pieces[Team.BLACK].all,
+        engine.currently_moving_team,
+        engine.castle_rights,
+        engine._en_passant_file()
+    )
+
+
+def test_initial_key():
+    engine = ChessEngine()
+
+    assert engine.position_hash == _recomputed_key(engine)
+    assert engine.position_hash == ChessEngine().position_hash
+
+
+def test_incremental_key():
+    pieces = [
+        Rook(Team.WHITE, Vector2d(0, 0)),
+        King(Team.WHITE, Vector2d(4, 0)),
+        Pawn(Team.WHITE, Vector2d(1, 4), has_moved=True),
+        Pawn(Team.WHITE, Vector2d(6, 6), has_moved=True),
+        Rook(Team.BLACK, Vector2d(7, 7)),
+        Knight(Team.BLACK, Vector2d(5, 7)),
+        Pawn(Team.BLACK, Vector2d(2, 6), has_moved=False),
+        King(Team.BLACK, Vector2d(4, 7))
+    ]
+
+    engine = ChessEngine(pieces, [])
+    moves = [
+        Castling(Vector2d(4, 0), Vector2d(2, 0), Vector2d(0, 0), Vector2d(3, 0)),
+        Move(Vector2d(2, 6), Vector2d(2, 4)),
+        EnPassant(Vector2d(1, 4), Vector2d(2, 5), Vector2d(2, 4)),
+        Move(Vector2d(5, 7), Vector2d(6, 5)),
+        Move(Vector2d(2, 5), Vector2d(2, 6)),
+        Move(Vector2d(4, 7), Vector2d(4, 6)),
+        PromotionWithCapturing(Vector2d(6, 6), Vector2d(7, 7), PieceType.QUEEN),
+        Capturing(Vector2d(6, 5), Vector2d(7, 7))
+    ]
+
+    for move in moves:
+        engine.process_move(move)
+        assert engine.position_hash == _recomputed_key(engine)
+
+
+def test_en_passant_changes_key():
+    pieces = [
+        King(Team.WHITE, Vector2d(4, 0)),
+        Pawn(Team.WHITE, Vector2d(1, 3), has_moved=True),
+        King(Team.BLACK, Vector2d(4, 7)),
+        Pawn(Team.BLACK, Vector2d(0, 3), has_moved=True)
+    ]
+
+    with_en_passant = ChessEngine(pieces, [Move(Vector2d(1, 1), Vector2d(1, 3))])
+    assert with_en_passant._en_passant_file() == 1
+
+    pieces = [
+        King(Team.WHITE, Vector2d(4, 0)),
+        Pawn(Team.WHITE, Vector2d(1, 3), has_moved=True),
+        King(Team.BLACK, Vector2d(4, 7)),
+        Pawn(Team.BLACK, Vector2d(0, 3), has_moved=True)
+    ]
+
+    without_en_passant = ChessEngine(pieces, [Move(Vector2d(1, 2), Vector2d(1, 3))])
+    assert without_en_passant._en_passant_file() is None
+
+    assert with_en_passant.position_hash != without_en_passant.position_hash
+
+
+def test_castle_rights_change_key():
+    engine = ChessEngine([Rook(Team.WHITE, Vector2d(0, 0)), King(Team.WHITE, Vector2d(4, 0)),
+                          King(Team.BLACK, Vector2d(4, 7))], [])
+    assert engine.castle_rights[Team.WHITE] == CastleRight.LONG
+    initial_key = engine.position_hash
+
+    engine.process_move(Move(Vector2d(0, 0), Vector2d(0, 1)))
+    engine.process_move(Move(Vector2d(4, 7), Vector2d(3, 7)))
+    engine.process_move(Move(Vector2d(0, 1), Vector2d(0, 0)))
+    engine.process_move(Move(Vector2d(3, 7), Vector2d(4, 7)))
+
+    assert engine.position_hash != initial_key
+    assert engine.position_hash == _recomputed_key(engine)
+
+
+def test_transposition_restores_key():
+    pieces = [Bishop(Team.WHITE, Vector2d(3, 3)), King(Team.WHITE, Vector2d(4, 0)), King(Team.BLACK, Vector2d(4, 7))]
+    engine = ChessEngine(pieces, [])
+    initial_key = engine.position_hash
+
+    engine.process_move(Move(Vector2d(3, 3), Vector2d(4, 4)))
+    assert engine.position_hash != initial_key
+    engine.process_move(Move(Vector2d(4, 7), Vector2d(3, 7)))
+    engine.process_move(Move(Vector2d(4, 4), Vector2d(3, 3)))
+    engine.process_move(Move(Vector2d(3, 7), Vector2d(4, 7)))
+
+    assert engine.position_hash == initial_key
+
+
+def test_side_to_move_changes_key():
+    pieces = [King(Team.WHITE, Vector2d(4, 0)), King(Team.BLACK, Vector2d(4, 7))]
+    rights = {Team.WHITE: CastleRight.NONE, Team.BLACK: CastleRight.NONE}
+
+    assert position_key(pieces, Team.WHITE, rights, None) ^ SIDE_KEY == position_key(pieces, Team.BLACK, rights, None)
+
+
+def test_snapshot_and_zobrist_modes_agree():
+    def play(hashing: PositionHashing) -> list[tuple[bool, bool]]:
+        pieces = [
+            Bishop(Team.WHITE, Vector2d(3, 3)),
+            King(Team.WHITE, Vector2d(4, 0)),
+            Knight(Team.BLACK, Vector2d(6, 6)),
+            King(Team.BLACK, Vector2d(4, 7))
+        ]
+        engine = ChessEngine(pieces, [], hashing=hashing)
+        results = []
+        for _ in range(3):
+            for move in (Move(Vector2d(3, 3), Vector2d(4, 4)), Move(Vector2d(6, 6), Vector2d(5, 4)),
+                         Move(Vector2d(4, 4), Vector2d(3, 3)), Move(Vector2d(5, 4), Vector2d(6, 6))):
+                engine.process_move(move)
+                results.append((engine.can_claim_draw(), engine.is_tie()))
+
+        return results
+
+    assert play(PositionHashing.SNAPSHOT) == play(PositionHashing.ZOBRIST)
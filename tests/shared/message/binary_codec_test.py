@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from shared.chess_engine.move import Move, Castling, PromotionWithCapturing
+from shared.chess_engine.piece import PieceType
+from shared.chess_engine.position import Vector2d
+from shared.message.binary_codec import encode_message, decode_message
+from shared.message.message_code import MessageCode
+from shared.message.move_message import move_to_message
+
+
+@pytest.mark.parametrize("message", [
+    {"code": MessageCode.GAME_MOVE.value, "move": Move(Vector2d(4, 1), Vector2d(4, 3))},
+    {"code": MessageCode.GAME_MOVE.value, "move": Move(Vector2d(4, 1), Vector2d(4, 3)), "timeLeft": 179_500},
+    {"code": MessageCode.GAME_MOVE.value, "move": Castling(Vector2d(4, 7), Vector2d(6, 7), Vector2d(7, 7),
+                                                           Vector2d(5, 7)), "timeLeft": -20},
+    {"code": MessageCode.GAME_MOVE.value, "move": Move(Vector2d(4, 1), Vector2d(4, 3)), "timeLeft": 179_500,
+     "openingName": "King's Pawn Game"},
+    {"code": MessageCode.GAME_MOVE.value, "move": PromotionWithCapturing(Vector2d(1, 6), Vector2d(0, 7),
+                                                                         PieceType.KNIGHT)},
+    {"code": MessageCode.GAME_OFFER_DRAW.value},
+    {"code": MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value, "accepted": True},
+    {"code": MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value, "accepted": False},
+    {"code": MessageCode.GAME_TIME_END.value}
+])
+def test_decode_message_restores_encoded_message(message):
+    assert decode_message(encode_message(message)) == message
+
+
+def test_encode_message_is_smaller_than_json():
+    move = Move(Vector2d(4, 1), Vector2d(4, 3))
+    frame = encode_message({"code": MessageCode.GAME_MOVE.value, "move": move, "timeLeft": 179_500})
+    json_message = json.dumps({"code": MessageCode.GAME_MOVE.value, "move": move_to_message(move), "timeLeft": 179_500})
+
+    assert len(frame) == 7
+    assert len(frame) < len(json_message)
+
+
+def test_encode_message_rejects_codes_without_binary_form():
+    with pytest.raises(ValueError):
+        encode_message({"code": MessageCode.GAME_SURRENDER.value})
+
+
+@pytest.mark.parametrize("frame", [
+    b"",
+    bytes([MessageCode.GAME_SURRENDER.value]),
+    bytes([MessageCode.GAME_MOVE.value, 0]),
+    bytes([MessageCode.GAME_MOVE.value, 0x10, 0, 0]),
+    bytes([MessageCode.GAME_MOVE.value, 0x10, 0]),
+    bytes([MessageCode.GAME_MOVE.value, 0x10, 0, 0, 0, 0, 0, 0xff]),
+    bytes([MessageCode.GAME_OFFER_DRAW.value, 1]),
+    bytes([MessageCode.GAME_RESPOND_TO_DRAW_OFFER.value])
+])
+def test_decode_message_rejects_malformed_frames(frame):
+    with pytest.raises(ValueError):
+        decode_message(frame)